@@ -1,17 +1,7 @@
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from config.settings import FOUNDRY_PROJECT_ENDPOINT
+AGENT_NAME = "cv-hr-agent-with-search"
+AGENT_MODEL = "gpt-4.1-nano"
 
-def create_agent_with_search() -> str:
-    project = AIProjectClient(
-        credential=DefaultAzureCredential(),
-        endpoint=FOUNDRY_PROJECT_ENDPOINT
-    )
-
-    agent = project.agents.create_agent(
-        name="cv-hr-agent-with-search",
-        model="gpt-4.1-nano",
-        instructions="""
+AGENT_INSTRUCTIONS = """
 You are a professional Human Resources (HR) and Talent Acquisition Specialist.
 
 Your main task is to match job descriptions with candidate CVs retrieved from
@@ -58,16 +48,34 @@ Tone:
 - Clear, structured, and factual
 
 
-""",
-        tools=[
-            {
-                "type": "azure_ai_search",
-                "parameters": {
-                    "connection_name": "cv-search-connection",
-                    "index_name": "cv-index"
-                }
-            }
-        ]
-    )
+"""
+
+AGENT_TOOLS = [
+    {
+        "type": "azure_ai_search",
+        "parameters": {
+            "connection_name": "cv-search-connection",
+            "index_name": "cv-index"
+        }
+    }
+]
+
+
+def agent_definition() -> dict:
+    """The CV agent as create_agent / update_agent arguments; its hash decides whether the agent changes."""
+    return {
+        "name": AGENT_NAME,
+        "model": AGENT_MODEL,
+        "instructions": AGENT_INSTRUCTIONS,
+        "tools": AGENT_TOOLS,
+    }
+
+
+def create_agent_with_search() -> str:
+    """
+    Returns the id of the agent for agent_definition(). An existing agent with the same definition
+    is reused; it is only created or updated when the definition changed (agents/agent_registry.py).
+    """
+    from agents.agent_registry import get_agent_registry
 
-    return agent.id
+    return get_agent_registry().resolve(agent_definition()).id
@@ -0,0 +1,198 @@
+"""
+Agent registry: resolves an agent definition (agents/agent_factory.py) to a Foundry agent id and
+only creates or updates the agent when the definition changed.
+
+The definition hash is stored on the agent (metadata "definition_hash") and in a local file
+(AGENT_REGISTRY_PATH), so a warm start costs one get_agent (to check the cached agent still exists,
+once per process), a cold start one listing, and a changed definition updates the existing agent in
+place instead of adding another one.
+
+    agent = get_agent_registry().resolve(agent_definition())   # ResolvedAgent(id, fingerprint, action)
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from services.foundry_client import get_project_client
+from services.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# Registry config (env)
+# =========================
+AGENT_REGISTRY_PATH = os.getenv("AGENT_REGISTRY_PATH", ".cache/agent_registry.json")
+
+DEFINITION_HASH_KEY = "definition_hash"
+
+
+def fingerprint(definition: dict) -> str:
+    """Stable hash of an agent definition (key order does not matter)."""
+    canonical = json.dumps(definition, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ResolvedAgent:
+    id: str
+    fingerprint: str
+    action: str                     # "pinned" | "cached" | "found" | "updated" | "created"
+
+    @property
+    def cache_key(self) -> str:
+        """Agent id + definition version: answers cached for older instructions are not served."""
+        return f"{self.id}@{self.fingerprint[:12]}"
+
+
+class AgentRegistry:
+    def __init__(self, project, endpoint: str, path: str = AGENT_REGISTRY_PATH):
+        # project=None: the shared client of `endpoint` is created on the first service call
+        self._project = project
+        self.endpoint = endpoint
+        self.path = path
+        self._lock = threading.Lock()
+        # Cached agent ids checked against the service by this process
+        self._checked = set()
+
+    @property
+    def project(self):
+        if self._project is None:
+            self._project = get_project_client(self.endpoint)
+        return self._project
+
+    # ---------- local cache: "<endpoint>|<name>" -> {agent_id, fingerprint, updated_at} ----------
+    def _load(self) -> dict:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logger.warning("Unreadable agent registry %s, ignoring it", self.path)
+            return {}
+
+    def _save(self, entries: dict) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _key(self, name: str) -> str:
+        return f"{self.endpoint}|{name}"
+
+    # ---------- service ----------
+    def find(self, name: str) -> list:
+        """Agents named `name`, newest first."""
+        agents = [a for a in self.project.agents.list_agents() if a.name == name]
+        return sorted(agents, key=lambda a: a.created_at, reverse=True)
+
+    def _still_current(self, agent_id: str, digest: str) -> bool:
+        """Whether the cached agent still exists with this definition (e.g. not pruned from another machine)."""
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            agent = self.project.agents.get_agent(agent_id)
+        except ResourceNotFoundError:
+            logger.warning("Cached agent %s no longer exists, resolving again", agent_id)
+            return False
+        return (agent.metadata or {}).get(DEFINITION_HASH_KEY) == digest
+
+    def resolve(self, definition: dict, verify: bool = False) -> ResolvedAgent:
+        """
+        Id of the agent matching `definition`:
+          cached   the local registry holds this definition hash and the agent still exists (checked
+                   with one get_agent per process; `verify` forces a lookup)
+          found    an agent named like the definition carries this hash
+          updated  an agent with that name exists with another hash: updated in place, same id
+          created  no agent with that name yet
+        """
+        digest = fingerprint(definition)
+        with self._lock, span("agent.registry.resolve", **{"agent.name": definition["name"]}) as current:
+            entries = self._load()
+            entry = entries.get(self._key(definition["name"]))
+            if entry and entry["fingerprint"] == digest and not verify:
+                agent_id = entry["agent_id"]
+                if agent_id in self._checked or self._still_current(agent_id, digest):
+                    self._checked.add(agent_id)
+                    current.set_attribute("agent.action", "cached")
+                    return ResolvedAgent(agent_id, digest, "cached")
+
+            agents = self.find(definition["name"])
+            match = next((a for a in agents if (a.metadata or {}).get(DEFINITION_HASH_KEY) == digest), None)
+            metadata = {**definition.get("metadata", {}), DEFINITION_HASH_KEY: digest}
+            if match is not None:
+                agent_id, action = match.id, "found"
+            elif agents:
+                # Prefer the agent this registry used before, so its id stays valid everywhere
+                known = entry["agent_id"] if entry else None
+                target = next((a for a in agents if a.id == known), agents[0])
+                self.project.agents.update_agent(target.id, **{**definition, "metadata": metadata})
+                agent_id, action = target.id, "updated"
+            else:
+                agent_id = self.project.agents.create_agent(**{**definition, "metadata": metadata}).id
+                action = "created"
+
+            entries[self._key(definition["name"])] = {
+                "agent_id": agent_id,
+                "fingerprint": digest,
+                "updated_at": int(time.time()),
+            }
+            self._save(entries)
+            self._checked.add(agent_id)
+            current.set_attributes({"agent.action": action, "agent.id": agent_id})
+            logger.info("Agent %s: %s (%s)", definition["name"], agent_id, action)
+            return ResolvedAgent(agent_id, digest, action)
+
+    def prune(self, definition: dict, keep_id: str) -> list:
+        """Deletes the other agents named like `definition` (duplicates left by earlier deploys)."""
+        deleted = []
+        for agent in self.find(definition["name"]):
+            if agent.id != keep_id:
+                self.project.agents.delete_agent(agent.id)
+                deleted.append(agent.id)
+        return deleted
+
+
+_registries = {}
+_resolved = {}
+_lock = threading.Lock()
+
+
+def get_agent_registry(endpoint: str = None) -> AgentRegistry:
+    """Process-wide registry for `endpoint` (default: FOUNDRY_PROJECT_ENDPOINT)."""
+    if endpoint is None:
+        from config.settings import FOUNDRY_PROJECT_ENDPOINT
+        endpoint = FOUNDRY_PROJECT_ENDPOINT
+    registry = _registries.get(endpoint)
+    if registry is None:
+        with _lock:
+            registry = _registries.setdefault(endpoint, AgentRegistry(None, endpoint))
+    return registry
+
+
+def resolve_agent(endpoint: str = None) -> ResolvedAgent:
+    """
+    The CV agent of this process, resolved once. FOUNDRY_AGENT_ID pins a specific agent;
+    otherwise it is the agent of agents.agent_factory.agent_definition().
+    """
+    pinned = os.getenv("FOUNDRY_AGENT_ID")
+    if pinned:
+        return ResolvedAgent(pinned, "pinned", "pinned")
+
+    if endpoint is None:
+        from config.settings import FOUNDRY_PROJECT_ENDPOINT
+        endpoint = FOUNDRY_PROJECT_ENDPOINT
+    agent = _resolved.get(endpoint)
+    if agent is None:
+        from agents.agent_factory import agent_definition
+
+        # Concurrent first calls are serialized by the registry; the later ones hit its local cache
+        agent = _resolved.setdefault(endpoint, get_agent_registry(endpoint).resolve(agent_definition()))
+    return agent
@@ -1,41 +1,308 @@
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import ListSortOrder
-from config.settings import FOUNDRY_PROJECT_ENDPOINT
-
-def run_agent(agent_id: str, user_text: str) -> str:
-    project = AIProjectClient(
-        credential=DefaultAzureCredential(),
-        endpoint=FOUNDRY_PROJECT_ENDPOINT
-    )
-
-    # 1. Create thread
-    thread = project.agents.threads.create()
-
-    # 2. Add user message
-    project.agents.messages.create(
-        thread_id=thread.id,
-        role="user",
-        content=user_text
-    )
-
-    # 3. Run agent
-    run = project.agents.runs.create_and_process(
-        thread_id=thread.id,
-        agent_id=agent_id
-    )
-
-    if run.status == "failed":
-        return f"Run failed: {run.last_error}"
-
-    # 4. Read messages
-    messages = project.agents.messages.list(
-        thread_id=thread.id,
-        order=ListSortOrder.ASCENDING
-    )
+import asyncio
+import threading
+import time
+
+from agents.conversation import count_tokens
+from agents.thread_pool import get_thread_pool
+from services.admission import (
+    RUN_RETRY_ATTEMPTS,
+    RunThrottledError,
+    backoff_delay,
+    get_run_scheduler,
+    is_throttled,
+    retry_after,
+)
+from services.foundry_client import get_project_client
+from services.telemetry import record_turn, run_attributes, span
+
+# azure.ai.agents.models is imported where it is used: it loads the whole agents SDK
+
+# Messages fetched per turn: only the newest page of the current run is read
+ANSWER_PAGE_SIZE = 5
+
+def get_run_answer(thread_id: str, run_id: str, project=None):
+    """
+    Returns the latest assistant text produced by `run_id`, or None.
+    Lists newest-first, filtered by run id, and reads only the first page,
+    so the cost does not grow with the thread length.
+    """
+    from azure.ai.agents.models import ListSortOrder
+
+    project = project or get_project_client()
+
+    with span("agent.message.list", **{"thread.id": thread_id, "run.id": run_id}) as current:
+        pages = project.agents.messages.list(
+            thread_id=thread_id,
+            run_id=run_id,
+            order=ListSortOrder.DESCENDING,
+            limit=ANSWER_PAGE_SIZE,
+        ).by_page()
+        messages = list(next(pages, []))
+        current.set_attribute("messages.count", len(messages))
 
     for msg in messages:
         if msg.role == "assistant" and msg.text_messages:
             return msg.text_messages[-1].text.value
 
-    return "Agent doesn't return any response."
+    return None
+
+def apply_search_filter(thread_id: str, search_filter: str, project=None) -> None:
+    """
+    Overrides the Azure AI Search tool resources of a thread with an OData filter,
+    so runs on this thread only retrieve chunks of candidates that pass the filter.
+    """
+    # Imported here: the search tool needs the search settings, the runner itself does not
+    from services.search_tool import build_ai_search_tool
+
+    project = project or get_project_client()
+    tool = build_ai_search_tool(filter=search_filter)
+    with span("agent.thread.update", **{"thread.id": thread_id, "search.filter": search_filter}):
+        project.agents.threads.update(thread_id=thread_id, tool_resources=tool.resources)
+
+def _throttled(run_or_error, attempt: int, thread_id: str, session: str) -> None:
+    """
+    A run was throttled: pauses the scheduler for the jittered backoff, so the retry (and every
+    other run) waits in the queue. Raises RunThrottledError once the attempts are used up.
+    """
+    error = getattr(run_or_error, "last_error", run_or_error)
+    wait = retry_after(error)
+    if attempt + 1 >= RUN_RETRY_ATTEMPTS:
+        raise RunThrottledError(
+            f"Model rate limit exceeded after {RUN_RETRY_ATTEMPTS} attempts; "
+            f"try again in {wait or backoff_delay(attempt):.0f}s",
+            retry_after=wait,
+        )
+    delay = backoff_delay(attempt, wait)
+    get_run_scheduler().pause(delay, **{"thread.id": thread_id, "session": session, "run.attempt": attempt})
+
+
+def create_and_process_run(thread_id: str, agent_id: str, session: str = None, prompt_tokens: int = 0,
+                           project=None, **run_kwargs):
+    """
+    runs.create_and_process through the run scheduler (services/admission.py): waits for admission,
+    and a run rejected by the model rate limit is retried on the same thread with jittered backoff.
+    `prompt_tokens`: estimated tokens of the thread and instructions (reserved on the TPM bucket).
+    Returns the final ThreadRun; raises RunThrottledError if it stays throttled.
+    """
+    project = project or get_project_client()
+    scheduler = get_run_scheduler()
+
+    for attempt in range(RUN_RETRY_ATTEMPTS):
+        with span("agent.run.admission", **{"thread.id": thread_id, "session": session}):
+            ticket = scheduler.acquire(session, prompt_tokens, retry=attempt > 0)
+        try:
+            with span("agent.run", **{"thread.id": thread_id, "run.attempt": attempt}) as current:
+                run = project.agents.runs.create_and_process(thread_id=thread_id, agent_id=agent_id, **run_kwargs)
+                current.set_attributes(run_attributes(run))
+            ticket.settle(run)
+            throttled = run if run.status == "failed" and is_throttled(run.last_error) else None
+        except Exception as e:
+            if not is_throttled(e):
+                raise
+            throttled = e
+        finally:
+            scheduler.release(ticket)
+
+        if throttled is None:
+            return run
+        _throttled(throttled, attempt, thread_id, session)
+
+
+def run_agent(agent_id: str, user_text: str, search_filter: str = None) -> str:
+    """
+    `agent_id`: None resolves the agent through agents.agent_registry (FOUNDRY_AGENT_ID or agent_factory).
+    `search_filter`: optional OData filter for the search tool
+    (e.g. services.candidate_profile.jd_filter(user_text)).
+    """
+    if agent_id is None:
+        from agents.agent_registry import resolve_agent
+        agent_id = resolve_agent().id
+
+    project = get_project_client()
+    pool = get_thread_pool()
+    start = time.perf_counter()
+    ok = False
+
+    with span("agent.turn", **{"agent.id": agent_id, "turn.mode": "runner"}) as turn:
+        # 1. Take a clean thread from the pool (stateless request)
+        with span("agent.thread.acquire"):
+            thread_id = pool.acquire()
+        turn.set_attribute("thread.id", thread_id)
+
+        try:
+            # Hard requirements prune the candidates before retrieval
+            if search_filter:
+                apply_search_filter(thread_id, search_filter, project=project)
+
+            # 2. Add user message
+            with span("agent.message.create", **{"thread.id": thread_id, "message.chars": len(user_text)}):
+                project.agents.messages.create(
+                    thread_id=thread_id,
+                    role="user",
+                    content=user_text
+                )
+
+            # 3. Run agent (admission, create + poll; each request is a child span of the Azure SDK)
+            run = create_and_process_run(
+                thread_id,
+                agent_id,
+                session="runner",
+                prompt_tokens=count_tokens(user_text),
+                project=project,
+            )
+
+            if run.status == "failed":
+                return f"Run failed: {run.last_error}"
+
+            # 4. Read the answer of this run
+            answer = get_run_answer(thread_id, run.id, project=project)
+            ok = answer is not None
+
+            return answer or "Agent doesn't return any response."
+        finally:
+            # 5. Thread is deleted and replaced in the background
+            pool.release(thread_id)
+            record_turn((time.perf_counter() - start) * 1000, ok, **{"turn.mode": "runner"})
+
+
+def stream_run(thread_id: str, agent_id: str, project=None, additional_instructions: str = None,
+               session: str = None, prompt_tokens: int = 0):
+    """
+    Runs the agent on an existing thread and yields the assistant text deltas as they arrive.
+    The run goes through the run scheduler like create_and_process_run; a throttled run is retried
+    as long as nothing was yielded yet.
+    Raises RuntimeError if the run fails, is cancelled or expires (RunThrottledError if throttled).
+    """
+    from azure.ai.agents.models import AgentStreamEvent, MessageDeltaChunk, RunStatus, ThreadRun
+
+    project = project or get_project_client()
+    scheduler = get_run_scheduler()
+
+    for attempt in range(RUN_RETRY_ATTEMPTS):
+        with span("agent.run.admission", **{"thread.id": thread_id, "session": session}):
+            ticket = scheduler.acquire(session, prompt_tokens, retry=attempt > 0)
+        throttled = None
+        first_token = True
+        try:
+            with span("agent.run.stream", **{"thread.id": thread_id, "agent.id": agent_id,
+                                             "run.attempt": attempt}) as current, \
+                    project.agents.runs.stream(
+                        thread_id=thread_id,
+                        agent_id=agent_id,
+                        additional_instructions=additional_instructions,
+                    ) as stream:
+                for event_type, event_data, _ in stream:
+                    if isinstance(event_data, MessageDeltaChunk):
+                        if event_data.text:
+                            if first_token:
+                                current.add_event("first_token")
+                                first_token = False
+                            yield event_data.text
+
+                    elif isinstance(event_data, ThreadRun):
+                        current.set_attributes(run_attributes(event_data))
+                        ticket.settle(event_data)
+                        if event_data.status in (RunStatus.FAILED, RunStatus.CANCELLED, RunStatus.EXPIRED):
+                            if first_token and is_throttled(event_data.last_error):
+                                throttled = event_data
+                                break
+                            raise RuntimeError(f"Agent failed: {event_data.last_error}")
+
+                    elif event_type == AgentStreamEvent.ERROR:
+                        raise RuntimeError(f"Agent failed: {event_data}")
+
+                    elif event_type == AgentStreamEvent.DONE:
+                        break
+        except Exception as e:
+            if not (first_token and is_throttled(e)):
+                raise
+            throttled = e
+        finally:
+            scheduler.release(ticket)
+
+        if throttled is None:
+            return
+        _throttled(throttled, attempt, thread_id, session)
+
+
+async def _acquire_async(scheduler, session: str, prompt_tokens: int, retry: bool):
+    """
+    scheduler.acquire waited for off the event loop. The worker thread cannot be interrupted:
+    if the awaiting task is cancelled, the ticket it still gets is released instead of leaking.
+    """
+    lock = threading.Lock()
+    state = {"cancelled": False, "ticket": None}
+
+    def acquire():
+        ticket = scheduler.acquire(session, prompt_tokens, retry=retry)
+        with lock:
+            if state["cancelled"]:
+                scheduler.release(ticket)
+            else:
+                state["ticket"] = ticket
+        return ticket
+
+    try:
+        return await asyncio.to_thread(acquire)
+    except asyncio.CancelledError:
+        with lock:
+            state["cancelled"] = True
+            ticket = state["ticket"]
+        if ticket is not None:
+            # Admitted, but the result never reached this task
+            scheduler.release(ticket)
+        raise
+
+
+async def run_agent_async(client, agent_id: str, user_text: str, polling_interval: float = 1) -> str:
+    """
+    Async variant of run_agent on an azure.ai.agents.aio.AgentsClient.
+    The thread is deleted afterwards so batch runs do not leave threads behind.
+    Raises RuntimeError if the run fails.
+    """
+    from azure.ai.agents.models import ListSortOrder
+
+    scheduler = get_run_scheduler()
+    thread = await client.threads.create()
+    try:
+        await client.messages.create(thread_id=thread.id, role="user", content=user_text)
+
+        for attempt in range(RUN_RETRY_ATTEMPTS):
+            ticket = await _acquire_async(scheduler, "batch", count_tokens(user_text), attempt > 0)
+            try:
+                run = await client.runs.create_and_process(
+                    thread_id=thread.id,
+                    agent_id=agent_id,
+                    polling_interval=polling_interval,
+                )
+                ticket.settle(run)
+                throttled = run if run.status == "failed" and is_throttled(run.last_error) else None
+            except Exception as e:
+                if not is_throttled(e):
+                    raise
+                throttled = e
+            finally:
+                scheduler.release(ticket)
+            if throttled is None:
+                break
+            # The retry waits in the paused scheduler
+            _throttled(throttled, attempt, thread.id, "batch")
+
+        if run.status == "failed":
+            raise RuntimeError(f"Run failed: {run.last_error}")
+
+        pages = client.messages.list(
+            thread_id=thread.id,
+            run_id=run.id,
+            order=ListSortOrder.DESCENDING,
+            limit=ANSWER_PAGE_SIZE,
+        ).by_page()
+        page = await anext(pages, None)
+        if page is not None:
+            async for msg in page:
+                if msg.role == "assistant" and msg.text_messages:
+                    return msg.text_messages[-1].text.value
+
+        return "Agent doesn't return any response."
+    finally:
+        await client.threads.delete(thread.id)
@@ -0,0 +1,217 @@
+"""
+One chat turn of the CV agent, shared by app.py and benchmarks/bench_e2e.py:
+
+    chat = ChatSession(resolve_agent(), get_thread_pool(), answer_cache=get_answer_cache(),
+                       direct_retriever=get_direct_retriever())
+    plan = chat.plan(prompt)                        # "direct" | "cached" | "agent", shortlist
+    result = chat.respond(plan, on_delta=print)     # TurnResult(answer, ok, usage)
+
+plan() is the local work: direct-retrieval routing, pre-screening, answer cache lookup.
+respond() returns the search result or the cached answer as they are; otherwise it runs the agent
+on the session's Conversation thread (search filter, message, streamed or polled run) and records
+and caches the answer. Every turn is counted by services.telemetry.record_turn.
+"""
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from agents.agent_runner import apply_search_filter, create_and_process_run, get_run_answer, stream_run
+from agents.conversation import Conversation, count_tokens
+from agents.prompts import JD_INSTRUCTIONS, SHORTLIST_INSTRUCTIONS, build_jd_message, build_shortlist_message
+from services.candidate_profile import jd_filter
+from services.direct_retrieval import classify_intent, format_direct_answer
+from services.prescreen import candidate_filter, format_shortlist, get_prescreener
+from services.telemetry import record_turn, span
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# Turn config (env)
+# =========================
+# OData filter from the hard requirements of the JD (skills, years) before the search
+JD_PROFILE_FILTER = os.getenv("JD_PROFILE_FILTER", "1") == "1"
+# Candidates pre-scored locally (profiles) so the agent only explains them; 0 = off
+PRESCREEN_TOP = int(os.getenv("PRESCREEN_TOP", "5"))
+
+NO_ANSWER = "Agent can't response."
+
+
+@dataclass
+class TurnPlan:
+    prompt: str
+    mode: str                           # "direct" | "cached" | "agent"
+    message: str = ""                   # posted to the thread: the JD (and the shortlist)
+    instructions: str = ""              # additional instructions of the run
+    cache_template: str = ""            # answer cache key part besides the prompt and agent
+    shortlist: list = field(default_factory=list)
+    direct_answer: object = None        # services.direct_retrieval.DirectAnswer
+    cached_answer: str = None
+
+
+@dataclass
+class TurnResult:
+    answer: str
+    ok: bool
+    usage: object = None
+
+
+class ChatSession:
+    """
+    Per-session state: the Conversation (created with the first agent turn), the search filter
+    applied per thread and the session id the run scheduler queues by.
+
+    `agent` is an agents.agent_registry.ResolvedAgent. `prescreener` defaults to the process-wide
+    get_prescreener() (reloaded when the ingestion manifest changes).
+    """
+
+    def __init__(self, agent, thread_pool, answer_cache=None, direct_retriever=None, prescreener=None,
+                 prescreen_top: int = PRESCREEN_TOP, profile_filter: bool = JD_PROFILE_FILTER,
+                 session_id: str = None):
+        self.agent = agent
+        self.thread_pool = thread_pool
+        self.answer_cache = answer_cache
+        self.direct_retriever = direct_retriever
+        self.prescreener = prescreener
+        self.prescreen_top = prescreen_top
+        self.profile_filter = profile_filter
+        self.session_id = session_id or uuid.uuid4().hex
+        self.conversation = None
+        self.applied_filters = {}
+
+    @property
+    def project(self):
+        return self.thread_pool.project
+
+    # ---------- plan ----------
+    def _direct_answer(self, prompt: str):
+        intent = classify_intent(prompt) if self.direct_retriever is not None else None
+        if intent is None:
+            return None
+        try:
+            return self.direct_retriever.answer(intent)
+        except Exception:
+            # Search failure: the agent can still answer
+            logger.warning("Direct retrieval failed, falling back to the agent", exc_info=True)
+            return None
+
+    def _shortlist(self, prompt: str) -> list:
+        if self.prescreen_top <= 0:
+            return []
+        try:
+            return (self.prescreener or get_prescreener()).screen(prompt, top=self.prescreen_top)
+        except Exception:
+            # Unreadable manifest: the agent still evaluates, without a shortlist
+            logger.warning("Pre-screening failed, continuing without a shortlist", exc_info=True)
+            return []
+
+    def plan(self, prompt: str) -> TurnPlan:
+        direct_answer = self._direct_answer(prompt)
+        if direct_answer is not None:
+            return TurnPlan(prompt, "direct", direct_answer=direct_answer)
+
+        # The thread only holds the JD (and shortlist); the template goes in the run's instructions
+        shortlist = self._shortlist(prompt)
+        if shortlist:
+            message = build_shortlist_message(prompt, format_shortlist(shortlist))
+            instructions = SHORTLIST_INSTRUCTIONS
+            # Keyed by the full message: the shortlist changes when new CVs are ingested
+            cache_template = instructions + message
+        else:
+            message = build_jd_message(prompt)
+            instructions = cache_template = JD_INSTRUCTIONS
+
+        cached_answer = None
+        if self.answer_cache is not None:
+            cached_answer = self.answer_cache.get(prompt, self.agent.cache_key, cache_template)
+        return TurnPlan(prompt, "cached" if cached_answer is not None else "agent", message, instructions,
+                        cache_template, shortlist, cached_answer=cached_answer)
+
+    # ---------- respond ----------
+    def respond(self, plan: TurnPlan, stream: bool = True, on_delta=None) -> TurnResult:
+        """
+        Answer of `plan`. With `stream`, `on_delta(text)` is called for every answer delta of the run
+        (the direct and cached answers are returned whole).
+        """
+        start = time.perf_counter()
+        result = TurnResult(NO_ANSWER, False)
+        try:
+            if plan.mode == "direct":
+                result = TurnResult(format_direct_answer(plan.direct_answer), True)
+            elif plan.mode == "cached":
+                result = TurnResult(plan.cached_answer, True)
+            else:
+                result = self._run(plan, stream, on_delta)
+            return result
+        finally:
+            record_turn(
+                (time.perf_counter() - start) * 1000,
+                result.ok,
+                **{"turn.mode": "direct" if plan.mode == "direct" else "chat",
+                   "turn.cached": plan.mode == "cached", "turn.stream": stream},
+            )
+
+    def _search_filter(self, plan: TurnPlan) -> str:
+        if plan.shortlist:
+            # The search tool only retrieves CVs of the shortlisted candidates
+            return candidate_filter(plan.shortlist)
+        return jd_filter(plan.prompt) if self.profile_filter else ""
+
+    def _run(self, plan: TurnPlan, stream: bool, on_delta) -> TurnResult:
+        project = self.project
+        if self.conversation is None:
+            self.conversation = Conversation(project, self.thread_pool.acquire, self.thread_pool.release)
+        conversation = self.conversation
+
+        with span("chat.turn", **{"thread.tokens": conversation.tokens,
+                                  "conversation.rollovers": conversation.rollovers,
+                                  "shortlist.size": len(plan.shortlist), "turn.stream": stream}) as turn_span:
+            # Current thread of the session (a new one + summary once over the token budget)
+            thread_id = conversation.thread_for(plan.message)
+            turn_span.set_attribute("thread.id", thread_id)
+
+            search_filter = self._search_filter(plan)
+            if search_filter != self.applied_filters.get(thread_id, ""):
+                apply_search_filter(thread_id, search_filter, project=project)
+                self.applied_filters[thread_id] = search_filter
+
+            with span("agent.message.create", **{"thread.id": thread_id, "message.chars": len(plan.message)}):
+                project.agents.messages.create(thread_id=thread_id, role="user", content=plan.message)
+
+            # Estimated run size (thread + instructions), reserved in the deployment's TPM quota
+            prompt_tokens = conversation.tokens + count_tokens(plan.message) + count_tokens(plan.instructions)
+            usage = None
+            if stream:
+                pieces = []
+                for delta in stream_run(thread_id, self.agent.id, project=project,
+                                        additional_instructions=plan.instructions,
+                                        session=self.session_id, prompt_tokens=prompt_tokens):
+                    pieces.append(delta)
+                    if on_delta is not None:
+                        on_delta(delta)
+                answer = "".join(pieces)
+                ok = bool(answer)
+            else:
+                # Waits for admission (RPM/TPM quota); throttled (429) runs are retried with backoff
+                run = create_and_process_run(thread_id, self.agent.id, session=self.session_id,
+                                             prompt_tokens=prompt_tokens, project=project,
+                                             additional_instructions=plan.instructions)
+                usage = run.usage
+                if run.status == "failed":
+                    answer, ok = f"Agent failed: {run.last_error}", False
+                else:
+                    # Only the messages of this run, not the whole thread
+                    answer = get_run_answer(thread_id, run.id, project=project)
+                    ok = answer is not None
+            answer = answer or NO_ANSWER
+
+            conversation.record(plan.message, answer, prompt_tokens=usage.prompt_tokens if usage else None)
+            # Only successful answers are cached
+            if ok and self.answer_cache is not None:
+                self.answer_cache.put(plan.prompt, self.agent.cache_key, plan.cache_template, answer)
+        return TurnResult(answer, ok, usage)
+
+    def close(self) -> None:
+        if self.conversation is not None:
+            self.conversation.close()
@@ -0,0 +1,110 @@
+import os
+
+from services.telemetry import span
+
+# =========================
+# Conversation budget (env)
+# =========================
+# Tokens a thread may hold before the conversation rolls over to a new thread
+CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "8000"))
+# Tokens of the summary that seeds the new thread
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "600"))
+# Characters kept per question / answer in the summary
+SUMMARY_CHARS_PER_TURN = 400
+
+
+def _token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        # ~4 characters per token for English text
+        return lambda text: max(1, len(text) // 4)
+
+
+count_tokens = _token_counter()
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + " …"
+
+
+class Conversation:
+    """
+    One chat session on top of agent threads, with a token budget per thread.
+
+    Every turn adds the user message and the answer to the thread, and each run re-reads the
+    whole thread. Once the thread passes `budget` tokens, the next turn starts on a fresh thread
+    seeded with a compact summary of the earlier turns, so per-turn prompt size stays flat.
+
+    `acquire()` returns a new thread id and `release(thread_id)` disposes of one
+    (e.g. AgentThreadPool.acquire / AgentThreadPool.release).
+    """
+
+    def __init__(self, project, acquire, release, budget: int = CONVERSATION_TOKEN_BUDGET,
+                 summary_budget: int = SUMMARY_TOKEN_BUDGET):
+        self.project = project
+        self._acquire = acquire
+        self._release = release
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.thread_id = None
+        self.tokens = 0          # tokens currently held by the thread
+        self.turns = []          # (user_text, answer) of the whole session
+        self.rollovers = 0
+
+    def thread_for(self, user_text: str) -> str:
+        """Thread to post `user_text` to: the current one, or a new one if the turn would pass the budget."""
+        if self.thread_id is not None and self.tokens + count_tokens(user_text) > self.budget:
+            self._rollover()
+        if self.thread_id is None:
+            self.thread_id = self._acquire()
+            self.tokens = 0
+        return self.thread_id
+
+    def record(self, user_text: str, answer: str, prompt_tokens: int = None) -> None:
+        """
+        Accounts for a finished turn. `prompt_tokens` (run.usage.prompt_tokens) is the size the
+        service actually processed, including instructions and retrieved CV chunks.
+        """
+        self.turns.append((user_text, answer))
+        estimate = self.tokens + count_tokens(user_text) + count_tokens(answer)
+        self.tokens = max(estimate, (prompt_tokens or 0) + count_tokens(answer))
+
+    def summary(self) -> str:
+        """Most recent turns first, clipped, until the summary budget is used up."""
+        lines, used = [], 0
+        for number in range(len(self.turns), 0, -1):
+            user_text, answer = self.turns[number - 1]
+            block = (f"Turn {number} - recruiter: {_clip(user_text, SUMMARY_CHARS_PER_TURN)}\n"
+                     f"Turn {number} - agent: {_clip(answer, SUMMARY_CHARS_PER_TURN)}")
+            cost = count_tokens(block)
+            if used + cost > self.summary_budget:
+                if not lines:
+                    # Always keep the latest turn, clipped to the budget (~4 characters per token)
+                    lines.append(_clip(block, self.summary_budget * 4))
+                break
+            lines.insert(0, block)
+            used += cost
+        return "\n".join(lines)
+
+    def _rollover(self) -> None:
+        old_thread_id = self.thread_id
+        with span("conversation.rollover", **{"thread.id": old_thread_id, "thread.tokens": self.tokens,
+                                              "conversation.turns": len(self.turns)}):
+            summary = self.summary()
+            self.thread_id = self._acquire()
+            self.tokens = 0
+            self.rollovers += 1
+            if summary:
+                content = f"Summary of the earlier conversation (for context only):\n{summary}"
+                self.project.agents.messages.create(thread_id=self.thread_id, role="assistant", content=content)
+                self.tokens = count_tokens(content)
+        self._release(old_thread_id)
+
+    def close(self) -> None:
+        if self.thread_id is not None:
+            self._release(self.thread_id)
+            self.thread_id = None
@@ -0,0 +1,109 @@
+# =========================
+# JD EVALUATION PROMPT
+# =========================
+# Task + response format. Sent once per run as instructions (runs `additional_instructions`),
+# so it is not stored in the thread and not re-processed with every later turn.
+JD_INSTRUCTIONS = """
+You are evaluating candidate suitability for the job description in the latest user message.
+
+TASKS (FOLLOW STRICTLY IN ORDER):
+
+1. Extract the key requirements from the Job Description, including:
+   - Required role
+   - Required skills/technologies
+   - Required years of experience
+   - Industry/domain requirements
+
+2. Review the candidate CV retrieved from the system.
+   - Use ONLY information explicitly stated in the CV.
+   - Do NOT infer or assume missing experience.
+
+3. Compare the CV against EACH job requirement.
+
+4. Determine whether the candidate is:
+   - Suitable
+   - Partially suitable
+   - Not suitable
+
+RESPONSE FORMAT (MANDATORY, DO NOT ADD EXTRA TEXT):
+
+Job Requirements:
+- Role:
+- Skills:
+- Experience:
+- Industry:
+
+Candidate Evaluation:
+- Name:
+- Current background summary (FACTUAL ONLY):
+
+Requirement Match:
+- Role match:
+- Skill match:
+- Experience match:
+- Industry match:
+
+Missing or Weak Requirements:
+- ...
+
+Overall Suitability:
+- Suitability level: Suitable / Partially suitable / Not suitable
+- Justification (1–2 factual sentences only)
+
+"""
+
+# User message of a turn: only the job description
+JD_MESSAGE_TEMPLATE = """Job Description:
+{prompt}
+"""
+
+# Single self-contained message (instructions + JD), for one-shot threads such as batch screening.
+# {prompt} is replaced by the job description
+JD_PROMPT_TEMPLATE = JD_MESSAGE_TEMPLATE + JD_INSTRUCTIONS
+
+
+def build_jd_message(prompt: str) -> str:
+    return JD_MESSAGE_TEMPLATE.format(prompt=prompt)
+
+
+def build_jd_prompt(prompt: str) -> str:
+    return JD_PROMPT_TEMPLATE.format(prompt=prompt)
+
+
+# =========================
+# SHORTLIST EXPLANATION PROMPT
+# =========================
+# Used when the local pre-screening (services/prescreen.py) has already ranked the candidates:
+# the agent only verifies and explains the shortlist instead of matching every CV.
+SHORTLIST_INSTRUCTIONS = """
+You are explaining a candidate shortlist for the job description in the latest user message.
+The candidates were ranked by a deterministic pre-screening on their CV profiles
+(✓ = requirement met, ✗ = not met, ? = not stated in the CV).
+
+TASKS:
+1. For EACH shortlisted candidate, check the flags against the CV retrieved from the system.
+   - Use ONLY information explicitly stated in the CV.
+   - Correct a flag if the CV clearly contradicts it.
+2. Explain in 2–3 factual sentences why the candidate fits or does not fit.
+3. Keep the ranking unless the CV evidence contradicts it.
+
+RESPONSE FORMAT (MANDATORY, one block per candidate, in ranking order):
+
+- Name:
+- Matching requirements:
+- Missing or weak requirements:
+- Suitability level: Suitable / Partially suitable / Not suitable
+- Justification:
+
+"""
+
+SHORTLIST_MESSAGE_TEMPLATE = """Job Description:
+{prompt}
+
+Pre-screened shortlist:
+{shortlist}
+"""
+
+
+def build_shortlist_message(prompt: str, shortlist: str) -> str:
+    return SHORTLIST_MESSAGE_TEMPLATE.format(prompt=prompt, shortlist=shortlist)
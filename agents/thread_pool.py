@@ -0,0 +1,118 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.foundry_client import get_project_client
+from services.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+# Number of empty agent threads kept ready (env)
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "4"))
+
+
+class AgentThreadPool:
+    """
+    Keeps a few empty Foundry threads ready so a request does not pay the thread-create round trip.
+    Used threads are deleted and replaced in the background.
+    """
+
+    def __init__(self, project, size: int = THREAD_POOL_SIZE, endpoint: str = None):
+        # project=None: the shared client of `endpoint` is created by the first background
+        # replenish, so starting the pool does not wait for the Foundry SDK import
+        self._project = project
+        self.endpoint = endpoint
+        self.size = size
+        self._idle = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="agent-thread-pool")
+        self._closed = False
+
+    @property
+    def project(self):
+        if self._project is None:
+            self._project = get_project_client(self.endpoint)
+        return self._project
+
+    def start(self) -> "AgentThreadPool":
+        for _ in range(self.size):
+            self._executor.submit(self._replenish)
+        return self
+
+    def _replenish(self) -> None:
+        if self._closed or self._idle.qsize() >= self.size:
+            return
+        try:
+            with span("agent.thread.create", **{"thread.background": True}):
+                thread_id = self.project.agents.threads.create().id
+            self._idle.put(thread_id)
+        except Exception:
+            logger.warning("Could not pre-create agent thread", exc_info=True)
+
+    def _delete(self, thread_id: str) -> None:
+        try:
+            with span("agent.thread.delete", **{"thread.id": thread_id}):
+                self.project.agents.threads.delete(thread_id)
+        except Exception:
+            logger.warning("Could not delete agent thread %s", thread_id, exc_info=True)
+
+    def acquire(self) -> str:
+        """Returns the id of an empty thread; creates one inline if the pool is drained."""
+        try:
+            thread_id = self._idle.get_nowait()
+        except queue.Empty:
+            # Pool drained: the request pays the create round trip
+            with span("agent.thread.create", **{"thread.background": False}):
+                thread_id = self.project.agents.threads.create().id
+        self._executor.submit(self._replenish)
+        return thread_id
+
+    def release(self, thread_id: str) -> None:
+        """Gives back a used thread: it is deleted in the background and the pool refilled."""
+        if self._closed:
+            self._delete(thread_id)
+            return
+        self._executor.submit(self._delete, thread_id)
+        self._executor.submit(self._replenish)
+
+    def close(self) -> None:
+        """Stops background work and deletes the idle threads."""
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                self._delete(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def get_thread_pool(endpoint: str = None) -> AgentThreadPool:
+    """Process-wide thread pool for `endpoint` (default: FOUNDRY_PROJECT_ENDPOINT)."""
+    if endpoint is None:
+        from config.settings import FOUNDRY_PROJECT_ENDPOINT
+        endpoint = FOUNDRY_PROJECT_ENDPOINT
+    pool = _pools.get(endpoint)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(endpoint)
+            if pool is None:
+                pool = AgentThreadPool(None, endpoint=endpoint).start()
+                _pools[endpoint] = pool
+    return pool
+
+
+def close_thread_pools() -> None:
+    with _lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+# Registered after services.foundry_client, so it runs before the clients are closed
+atexit.register(close_thread_pools)
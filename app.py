@@ -1,10 +1,15 @@
 import os
+
 import streamlit as st
 from dotenv import load_dotenv
 
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import ListSortOrder
+from agents.agent_registry import resolve_agent
+from agents.chat import ChatSession
+from agents.thread_pool import get_thread_pool
+from services.answer_cache import get_answer_cache
+from services.direct_retrieval import get_direct_retriever
+from services.prescreen import format_shortlist
+from services.telemetry import configure_telemetry
 
 # =========================
 # ENV
@@ -12,10 +17,10 @@ from azure.ai.agents.models import ListSortOrder
 load_dotenv()
 
 FOUNDRY_PROJECT_ENDPOINT = os.getenv("FOUNDRY_PROJECT_ENDPOINT")
-FOUNDRY_AGENT_ID = os.getenv("FOUNDRY_AGENT_ID")
+# JD_PROFILE_FILTER (lọc CV theo yêu cầu bắt buộc của JD) và PRESCREEN_TOP: xem agents/chat.py
 
-if not FOUNDRY_PROJECT_ENDPOINT or not FOUNDRY_AGENT_ID:
-    st.error("Missing FOUNDRY_PROJECT_ENDPOINT or FOUNDRY_AGENT_ID in .env")
+if not FOUNDRY_PROJECT_ENDPOINT:
+    st.error("Missing FOUNDRY_PROJECT_ENDPOINT in .env")
     st.stop()
 
 # =========================
@@ -33,10 +38,23 @@ st.caption("Chat với CV Agent (Azure AI Search + Foundry Agent)")
 # =========================
 # INIT CLIENT
 # =========================
-project = AIProjectClient(
-    credential=DefaultAzureCredential(),
-    endpoint=FOUNDRY_PROJECT_ENDPOINT
-)
+# Tracing / metrics (TELEMETRY_EXPORTER, mặc định off); chỉ cấu hình một lần mỗi process
+configure_telemetry()
+
+# Process-wide thread pool: client (import Foundry SDK, credential, connection pool) và các thread
+# sẵn được tạo trong background, trang đầu tiên không phải đợi
+thread_pool = get_thread_pool(FOUNDRY_PROJECT_ENDPOINT)
+
+# Agent: FOUNDRY_AGENT_ID nếu được set, nếu không thì agent của agents/agent_factory.py
+# (chỉ tạo/cập nhật khi definition thay đổi; resolve một lần mỗi process)
+agent = resolve_agent(FOUNDRY_PROJECT_ENDPOINT)
+
+# Cache câu trả lời theo JD đã chuẩn hoá (None nếu ANSWER_CACHE_BACKEND=off)
+answer_cache = get_answer_cache()
+
+# Search client trên chunk index cho câu hỏi tra cứu / liệt kê
+# (None nếu DIRECT_RETRIEVAL=0 hoặc thiếu AZURE_SEARCH_ENDPOINT / AZURE_SEARCH_QUERY_KEY, mặc định là admin key)
+direct_retriever = get_direct_retriever()
 
 # =========================
 # SESSION STATE
@@ -44,16 +62,27 @@ project = AIProjectClient(
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-if "thread_id" not in st.session_state:
-    # TẠO THREAD DUY NHẤT
-    thread = project.agents.threads.create()
-    st.session_state.thread_id = thread.id
+# Turn logic dùng chung với benchmarks/bench_e2e.py (agents/chat.py): định tuyến direct search,
+# pre-screening, cache, Conversation (thread tạo lazily ở prompt đầu tiên, không tạo khi load trang)
+# và session id để run scheduler xếp hàng run theo session (round-robin giữa các session)
+if "chat" not in st.session_state:
+    st.session_state.chat = ChatSession(
+        agent, thread_pool, answer_cache=answer_cache, direct_retriever=direct_retriever
+    )
+chat = st.session_state.chat
 
 # =========================
 # SIDEBAR
 # =========================
 with st.sidebar:
     st.markdown("### ⚙️ Tuỳ chọn")
+    # Render câu trả lời theo từng token thay vì đợi run hoàn tất
+    stream_mode = st.toggle("⚡ Streaming response", value=True)
+    if chat.conversation is not None:
+        st.caption(
+            f"🧮 Thread context: ~{chat.conversation.tokens}/{chat.conversation.budget} tokens, "
+            f"{chat.conversation.rollovers} rollover(s)"
+        )
     # if st.button("🔄 Reset cuộc trò chuyện"):
     #     st.session_state.messages = []
     #     thread = project.agents.threads.create()
@@ -72,59 +101,6 @@ for msg in st.session_state.messages:
 # =========================
 prompt = st.chat_input("Nhập câu hỏi về CV...")
 
-##add context to prompt##
-enhanced_prompt = f"""
-You are evaluating candidate suitability for a specific job description.
-
-Job Description:
-{prompt}
-
-TASKS (FOLLOW STRICTLY IN ORDER):
-
-1. Extract the key requirements from the Job Description, including:
-   - Required role
-   - Required skills/technologies
-   - Required years of experience
-   - Industry/domain requirements
-
-2. Review the candidate CV retrieved from the system.
-   - Use ONLY information explicitly stated in the CV.
-   - Do NOT infer or assume missing experience.
-
-3. Compare the CV against EACH job requirement.
-
-4. Determine whether the candidate is:
-   - Suitable
-   - Partially suitable
-   - Not suitable
-
-RESPONSE FORMAT (MANDATORY, DO NOT ADD EXTRA TEXT):
-
-Job Requirements:
-- Role:
-- Skills:
-- Experience:
-- Industry:
-
-Candidate Evaluation:
-- Name:
-- Current background summary (FACTUAL ONLY):
-
-Requirement Match:
-- Role match:
-- Skill match:
-- Experience match:
-- Industry match:
-
-Missing or Weak Requirements:
-- ...
-
-Overall Suitability:
-- Suitability level: Suitable / Partially suitable / Not suitable
-- Justification (1–2 factual sentences only)
-
-"""
-
 if prompt:
     # Lưu & hiển thị user message
     st.session_state.messages.append({
@@ -132,50 +108,59 @@ if prompt:
         "content": prompt
     })
 
-    with st.chat_message("user"):
+    user_message = st.chat_message("user")
+    with user_message:
         st.markdown(prompt)
 
-    # Gửi message vào THREAD HIỆN TẠI
-    project.agents.messages.create(
-        thread_id=st.session_state.thread_id,
-        role="user",
-        content=enhanced_prompt
-    )
-
     # Run agent
     with st.chat_message("assistant"):
-        with st.spinner("🤖 Agent are analyzing CVs..."):
-            try:
-                run = project.agents.runs.create_and_process(
-                    thread_id=st.session_state.thread_id,
-                    agent_id=FOUNDRY_AGENT_ID
-                )
-
-                if run.status == "failed":
-                    answer = f"Agent failed: {run.last_error}"
+        # Câu trả lời (stream) được render vào đây; khi lỗi thì thay bằng thông báo lỗi
+        placeholder = st.empty()
+        try:
+            # Câu hỏi tra cứu / liệt kê được trả lời thẳng từ Azure AI Search; JD đã có trong cache được
+            # trả lời ngay; còn lại: shortlist (chấm điểm local trong vài ms) + run agent
+            plan = chat.plan(prompt)
+            if plan.shortlist:
+                with user_message:
+                    with st.expander(f"📋 Pre-screening shortlist ({len(plan.shortlist)})"):
+                        st.text(format_shortlist(plan.shortlist))
+
+            if plan.mode == "agent":
+                if stream_mode:
+                    # Render các delta ngay khi tới
+                    streamed = []
+
+                    def show_delta(delta):
+                        streamed.append(delta)
+                        placeholder.markdown("".join(streamed) + "▌")
+
+                    result = chat.respond(plan, stream=True, on_delta=show_delta)
+                else:
+                    with st.spinner("🤖 Agent are analyzing CVs..."):
+                        result = chat.respond(plan, stream=False)
+                placeholder.markdown(result.answer)
+            else:
+                result = chat.respond(plan)
+                placeholder.markdown(result.answer)
+                if plan.mode == "direct":
+                    # Kết quả search (ứng viên + đoạn được highlight), không run agent
+                    st.caption(f"🔎 Direct search ({plan.direct_answer.elapsed_ms:.0f} ms), agent not called")
                 else:
-                    messages = project.agents.messages.list(
-                        thread_id=st.session_state.thread_id,
-                        order=ListSortOrder.ASCENDING
-                    )
-
-                    answer = "Agent can't response."
-                    for m in messages:
-                        if m.role == "assistant" and m.text_messages:
-                            answer = m.text_messages[-1].text.value
-
-                st.markdown(answer)
-
-                # Lưu assistant message
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": answer
-                })
-
-            except Exception as e:
-                error_msg = f"Error when calling agent: {e}"
-                st.error(error_msg)
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": error_msg
-                })
+                    # JD đã được đánh giá: trả lời ngay, không cần run agent
+                    st.caption("⚡ Cached answer")
+            answer = result.answer
+
+            # Lưu assistant message
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": answer
+            })
+
+        except Exception as e:
+            error_msg = f"Error when calling agent: {e}"
+            # Thay phần trả lời dở dang (và con trỏ "▌") bằng thông báo lỗi
+            placeholder.error(error_msg)
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": error_msg
+            })
@@ -0,0 +1,100 @@
+"""
+Per-turn answer retrieval: full ascending listing vs. run-filtered newest-first first page.
+
+Runs offline against an in-memory messages API that charges a fixed latency per page,
+like the Foundry service does per round trip.
+
+    python benchmarks/bench_answer_retrieval.py --page-latency-ms 40
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import statistics
+import time
+from types import SimpleNamespace
+
+from azure.core.paging import ItemPaged
+from azure.ai.agents.models import ListSortOrder
+
+from agents.agent_runner import get_run_answer
+
+SERVER_PAGE_SIZE = 20  # Foundry default page size for messages.list
+
+
+class FakeMessages:
+    def __init__(self, messages, page_latency: float):
+        self._messages = messages
+        self._page_latency = page_latency
+        self.pages_fetched = 0
+
+    def list(self, thread_id, run_id=None, order=ListSortOrder.DESCENDING, limit=SERVER_PAGE_SIZE, **kwargs):
+        items = [m for m in self._messages if run_id is None or m.run_id == run_id]
+        if order == ListSortOrder.DESCENDING:
+            items = items[::-1]
+
+        def get_next(token):
+            time.sleep(self._page_latency)
+            self.pages_fetched += 1
+            return token or 0
+
+        def extract_data(start):
+            end = start + limit
+            return (end if end < len(items) else None), iter(items[start:end])
+
+        return ItemPaged(get_next, extract_data)
+
+
+def _make_thread(turns: int):
+    messages = []
+    for i in range(turns):
+        run_id = f"run_{i}"
+        text = SimpleNamespace(text=SimpleNamespace(value=f"answer {i}"))
+        messages.append(SimpleNamespace(role="user", run_id=None, text_messages=[]))
+        messages.append(SimpleNamespace(role="assistant", run_id=run_id, text_messages=[text]))
+    return messages
+
+
+def _legacy_answer(project, thread_id):
+    # Behaviour before user-003: list the whole thread ascending, keep the last assistant text
+    answer = None
+    for m in project.agents.messages.list(thread_id=thread_id, order=ListSortOrder.ASCENDING):
+        if m.role == "assistant" and m.text_messages:
+            answer = m.text_messages[-1].text.value
+    return answer
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[1, 5, 10, 25, 50, 100])
+    parser.add_argument("--page-latency-ms", type=float, default=40.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'turns':>6} {'messages':>9} {'legacy ms':>10} {'run-filtered ms':>16}")
+    for turns in args.turns:
+        fake = FakeMessages(_make_thread(turns), args.page_latency_ms / 1000)
+        project = SimpleNamespace(agents=SimpleNamespace(messages=fake))
+        last_run = f"run_{turns - 1}"
+
+        assert _legacy_answer(project, "thread") == get_run_answer("thread", last_run, project=project)
+
+        legacy = _time(lambda: _legacy_answer(project, "thread"), args.repeat)
+        current = _time(lambda: get_run_answer("thread", last_run, project=project), args.repeat)
+        print(f"{turns:>6} {turns * 2:>9} {legacy:>10.1f} {current:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Chunking settings benchmark: chunk count, total tokens and retrieval quality per setting.
+
+    python benchmarks/bench_chunking.py --cvs ./sample_cvs --queries queries.jsonl
+
+--cvs        folder of CV files (.pdf, .docx, .txt)
+--queries    optional JSONL: {"query": "...", "candidate_ids": ["cv_file_name.pdf", ...]}
+             retrieval quality = recall@k of the expected CVs in the top-k BM25 chunks
+--reference  optional JSONL of chunks exported from the index ({"candidate_id", "text"}):
+             reports how many of them the local "pages" chunker reproduces exactly
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+import math
+import re
+from collections import Counter, defaultdict
+
+from services.chunker import split_pages, split_sections
+from services.extraction import extract_text
+
+SETTINGS = [
+    # (label, mode, max_length, overlap)
+    ("pages 1400/350 (current)", "pages", 1400, 350),
+    ("pages 1400/140", "pages", 1400, 140),
+    ("pages 1400/0", "pages", 1400, 0),
+    ("pages 2000/200", "pages", 2000, 200),
+    ("sections 1400/0", "sections", 1400, 0),
+    ("sections 1400/140", "sections", 1400, 140),
+]
+
+_WORD = re.compile(r"\w+")
+
+
+def _token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        # ~4 characters per token for English text
+        return lambda text: max(1, len(text) // 4)
+
+
+class _BM25:
+    def __init__(self, texts, k1=1.2, b=0.75):
+        self.k1, self.b = k1, b
+        self.docs = [Counter(_WORD.findall(t.lower())) for t in texts]
+        self.lengths = [sum(d.values()) for d in self.docs]
+        self.avg_length = sum(self.lengths) / max(1, len(self.lengths))
+        df = Counter(term for d in self.docs for term in d)
+        n = len(self.docs)
+        self.idf = {t: math.log(1 + (n - f + 0.5) / (f + 0.5)) for t, f in df.items()}
+
+    def top(self, query, k):
+        terms = _WORD.findall(query.lower())
+        scores = []
+        for i, doc in enumerate(self.docs):
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_length)
+            score = sum(
+                self.idf.get(t, 0) * doc[t] * (self.k1 + 1) / (doc[t] + norm)
+                for t in terms if t in doc
+            )
+            scores.append((score, i))
+        return [i for score, i in sorted(scores, reverse=True)[:k] if score > 0]
+
+
+def _chunk(text, mode, max_length, overlap):
+    if mode == "pages":
+        return split_pages(text, max_length, overlap)
+    return [chunk for _, chunk in split_sections(text, max_length, overlap)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cvs", required=True)
+    parser.add_argument("--queries")
+    parser.add_argument("--reference")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    cvs = {}
+    for path in sorted(Path(args.cvs).iterdir()):
+        if path.suffix.lower() in (".pdf", ".docx", ".txt"):
+            cvs[path.name] = extract_text(path.name, path.read_bytes())
+    if not cvs:
+        print("No CV files found in", args.cvs)
+        return
+
+    queries = []
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [json.loads(line) for line in f if line.strip()]
+
+    count_tokens = _token_counter()
+    baseline_tokens = None
+    print(f"{len(cvs)} CVs, {len(queries)} queries, k={args.k}\n")
+    print(f"{'setting':<26} {'chunks':>7} {'tokens':>9} {'vs current':>10} {'recall@k':>9} {'distinct@k':>10}")
+
+    for label, mode, max_length, overlap in SETTINGS:
+        chunk_texts, owners = [], []
+        for name, text in cvs.items():
+            for chunk in _chunk(text, mode, max_length, overlap):
+                chunk_texts.append(chunk)
+                owners.append(name)
+
+        tokens = sum(count_tokens(c) for c in chunk_texts)
+        baseline_tokens = baseline_tokens or tokens
+
+        recall = distinct = float("nan")
+        if queries:
+            index = _BM25(chunk_texts)
+            hits, distinct_total = 0.0, 0
+            for q in queries:
+                top_owners = [owners[i] for i in index.top(q["query"], args.k)]
+                expected = set(q["candidate_ids"])
+                hits += len(expected & set(top_owners)) / len(expected)
+                distinct_total += len(set(top_owners))
+            recall = hits / len(queries)
+            distinct = distinct_total / len(queries)
+
+        print(f"{label:<26} {len(chunk_texts):>7} {tokens:>9} {tokens / baseline_tokens:>9.0%} "
+              f"{recall:>9.3f} {distinct:>10.2f}")
+
+    if args.reference:
+        by_candidate = defaultdict(set)
+        with open(args.reference, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    by_candidate[item["candidate_id"]].add(item["text"].strip())
+        total = matched = 0
+        for name, expected in by_candidate.items():
+            if name in cvs:
+                local = set(split_pages(cvs[name]))
+                total += len(expected)
+                matched += len(expected & local)
+        print(f"\nSplitSkill parity: {matched}/{total} reference chunks reproduced exactly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Direct retrieval (services/direct_retrieval.py): intent routing and answer latency.
+
+Checks the routing of a labeled set of questions (list / lookup / agent), then answers the
+list and lookup questions over synthetic CV chunks, in process (LocalSearchClient) and through
+the azure-search-documents SearchClient against the search stub (stubs/search_server.py).
+
+    python benchmarks/bench_direct_retrieval.py --cvs 2000 --search-latency-ms 30
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import statistics
+
+from services.direct_retrieval import DirectRetriever, classify_intent
+from services.local_search import LocalSearchClient, LocalSearchIndex
+from stubs.search_server import start_search_stub, synthetic_chunks
+
+# (question, expected route)
+QUESTIONS = [
+    ("which CVs mention Kubernetes?", "list"),
+    ("Which candidates know Python and Kafka", "list"),
+    ("list all candidates with Terraform experience", "list"),
+    ("who has worked with Airflow?", "list"),
+    ("how many CVs mention docker", "list"),
+    ("ứng viên nào biết Java?", "list"),
+    ("Liệt kê các CV có React", "list"),
+    ("show me the CV of cv_00012.pdf", "lookup"),
+    ("show me candidate cv_00042's CV", "lookup"),
+    ("cv_00007.pdf", "lookup"),
+    ("CV của cv_00100", "lookup"),
+    ("Which candidate is the best fit for a senior Python role?", "agent"),
+    ("Compare cv_00001.pdf and cv_00002.pdf", "agent"),
+    ("Senior backend engineer\nRequirements: 5+ years of Python, SQL", "agent"),
+    ("Đánh giá ứng viên phù hợp cho vị trí Data Engineer", "agent"),
+    ("Why is cv_00003.pdf ranked first?", "agent"),
+    ("which CVs", "agent"),
+    ("Which candidates don't have Java?", "agent"),
+    ("who knows Python but not Java", "agent"),
+    ("Ứng viên nào không biết Java?", "agent"),
+    ("Get candidates who worked at Google or Microsoft", "agent"),
+    ("Find candidates for a senior Java developer role with 5 years of experience", "agent"),
+    ("Who has more than 5 years of Python?", "agent"),
+    ("Which CVs mention at least 3 years of Docker", "agent"),
+    ("show me the profile for a senior Java developer", "agent"),
+    ("What CVs do you have?", "agent"),
+    ("which cv is missing email", "agent"),
+    ("list CVs without a phone number", "agent"),
+    ("CV nào thiếu email?", "agent"),
+]
+
+
+def route(question: str) -> str:
+    intent = classify_intent(question)
+    return intent.kind if intent else "agent"
+
+
+def bench(retriever: DirectRetriever, repeat: int) -> dict:
+    timings = {"list": [], "lookup": []}
+    for _ in range(repeat):
+        for question, expected in QUESTIONS:
+            if expected == "agent":
+                continue
+            answer = retriever.answer(classify_intent(question))
+            if answer is not None:
+                timings[expected].append(answer.elapsed_ms)
+    return timings
+
+
+def report(name: str, timings: dict) -> None:
+    for kind, values in timings.items():
+        if not values:
+            print(f"{name:<12} {kind:<7} no answer")
+            continue
+        values = sorted(values)
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        print(f"{name:<12} {kind:<7} n={len(values):<4} p50 {statistics.median(values):7.1f} ms   "
+              f"p95 {p95:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cvs", type=int, default=2000, help="Synthetic CVs (4 chunks each)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--search-latency-ms", type=float, default=0.0, help="Added to every stub request")
+    args = parser.parse_args()
+
+    misrouted = [(q, expected, route(q)) for q, expected in QUESTIONS if route(q) != expected]
+    print(f"routing: {len(QUESTIONS) - len(misrouted)}/{len(QUESTIONS)} as expected")
+    for question, expected, actual in misrouted:
+        print(f"  {question!r}: {actual} (expected {expected})")
+
+    chunks = synthetic_chunks(args.cvs)
+    index = LocalSearchIndex(chunks)
+    report("in-process", bench(DirectRetriever(LocalSearchClient(index)), args.repeat))
+
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents import SearchClient
+
+    server, endpoint = start_search_stub(documents=chunks, latency=args.search_latency_ms / 1000)
+    try:
+        client = SearchClient(endpoint, "cv-index", AzureKeyCredential("stub"))
+        report("search stub", bench(DirectRetriever(client), args.repeat))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""
+End-to-end latency of a chat turn, offline against local stubs of the Foundry Agents API
+(stubs/foundry_server.py) and Azure AI Search (stubs/search_server.py).
+
+    python benchmarks/bench_e2e.py --sessions 1 4 16 --turns 5
+    python benchmarks/bench_e2e.py --save-baseline .cache/bench_e2e.json
+    python benchmarks/bench_e2e.py --baseline .cache/bench_e2e.json     # exits 1 on regression
+
+Modes:
+  chat     the app.py turn (agents/chat.py): routing, pre-screening, answer cache lookup,
+           Conversation thread, search filter, message, run (streamed, or --no-stream:
+           create_and_process + get_run_answer)
+  runner   agent_runner.run_agent: pooled thread, search filter, message, run, answer
+
+Every stub request costs --foundry-latency-ms / --search-latency-ms. A run calls the search
+tool (a query against the Search stub with the thread's filter), then takes the rest of --run-ms.
+
+Phases are measured per turn on the requests of the session itself (a per-call pipeline
+policy); work the thread pool does in the background is off the critical path and not counted:
+  plan (direct-retrieval routing, pre-screening, answer cache lookup), thread_create,
+  thread_update (search filter), message_create, retrieval, run (message posted .. last poll /
+  last delta, admission wait included), ttft (streaming), message_list, turn.
+
+Model quota: --stub-rpm / --stub-tpm make the Foundry stub fail runs over the quota with
+rate_limit_exceeded (per --rate-window-s); --admission-rpm / --admission-tpm size the run scheduler
+(services/admission.py) buckets. Each level reports the admitted runs, throttled runs and mean
+admission wait, e.g. a burst against a small quota with and without admission control:
+
+    python benchmarks/bench_e2e.py --sessions 16 --stub-rpm 20 --rate-window-s 5
+    python benchmarks/bench_e2e.py --sessions 16 --stub-rpm 20 --rate-window-s 5 --admission-rpm 18
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from azure.core.pipeline.policies import SansIOHTTPPolicy
+
+from stubs.foundry_server import StubCredential, start_stub_server, stub_client_kwargs
+from stubs.search_server import start_search_stub, synthetic_chunks
+
+JD = """Senior Python Developer
+Requirements:
+- At least 5 years of experience with Python, SQL and Docker
+Nice to have: Kubernetes, Kafka, Azure
+Domain: banking / payments"""
+
+PERCENTILES = (50, 95, 99)
+# Request (method, path suffix) -> phase
+_PHASES = [
+    ("POST", re.compile(r"/threads$"), "thread_create"),
+    ("POST", re.compile(r"/threads/[^/]+$"), "thread_update"),
+    ("DELETE", re.compile(r"/threads/[^/]+$"), "thread_delete"),
+    ("POST", re.compile(r"/threads/[^/]+/messages$"), "message_create"),
+    ("GET", re.compile(r"/threads/[^/]+/messages$"), "message_list"),
+    ("POST", re.compile(r"/threads/[^/]+/runs$"), "run"),
+    ("GET", re.compile(r"/threads/[^/]+/runs/[^/]+$"), "run"),
+    ("GET", re.compile(r"/connections/[^/]+$"), "connection"),
+]
+# Unique tag in every prompt: ties the search tool call (made by the stub) to its turn
+_REF = re.compile(r"\(ref ([\w-]+)\)")
+
+_local = threading.local()
+_by_ref = {}
+_by_ref_lock = threading.Lock()
+
+
+# =========================
+# Per-turn phase recording
+# =========================
+class TurnRecorder:
+    def __init__(self):
+        self.spans = defaultdict(list)
+
+    def add(self, phase: str, start: float, end: float) -> None:
+        self.spans[phase].append((start, end))
+
+    def phases(self) -> dict:
+        """Milliseconds per phase: from the first request of the phase to the end of the last one."""
+        return {
+            phase: (max(end for _, end in spans) - min(start for start, _ in spans)) * 1000
+            for phase, spans in self.spans.items()
+        }
+
+
+class PhasePolicy(SansIOHTTPPolicy):
+    """Records each request of the calling thread's current turn under its phase."""
+
+    def on_request(self, request):
+        request.context["bench_start"] = time.perf_counter()
+
+    def on_response(self, request, response):
+        recorder = getattr(_local, "recorder", None)
+        if recorder is None:
+            return
+        http_request = request.http_request
+        path = http_request.url.split("?", 1)[0]
+        phase = next(
+            (name for method, pattern, name in _PHASES if method == http_request.method and pattern.search(path)),
+            "other",
+        )
+        recorder.add(phase, request.context["bench_start"], time.perf_counter())
+
+
+def _search_tool(search_client):
+    """Stub `tool_fn`: the agent's search tool call, with the filter stored on the thread."""
+
+    def tool(thread, prompt_text):
+        indexes = (thread.get("tool_resources") or {}).get("azure_ai_search", {}).get("indexes") or [{}]
+        start = time.perf_counter()
+        list(search_client.search(search_text=prompt_text[:500], filter=indexes[0].get("filter") or None,
+                                  top=indexes[0].get("top_k") or 5))
+        ref = _REF.search(prompt_text)
+        recorder = _by_ref.get(ref.group(1)) if ref else None
+        if recorder is not None:
+            recorder.add("retrieval", start, time.perf_counter())
+
+    return tool
+
+
+# =========================
+# Turns
+# =========================
+_session_ids = itertools.count()
+
+
+class ChatSession:
+    """
+    An app.py session: the turn is agents.chat.ChatSession (routing, pre-screening, answer cache,
+    Conversation thread, search filter, message, run), timed around its plan and its answer deltas.
+    """
+
+    def __init__(self, pool, agent, prescreener, prescreen_top: int, stream: bool, answer_cache=None,
+                 direct_retriever=None):
+        from agents.chat import ChatSession as Chat
+
+        self.stream = stream
+        self.chat = Chat(agent, pool, answer_cache=answer_cache, direct_retriever=direct_retriever,
+                         prescreener=prescreener, prescreen_top=prescreen_top,
+                         session_id=f"s{next(_session_ids)}")
+
+    def turn(self, prompt: str, recorder: TurnRecorder) -> str:
+        start = time.perf_counter()
+        plan = self.chat.plan(prompt)
+        recorder.add("plan", start, time.perf_counter())
+
+        deltas = []
+        result = self.chat.respond(plan, stream=self.stream, on_delta=lambda _: deltas.append(time.perf_counter()))
+        if plan.mode == "agent":
+            # The run starts once the message is posted (admission wait included)
+            sent = max(end for _, end in recorder.spans["message_create"])
+            recorder.add("run", sent, deltas[-1] if deltas else sent)
+            if deltas:
+                recorder.add("ttft", sent, deltas[0])
+        return result.answer
+
+    def close(self):
+        self.chat.close()
+
+
+class RunnerSession:
+    """Stateless turns through agent_runner.run_agent (pooled thread per turn)."""
+
+    def __init__(self, agent_id):
+        self.agent_id = agent_id
+
+    def turn(self, prompt: str, recorder: TurnRecorder) -> str:
+        from agents.agent_runner import run_agent
+        from services.candidate_profile import jd_filter
+
+        return run_agent(self.agent_id, prompt, search_filter=jd_filter(prompt))
+
+    def close(self):
+        pass
+
+
+_refs = itertools.count()
+
+
+def timed_turn(session, recorder: TurnRecorder) -> None:
+    ref = f"t{next(_refs)}"
+    with _by_ref_lock:
+        _by_ref[ref] = recorder
+    _local.recorder = recorder
+    start = time.perf_counter()
+    try:
+        session.turn(f"{JD}\n(ref {ref})", recorder)
+    finally:
+        recorder.add("turn", start, time.perf_counter())
+        _local.recorder = None
+        with _by_ref_lock:
+            _by_ref.pop(ref, None)
+
+
+def run_level(make_session, sessions: int, turns: int) -> dict:
+    """`sessions` concurrent sessions of `turns` sequential turns each."""
+
+    def session_worker(_):
+        session = make_session()
+        recorders, errors = [], 0
+        try:
+            for _ in range(turns):
+                recorder = TurnRecorder()
+                try:
+                    timed_turn(session, recorder)
+                    recorders.append(recorder)
+                except Exception as e:
+                    errors += 1
+                    print(f"  turn failed: {e}")
+        finally:
+            session.close()
+        return recorders, errors
+
+    from services.admission import get_run_scheduler
+
+    before = get_run_scheduler().stats()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        outcomes = list(executor.map(session_worker, range(sessions)))
+    elapsed = time.perf_counter() - start
+    after = get_run_scheduler().stats()
+    admitted = after["admitted"] - before["admitted"]
+    wait_ms = after["avg_wait_ms"] * after["admitted"] - before["avg_wait_ms"] * before["admitted"]
+
+    samples = defaultdict(list)
+    for recorders, _ in outcomes:
+        for recorder in recorders:
+            for phase, ms in recorder.phases().items():
+                samples[phase].append(ms)
+    completed = sum(len(recorders) for recorders, _ in outcomes)
+    return {
+        "turns": completed,
+        "errors": sum(errors for _, errors in outcomes),
+        "throughput": completed / elapsed if elapsed else 0.0,
+        "admission": {
+            "admitted": admitted,
+            "throttled": after["throttled"] - before["throttled"],
+            "avg_wait_ms": wait_ms / admitted if admitted else 0.0,
+        },
+        "phases": {
+            phase: {"n": len(values), **{f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}}
+            for phase, values in samples.items()
+        },
+    }
+
+
+# =========================
+# Report / baseline
+# =========================
+PHASE_ORDER = ["plan", "connection", "thread_create", "thread_update", "message_create", "retrieval",
+               "ttft", "run", "message_list", "thread_delete", "other", "turn"]
+
+
+def print_level(sessions: int, result: dict) -> None:
+    admission = result["admission"]
+    print(f"\nsessions={sessions}  turns={result['turns']}  errors={result['errors']}  "
+          f"throughput={result['throughput']:.2f} turns/s")
+    print(f"  runs admitted={admission['admitted']}  throttled={admission['throttled']}  "
+          f"mean admission wait={admission['avg_wait_ms']:.1f} ms")
+    print(f"  {'phase':<15} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    phases = result["phases"]
+    for phase in sorted(phases, key=lambda p: PHASE_ORDER.index(p) if p in PHASE_ORDER else len(PHASE_ORDER)):
+        stats = phases[phase]
+        print(f"  {phase:<15} {stats['n']:>5} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """Regressions against `baseline`: p95 of a phase or throughput worse by more than `tolerance`."""
+    regressions = []
+    for level, result in results.items():
+        base = baseline["results"].get(level)
+        if base is None:
+            continue
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"sessions={level} throughput {base['throughput']:.2f} -> {result['throughput']:.2f} turns/s")
+        for phase, stats in result["phases"].items():
+            before = base["phases"].get(phase)
+            if before is None:
+                continue
+            if stats["p95"] > before["p95"] * (1 + tolerance) and stats["p95"] - before["p95"] > min_delta_ms:
+                regressions.append(f"sessions={level} {phase} p95 {before['p95']:.1f} -> {stats['p95']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["chat", "runner"], default="chat")
+    parser.add_argument("--no-stream", dest="stream", action="store_false",
+                        help="chat mode: create_and_process + get_run_answer instead of streaming")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels")
+    parser.add_argument("--turns", type=int, default=5, help="Sequential turns per session")
+    parser.add_argument("--foundry-latency-ms", type=float, default=20.0)
+    parser.add_argument("--search-latency-ms", type=float, default=30.0)
+    parser.add_argument("--run-ms", type=float, default=500.0, help="Model time of a run (after the search tool)")
+    parser.add_argument("--delta-ms", type=float, default=2.0, help="Delay between streamed deltas")
+    parser.add_argument("--cvs", type=int, default=500, help="Synthetic CVs in the Search stub / pre-screener")
+    parser.add_argument("--prescreen-top", type=int, default=5, help="chat mode: shortlist size (0 disables)")
+    parser.add_argument("--pool-size", type=int, default=4, help="THREAD_POOL_SIZE")
+    parser.add_argument("--stub-rpm", type=int, default=0, help="Runs per window before the stub throttles (0 = none)")
+    parser.add_argument("--stub-tpm", type=int, default=0, help="Prompt tokens per window (0 = none)")
+    parser.add_argument("--rate-window-s", type=float, default=60.0, help="Quota window of the stub")
+    parser.add_argument("--admission-rpm", type=int, default=0,
+                        help="Runs per window admitted by the run scheduler (0 = no request bucket)")
+    parser.add_argument("--admission-tpm", type=int, default=0,
+                        help="Tokens per window admitted by the run scheduler (0 = no token bucket)")
+    parser.add_argument("--max-concurrent-runs", type=int, default=16, help="ADMISSION_MAX_CONCURRENT_RUNS")
+    parser.add_argument("--retry-base-s", type=float, default=2.0, help="RUN_RETRY_BASE_SECONDS")
+    parser.add_argument("--baseline", help="Compare with this baseline JSON; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="Write the results as a baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=10.0, help="Ignore p95 regressions below this")
+    args = parser.parse_args()
+
+    config = {k: v for k, v in vars(args).items() if k not in ("baseline", "save_baseline", "sessions")}
+    index_name = os.getenv("AI_SEARCH_INDEX_NAME") or "cv-index"
+    chunks = synthetic_chunks(args.cvs)
+
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents import SearchClient
+
+    search_server, search_endpoint = start_search_stub(
+        documents=chunks, index_name=index_name, latency=args.search_latency_ms / 1000
+    )
+    search_client = SearchClient(search_endpoint, index_name, AzureKeyCredential("stub"))
+    foundry_server, endpoint = start_stub_server(
+        latency=args.foundry_latency_ms / 1000,
+        run_seconds=args.run_ms / 1000,
+        delta_seconds=args.delta_ms / 1000,
+        tool_fn=_search_tool(search_client),
+        rpm_limit=args.stub_rpm,
+        tpm_limit=args.stub_tpm,
+        rate_window=args.rate_window_s,
+    )
+
+    # Project settings resolve to the stubs; must be set before the project modules are imported
+    os.environ["FOUNDRY_PROJECT_ENDPOINT"] = endpoint
+    os.environ.setdefault("FOUNDRY_MODEL_DEPLOYMENT_NAME", "stub-model")
+    os.environ.setdefault("AZURE_AI_SEARCH_CONNECTION_NAME", "stub-search")
+    os.environ["AI_SEARCH_INDEX_NAME"] = index_name
+    os.environ["THREAD_POOL_SIZE"] = str(args.pool_size)
+    # The stub's quota is per --rate-window-s: the buckets are scaled to per-minute rates
+    per_minute = 60 / args.rate_window_s
+    os.environ["ADMISSION_RPM"] = str(int(args.admission_rpm * per_minute))
+    os.environ["ADMISSION_TPM"] = str(int(args.admission_tpm * per_minute))
+    os.environ["ADMISSION_BURST_SECONDS"] = str(args.rate_window_s / 6)
+    os.environ["ADMISSION_MAX_CONCURRENT_RUNS"] = str(args.max_concurrent_runs)
+    os.environ["RUN_RETRY_BASE_SECONDS"] = str(args.retry_base_s)
+
+    from agents.agent_registry import ResolvedAgent
+    from agents.thread_pool import close_thread_pools, get_thread_pool
+    from services.answer_cache import get_answer_cache
+    from services.direct_retrieval import DirectRetriever
+    from services.foundry_client import get_project_client
+    from services.prescreen import PreScreener
+
+    # Registered first: every later get_project_client(endpoint) call reuses this stub client
+    project = get_project_client(endpoint, credential=StubCredential(), per_call_policies=[PhasePolicy()],
+                                 **stub_client_kwargs())
+    pool = get_thread_pool(endpoint)
+    agent_id = project.agents.create_agent(model="stub-model", name="bench-e2e", instructions="").id
+    agent = ResolvedAgent(agent_id, "bench-e2e", "created")
+    # Same answer cache and routing as app.py; every prompt carries a unique ref, so the cache
+    # lookup is measured but never hits
+    answer_cache = get_answer_cache()
+    direct_retriever = DirectRetriever(search_client)
+    profiles = {
+        doc["candidate_id"]: {"skills": doc["skills"], "years_experience": doc["years_experience"],
+                              "seniority": None, "current_role": None, "domain": doc["domain"]}
+        for doc in chunks
+    }
+    prescreener = PreScreener(profiles)
+
+    if args.mode == "chat":
+        def make_session():
+            return ChatSession(pool, agent, prescreener, args.prescreen_top, args.stream,
+                               answer_cache=answer_cache, direct_retriever=direct_retriever)
+    else:
+        def make_session():
+            return RunnerSession(agent_id)
+
+    mode = args.mode + (" (stream)" if args.mode == "chat" and args.stream else "")
+    print(f"mode={mode}  foundry latency={args.foundry_latency_ms:g} ms  search latency={args.search_latency_ms:g} ms  "
+          f"run={args.run_ms:g} ms  thread pool={args.pool_size}")
+
+    # Warm-up: connection lookup, keep-alive connections, pre-created threads
+    run_level(make_session, 1, 1)
+
+    results = {}
+    try:
+        for sessions in args.sessions:
+            results[str(sessions)] = run_level(make_session, sessions, args.turns)
+            print_level(sessions, results[str(sessions)])
+    finally:
+        # Idle pooled threads are deleted while the stub is still up
+        close_thread_pools()
+        foundry_server.shutdown()
+        search_server.shutdown()
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+        print(f"\nBaseline saved: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print("\nWarning: baseline was recorded with different settings: "
+                  + ", ".join(f"{k}={baseline.get('config', {}).get(k)!r}->{v!r}"
+                              for k, v in config.items() if baseline.get("config", {}).get(k) != v))
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regression against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Import time of every entry point (app.py, scripts/*.py), measured with `python -X importtime`.
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --save-baseline .cache/bench_import_time.json
+    python benchmarks/bench_import_time.py --baseline .cache/bench_import_time.json   # exits 1 on regression
+
+For each entry point, its module-level imports (read with ast, the script itself is not run) are
+executed in a fresh interpreter. The time is the sum of the top-level `-X importtime` entries, the
+median of --repeat runs; the heaviest top-level imports are listed next to it.
+
+The settings variables (config/settings.py) are removed from the child environment unless
+--keep-env is given, so an entry point that needs configuration just to be imported shows up as
+failed (e.g. "RuntimeError: Missing env var: FOUNDRY_PROJECT_ENDPOINT").
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+from collections import defaultdict
+
+# Variables unset in the child process (besides those of config/settings.py)
+_EXTRA_ENV = ("FOUNDRY_AGENT_ID",)
+
+
+def entry_points() -> list:
+    return [PROJECT_ROOT / "app.py", *sorted((PROJECT_ROOT / "scripts").glob("*.py"))]
+
+
+def import_snippet(path: Path) -> str:
+    """The module-level import statements of `path` (the sys.path setup of the scripts is added)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    lines = ["import sys", f"sys.path.insert(0, {str(PROJECT_ROOT)!r})"]
+    lines += [ast.unparse(node) for node in imports]
+    return "\n".join(lines)
+
+
+def settings_env_names() -> list:
+    settings_source = (PROJECT_ROOT / "config" / "settings.py").read_text(encoding="utf-8")
+    names = set()
+    for node in ast.walk(ast.parse(settings_source)):
+        if (isinstance(node, ast.Call) and getattr(node.func, "attr", getattr(node.func, "id", None))
+                in ("getenv", "env") and node.args and isinstance(node.args[0], ast.Constant)):
+            names.add(node.args[0].value)
+    return sorted(names) + list(_EXTRA_ENV)
+
+
+def child_env(keep_env: bool) -> dict:
+    env = dict(os.environ)
+    if not keep_env:
+        for name in settings_env_names():
+            env.pop(name, None)
+    return env
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Top-level imports -> cumulative ms (nested imports are included in their parent)."""
+    top = {}
+    for line in stderr.splitlines():
+        # "import time:  <self us> | <cumulative us> | <indent><module>", indented by nesting depth
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        name = name[1:]
+        if not name.startswith(" "):
+            top[name] = top.get(name, 0.0) + int(cumulative_us) / 1000
+    return top
+
+
+def measure(path: Path, env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", import_snippet(path)],
+        capture_output=True, text=True, env=env, cwd=PROJECT_ROOT,
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if line and not line.startswith("import time:")]
+        return {"error": errors[-1] if errors else f"exit code {result.returncode}"}
+    top = parse_importtime(result.stderr)
+    return {"import_ms": sum(top.values()), "top": top}
+
+
+def bench(path: Path, env: dict, repeat: int) -> dict:
+    runs = [measure(path, env) for _ in range(repeat)]
+    failed = next((run for run in runs if "error" in run), None)
+    if failed:
+        return failed
+
+    per_module = defaultdict(list)
+    for run in runs:
+        for name, ms in run["top"].items():
+            per_module[name].append(ms)
+    heaviest = sorted(((name, statistics.median(ms)) for name, ms in per_module.items()),
+                      key=lambda item: item[1], reverse=True)
+    return {
+        "import_ms": round(statistics.median(run["import_ms"] for run in runs), 1),
+        "heaviest": [[name, round(ms, 1)] for name, ms in heaviest[:3]],
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """Regressions against `baseline`: slower by more than `tolerance` and `min_delta_ms`, or now failing."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None or "error" in before:
+            continue
+        if "error" in result:
+            regressions.append(f"{name}: imported before, now fails ({result['error']})")
+            continue
+        delta = result["import_ms"] - before["import_ms"]
+        if result["import_ms"] > before["import_ms"] * (1 + tolerance) and delta > min_delta_ms:
+            regressions.append(f"{name}: {before['import_ms']:.0f} -> {result['import_ms']:.0f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entry_points", nargs="*", help="Entry points (default: app.py and scripts/*.py)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per entry point (median)")
+    parser.add_argument("--keep-env", action="store_true", help="Keep the settings variables of this shell")
+    parser.add_argument("--baseline", help="Compare with this baseline JSON; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="Write the results as a baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0,
+                        help="Ignore regressions smaller than this (interpreter noise)")
+    args = parser.parse_args()
+
+    paths = [Path(p).resolve() for p in args.entry_points] or entry_points()
+    env = child_env(args.keep_env)
+
+    results = {}
+    print(f"{'entry point':<44} {'import ms':>10}   heaviest top-level imports")
+    for path in paths:
+        name = path.relative_to(PROJECT_ROOT).as_posix()
+        result = results[name] = bench(path, env, args.repeat)
+        if "error" in result:
+            print(f"{name:<44} {'failed':>10}   {result['error']}")
+        else:
+            heaviest = ", ".join(f"{module} {ms:.0f}" for module, ms in result["heaviest"])
+            print(f"{name:<44} {result['import_ms']:>10.0f}   {heaviest}")
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"config": {"python": sys.version.split()[0], "keep_env": args.keep_env},
+                       "results": results}, f, indent=2)
+        print(f"\nBaseline saved: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regression against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
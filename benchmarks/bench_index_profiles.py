@@ -0,0 +1,223 @@
+"""
+Index profile benchmark: recall@k against exact search, query latency and vector storage
+for each profile in services/search_schema.py INDEX_PROFILES.
+
+    python benchmarks/bench_index_profiles.py                     # vectors of the local embedding store
+    python benchmarks/bench_index_profiles.py --synthetic 20000   # offline, clustered random vectors
+
+Compression is simulated locally the way the service applies it: int8 scalar quantization
+(per-dimension min/max) or 1-bit binary quantization (sign, Hamming distance) on the first
+`truncation_dimension` dimensions, then the best k * oversampling are rescored with the original
+vectors. HNSW parameters (m / ef_construction / ef_search) are measured only when hnswlib is
+installed; otherwise the candidate generation is exact.
+
+Chunk recall@k: share of the exact top-k chunks found. Candidate recall@k: share of the
+exact top-k distinct CVs found (chunks grouped by CV, best chunk per CV).
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import time
+
+import numpy as np
+
+from services.search_schema import INDEX_PROFILES
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+def _normalize(matrix):
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def _top(scores, k):
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+# =========================
+# Data
+# =========================
+def load_store_vectors():
+    """Vectors of the local embedding store, with the CV of each row from the ingestion manifest."""
+    from services.embedding_store import get_embedding_store
+    from services.manifest import load_manifest
+
+    store = get_embedding_store()
+    vectors = np.asarray(store.matrix, dtype=np.float32)
+    owners = np.full(len(store), -1, dtype=np.int64)
+    for number, entry in enumerate(load_manifest().values()):
+        for key in entry.get("text_keys", []):
+            row = store.row(key)
+            if row is not None:
+                owners[row] = number
+    unknown = owners < 0
+    owners[unknown] = np.arange(unknown.sum()) + owners.max() + 1  # unmapped rows: one CV each
+    return vectors, owners
+
+
+def synthetic_vectors(n, dim, chunks_per_cv=6, seed=0):
+    """Clustered vectors: chunks of one CV share a centre, CVs share a few topic directions."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((32, dim)).astype(np.float32)
+    cvs = max(1, n // chunks_per_cv)
+    centres = topics[rng.integers(0, len(topics), cvs)] + 0.8 * rng.standard_normal((cvs, dim)).astype(np.float32)
+    owners = rng.integers(0, cvs, n)
+    vectors = centres[owners] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return _normalize(vectors).astype(np.float32), owners
+
+
+def make_queries(vectors, count, noise_scale=1.0, seed=1):
+    """Perturbed document vectors as stand-ins for JD query vectors."""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)
+    noise = rng.standard_normal((len(rows), vectors.shape[1])).astype(np.float32)
+    return _normalize(vectors[rows] + noise_scale * noise / np.sqrt(vectors.shape[1])).astype(np.float32)
+
+
+# =========================
+# Profiles
+# =========================
+class ProfileSearcher:
+    def __init__(self, vectors, profile):
+        self.vectors = vectors
+        self.profile = profile
+        dim = profile.get("truncation_dimension") or vectors.shape[1]
+        self.dim = dim
+        truncated = _normalize(vectors[:, :dim]).astype(np.float32)
+        compression = profile.get("compression")
+
+        if compression == "scalar":
+            self.low = truncated.min(axis=0)
+            self.scale = np.maximum(truncated.max(axis=0) - self.low, 1e-12) / 255.0
+            codes = np.round((truncated - self.low) / self.scale).astype(np.uint8)
+            self.codes = codes
+            self._dequantized = codes.astype(np.float32) * self.scale + self.low
+        elif compression == "binary":
+            self.bits = np.packbits(truncated > 0, axis=1)
+        else:
+            self.truncated = truncated
+
+        self.hnsw = None
+        try:
+            import hnswlib
+            self.hnsw = hnswlib.Index(space="cosine", dim=dim)
+            self.hnsw.init_index(max_elements=len(vectors), M=profile["m"], ef_construction=profile["ef_construction"])
+            self.hnsw.add_items(truncated)
+            self.hnsw.set_ef(profile["ef_search"])
+        except ImportError:
+            pass
+
+    def bytes_per_vector(self):
+        """(compressed index bytes, bytes kept on disk in total) per vector."""
+        full = 4 * self.vectors.shape[1]
+        compression = self.profile.get("compression")
+        index = {"scalar": self.dim, "binary": (self.dim + 7) // 8}.get(compression, 4 * self.dim)
+        originals = full if compression else 0             # preserveOriginals for rescoring
+        stored = full if self.profile.get("stored") else 0  # retrievable copy
+        return index, index + originals + stored
+
+    def search(self, queries, k):
+        q = _normalize(queries[:, :self.dim]).astype(np.float32)
+        compression = self.profile.get("compression")
+        pool = int(k * self.profile.get("oversampling", 1.0)) if compression else k
+
+        if self.hnsw is not None:
+            labels, _ = self.hnsw.knn_query(q, k=max(pool, k))
+            candidates = labels.astype(np.int64)
+        elif compression == "scalar":
+            candidates = _top(q @ self._dequantized.T, pool)
+        elif compression == "binary":
+            query_bits = np.packbits(q > 0, axis=1)
+            hamming = _POPCOUNT[np.bitwise_xor(query_bits[:, None, :], self.bits[None, :, :])].sum(axis=2)
+            candidates = _top(-hamming.astype(np.float32), pool)
+        else:
+            candidates = _top(q @ self.truncated.T, pool)
+
+        if not compression:
+            return candidates[:, :k]
+        # Rescoring with the original full-precision vectors
+        rescored = np.einsum("qd,qkd->qk", queries, self.vectors[candidates])
+        order = np.argsort(-rescored, axis=1)[:, :k]
+        return np.take_along_axis(candidates, order, axis=1)
+
+
+def _distinct(rows, owners, k):
+    seen = []
+    for row in rows:
+        owner = owners[row]
+        if owner not in seen:
+            seen.append(owner)
+            if len(seen) == k:
+                break
+    return set(seen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, help="Use N synthetic vectors instead of the embedding store")
+    parser.add_argument("--dim", type=int, default=1536, help="Dimension of the synthetic vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--query-noise", type=float, default=1.0,
+                        help="Distance of the query vectors from their source chunk (relative to the vector norm)")
+    parser.add_argument("--profiles", nargs="+", default=list(INDEX_PROFILES), choices=list(INDEX_PROFILES))
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors, owners = synthetic_vectors(args.synthetic, args.dim)
+        source = f"synthetic ({args.synthetic} x {args.dim})"
+        print("Note: synthetic vectors do not keep their meaning when truncated like text-embedding-3 vectors,\n"
+              "so truncated profiles are pessimistic here; use the embedding store for a decision.\n")
+    else:
+        vectors, owners = load_store_vectors()
+        source = f"embedding store ({vectors.shape[0]} x {vectors.shape[1]})"
+        if len(vectors) < args.k * 10:
+            print("Embedding store is (nearly) empty: run the local ingestion or use --synthetic N")
+            return
+    vectors = _normalize(vectors).astype(np.float32)
+    queries = make_queries(vectors, args.queries, args.query_noise)
+
+    # Candidate recall needs more chunks than k to collect k distinct CVs
+    pool = args.k * 5
+    exact = _top(queries @ vectors.T, pool)
+    print(f"{source}, {len(queries)} queries, k={args.k}, hnswlib: {'yes' if _has_hnswlib() else 'no (exact candidates)'}\n")
+    print(f"{'profile':<12} {'recall@k':>9} {'cand@k':>7} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'index B/vec':>11} {'disk B/vec':>10}")
+
+    for name in args.profiles:
+        searcher = ProfileSearcher(vectors, INDEX_PROFILES[name])
+        timings, results = [], []
+        for query in queries:
+            start = time.perf_counter()
+            results.append(searcher.search(query[None, :], pool)[0])
+            timings.append((time.perf_counter() - start) * 1000)
+
+        chunk_recall = np.mean([
+            len(set(r[:args.k]) & set(e[:args.k])) / args.k for r, e in zip(results, exact)
+        ])
+        candidate_recall = np.mean([
+            len(_distinct(r, owners, args.k) & _distinct(e, owners, args.k)) / len(_distinct(e, owners, args.k))
+            for r, e in zip(results, exact)
+        ])
+        index_bytes, disk_bytes = searcher.bytes_per_vector()
+        print(f"{name:<12} {chunk_recall:>9.3f} {candidate_recall:>7.3f} {np.percentile(timings, 50):>7.2f} "
+              f"{np.percentile(timings, 95):>7.2f} {index_bytes:>11} {disk_bytes:>10}")
+
+
+def _has_hnswlib():
+    try:
+        import hnswlib  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+if __name__ == "__main__":
+    main()
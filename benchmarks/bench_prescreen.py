@@ -0,0 +1,73 @@
+"""
+Pre-screening latency: score every candidate profile against a JD in one vectorized pass.
+
+Runs offline on synthetic profiles (or the local ingestion manifest with --manifest).
+
+    python benchmarks/bench_prescreen.py --candidates 10000
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import random
+import statistics
+import time
+
+from services.candidate_profile import DOMAINS, SENIORITY_LEVELS, SKILLS, extract_requirements
+from services.prescreen import PreScreener, format_shortlist
+
+JD = """Senior Python Developer
+Requirements:
+- At least 5 years of experience with Python, SQL and Docker
+Nice to have: Kubernetes, Kafka, Azure
+Domain: banking / payments"""
+
+
+def synthetic_profiles(n: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    skills, domains = list(SKILLS), list(DOMAINS) + [None]
+    return {
+        f"cv_{i:05d}.pdf": {
+            "skills": sorted(rng.sample(skills, rng.randint(0, 12))),
+            "years_experience": None if rng.random() < 0.1 else float(rng.randint(0, 20)),
+            "seniority": rng.choice(SENIORITY_LEVELS + [None]),
+            "current_role": "Software Engineer",
+            "domain": rng.choice(domains),
+        }
+        for i in range(n)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=10000)
+    parser.add_argument("--manifest", help="Use the profiles of an ingestion manifest instead")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.manifest:
+        screener = PreScreener.from_manifest(args.manifest)
+    else:
+        screener = PreScreener(synthetic_profiles(args.candidates))
+    build_ms = (time.perf_counter() - start) * 1000
+
+    requirements = extract_requirements(JD)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        shortlist = screener.shortlist(requirements, top=args.top)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"{len(screener)} candidates x {len(screener.vocabulary)} skills, build {build_ms:.0f} ms")
+    print(f"requirements: {requirements}")
+    print(f"shortlist: median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms\n")
+    print(format_shortlist(shortlist))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,20 @@
+"""
+Settings from the environment (and .env), resolved lazily per subsystem:
+
+    from config.settings import get_settings
+    get_settings().search.endpoint
+
+A section is read and validated on first access, so an entry point only needs the variables of
+the subsystems it uses (e.g. the indexer scripts run without any Foundry variable). The flat names
+(`from config.settings import AZURE_SEARCH_ENDPOINT`) still work and resolve through the sections.
+"""
 import os
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
 from dotenv import load_dotenv
 
+# Module-level env constants of the services (pool sizes, cache paths ...) are read at their import
 load_dotenv()
 
 def env(name: str) -> str:
@@ -9,17 +23,177 @@ def env(name: str) -> str:
         raise RuntimeError(f"Missing env var: {name}")
     return v
 
-FOUNDRY_PROJECT_ENDPOINT = env("FOUNDRY_PROJECT_ENDPOINT")
-FOUNDRY_MODEL_DEPLOYMENT_NAME = env("FOUNDRY_MODEL_DEPLOYMENT_NAME")
 
-AZURE_AI_SEARCH_CONNECTION_NAME = env("AZURE_AI_SEARCH_CONNECTION_NAME")
-AI_SEARCH_INDEX_NAME = env("AI_SEARCH_INDEX_NAME")
+@dataclass(frozen=True)
+class FoundrySettings:
+    project_endpoint: str
+    model_deployment_name: str
+
+    @classmethod
+    def from_env(cls) -> "FoundrySettings":
+        return cls(
+            project_endpoint=env("FOUNDRY_PROJECT_ENDPOINT"),
+            model_deployment_name=env("FOUNDRY_MODEL_DEPLOYMENT_NAME"),
+        )
+
+
+@dataclass(frozen=True)
+class SearchToolSettings:
+    """Azure AI Search as the agent's tool: project connection + index."""
+    connection_name: str
+    index_name: str
+
+    @classmethod
+    def from_env(cls) -> "SearchToolSettings":
+        return cls(
+            connection_name=env("AZURE_AI_SEARCH_CONNECTION_NAME"),
+            index_name=env("AI_SEARCH_INDEX_NAME"),
+        )
+
+
+@dataclass(frozen=True)
+class SearchSettings:
+    """For provisioning scripts (optional but recommended)."""
+    endpoint: str
+    admin_key: str
+    # Read-only key for query traffic (direct retrieval); falls back to the admin key
+    query_key: str
+    indexer_name: str
+    data_source_name: str
+    index_name: str
+    # Vector compression / HNSW profile of the chunk index (services/search_schema.py INDEX_PROFILES)
+    index_profile: str
+    # Writer of the chunk index: "indexer" (blob indexer + skillset) or "local" (scripts/ingest_local.py)
+    ingestion_mode: str
+
+    @classmethod
+    def from_env(cls) -> "SearchSettings":
+        admin_key = os.getenv("AZURE_SEARCH_ADMIN_KEY", "")
+        return cls(
+            endpoint=os.getenv("AZURE_SEARCH_ENDPOINT", ""),
+            admin_key=admin_key,
+            query_key=os.getenv("AZURE_SEARCH_QUERY_KEY") or admin_key,
+            indexer_name=os.getenv("SEARCH_INDEXER_NAME", "cv-indexer"),
+            data_source_name=os.getenv("DATA_SOURCE_NAME", "cv-data-source"),
+            index_name=os.getenv("SEARCH_INDEX_NAME", "cv-index"),
+            index_profile=os.getenv("SEARCH_INDEX_PROFILE", "full"),
+            ingestion_mode=os.getenv("INGESTION_MODE", "indexer"),
+        )
+
+
+@dataclass(frozen=True)
+class StorageSettings:
+    connection_string: str
+    container_name: str
+
+    @classmethod
+    def from_env(cls) -> "StorageSettings":
+        return cls(
+            connection_string=os.getenv("AZURE_STORAGE_CONNECTION_STRING", ""),
+            container_name=os.getenv("BLOB_CONTAINER_NAME", ""),
+        )
+
+
+@dataclass(frozen=True)
+class EmbeddingSettings:
+    """Azure OpenAI embeddings (skillset + local ingestion)."""
+    endpoint: str
+    api_key: str
+    deployment: str
+    dim: int
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingSettings":
+        return cls(
+            endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", ""),
+            api_key=os.getenv("AZURE_OPENAI_API_KEY", ""),
+            deployment=os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", ""),
+            dim=int(os.getenv("AZURE_OPENAI_EMBEDDING_DIM", "1536")),
+        )
+
+    @property
+    def configured(self) -> bool:
+        return all([self.endpoint, self.api_key, self.deployment])
+
+
+@dataclass(frozen=True)
+class ChunkingSettings:
+    """SplitSkill settings (skillset) and local chunker mode ("pages" | "sections")."""
+    split_maximum_page_length: int
+    split_page_overlap_length: int
+    chunk_mode: str
+
+    @classmethod
+    def from_env(cls) -> "ChunkingSettings":
+        return cls(
+            split_maximum_page_length=int(os.getenv("SPLIT_MAXIMUM_PAGE_LENGTH", "1400")),
+            split_page_overlap_length=int(os.getenv("SPLIT_PAGE_OVERLAP_LENGTH", "350")),
+            chunk_mode=os.getenv("CHUNK_MODE", "pages"),
+        )
+
+
+class Settings:
+    """Sections are read from the environment on first access and then kept."""
+
+    @cached_property
+    def foundry(self) -> FoundrySettings:
+        return FoundrySettings.from_env()
+
+    @cached_property
+    def search_tool(self) -> SearchToolSettings:
+        return SearchToolSettings.from_env()
+
+    @cached_property
+    def search(self) -> SearchSettings:
+        return SearchSettings.from_env()
+
+    @cached_property
+    def storage(self) -> StorageSettings:
+        return StorageSettings.from_env()
+
+    @cached_property
+    def embedding(self) -> EmbeddingSettings:
+        return EmbeddingSettings.from_env()
+
+    @cached_property
+    def chunking(self) -> ChunkingSettings:
+        return ChunkingSettings.from_env()
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    return Settings()
+
+
+# Flat names -> (section, field)
+_FLAT_NAMES = {
+    "FOUNDRY_PROJECT_ENDPOINT": ("foundry", "project_endpoint"),
+    "FOUNDRY_MODEL_DEPLOYMENT_NAME": ("foundry", "model_deployment_name"),
+    "AZURE_AI_SEARCH_CONNECTION_NAME": ("search_tool", "connection_name"),
+    "AI_SEARCH_INDEX_NAME": ("search_tool", "index_name"),
+    "AZURE_SEARCH_ENDPOINT": ("search", "endpoint"),
+    "AZURE_SEARCH_ADMIN_KEY": ("search", "admin_key"),
+    "AZURE_SEARCH_QUERY_KEY": ("search", "query_key"),
+    "SEARCH_INDEXER_NAME": ("search", "indexer_name"),
+    "DATA_SOURCE_NAME": ("search", "data_source_name"),
+    "SEARCH_INDEX_NAME": ("search", "index_name"),
+    "SEARCH_INDEX_PROFILE": ("search", "index_profile"),
+    "INGESTION_MODE": ("search", "ingestion_mode"),
+    "AZURE_STORAGE_CONNECTION_STRING": ("storage", "connection_string"),
+    "BLOB_CONTAINER_NAME": ("storage", "container_name"),
+    "AZURE_OPENAI_ENDPOINT": ("embedding", "endpoint"),
+    "AZURE_OPENAI_API_KEY": ("embedding", "api_key"),
+    "AZURE_OPENAI_EMBEDDING_DEPLOYMENT": ("embedding", "deployment"),
+    "AZURE_OPENAI_EMBEDDING_DIM": ("embedding", "dim"),
+    "SPLIT_MAXIMUM_PAGE_LENGTH": ("chunking", "split_maximum_page_length"),
+    "SPLIT_PAGE_OVERLAP_LENGTH": ("chunking", "split_page_overlap_length"),
+    "CHUNK_MODE": ("chunking", "chunk_mode"),
+}
+
 
-# For provisioning scripts (optional but recommended)
-AZURE_SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT", "")
-AZURE_SEARCH_ADMIN_KEY = os.getenv("AZURE_SEARCH_ADMIN_KEY", "")
-AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING", "")
-BLOB_CONTAINER_NAME = os.getenv("BLOB_CONTAINER_NAME", "")
-SEARCH_INDEXER_NAME = os.getenv("SEARCH_INDEXER_NAME", "cv-indexer")
-DATA_SOURCE_NAME = os.getenv("DATA_SOURCE_NAME", "cv-data-source")
-SEARCH_INDEX_NAME = os.getenv("SEARCH_INDEX_NAME", "cv-index")
\ No newline at end of file
+def __getattr__(name: str):
+    try:
+        section, field = _FLAT_NAMES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return getattr(getattr(get_settings(), section), field)
@@ -0,0 +1,162 @@
+import sys
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+
+from agents.agent_runner import run_agent_async
+from agents.prompts import build_jd_prompt
+
+load_dotenv()
+
+
+# =========================
+# INPUT
+# =========================
+def read_jds(path: str):
+    """
+    Reads job descriptions from .jsonl ({"id": ..., "jd": ...}) or .csv (columns id, jd).
+    Rows without an id get their line number.
+    """
+    jds = []
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for i, row in enumerate(csv.DictReader(f), start=1):
+                jds.append((row.get("id") or str(i), row["jd"]))
+    else:
+        with open(path, encoding="utf-8") as f:
+            for i, line in enumerate(f, start=1):
+                if line.strip():
+                    item = json.loads(line)
+                    jds.append((str(item.get("id") or i), item["jd"]))
+    return jds
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# =========================
+# BATCH
+# =========================
+async def screen_batch(client, agent_id: str, jds, out_file, concurrency: int, polling_interval: float):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def screen_one(jd_id: str, jd: str):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                answer = await run_agent_async(client, agent_id, build_jd_prompt(jd), polling_interval)
+                result = {"id": jd_id, "status": "ok", "answer": answer}
+            except Exception as e:
+                result = {"id": jd_id, "status": "error", "error": str(e)}
+            result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return result
+
+    tasks = [asyncio.create_task(screen_one(jd_id, jd)) for jd_id, jd in jds]
+    for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+        result = await task
+        # Write each result as soon as it finishes
+        out_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out_file.flush()
+        latencies.append(result["latency_ms"])
+        if result["status"] != "ok":
+            failures += 1
+        print(f"[{done}/{len(tasks)}] {result['id']} {result['status']} {result['latency_ms']:.0f} ms", file=sys.stderr)
+
+    return latencies, failures
+
+
+async def main_async(args) -> int:
+    jds = read_jds(args.input)
+    if not jds:
+        print("No job descriptions found in", args.input)
+        return 1
+
+    stub_server = None
+    client_kwargs = {}
+    endpoint = args.endpoint
+    agent_id = args.agent_id
+
+    if args.stub:
+        from stubs.foundry_server import start_stub_server
+        stub_server, endpoint = start_stub_server(run_seconds=args.stub_run_seconds)
+        agent_id = agent_id or "asst_stub"
+
+    if not endpoint:
+        print("Missing FOUNDRY_PROJECT_ENDPOINT (or pass --endpoint, or --stub)")
+        return 1
+    if not agent_id:
+        # Agent of agents/agent_factory.py, created/updated only when its definition changed
+        from agents.agent_registry import resolve_agent
+        agent_id = resolve_agent(endpoint).id
+
+    from azure.ai.agents.aio import AgentsClient
+
+    if args.stub:
+        # Local stub: no TLS, no Entra ID
+        from stubs.foundry_server import StubCredential, stub_client_kwargs
+        credential = StubCredential()
+        client_kwargs.update(stub_client_kwargs())
+    else:
+        from azure.identity.aio import DefaultAzureCredential
+        credential = DefaultAzureCredential()
+
+    start = time.perf_counter()
+    try:
+        async with credential, AgentsClient(endpoint=endpoint, credential=credential, **client_kwargs) as client:
+            with open(args.output, "w", encoding="utf-8") as out_file:
+                latencies, failures = await screen_batch(
+                    client, agent_id, jds, out_file, args.concurrency, args.polling_interval
+                )
+    finally:
+        if stub_server is not None:
+            stub_server.shutdown()
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "jds": len(jds),
+        "failed": failures,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_jds_per_min": round(len(jds) / elapsed * 60, 2),
+        "latency_p50_ms": percentile(latencies, 50),
+        "latency_p95_ms": percentile(latencies, 95),
+    }
+    print(json.dumps(summary, indent=2))
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a batch of job descriptions with the CV agent.")
+    parser.add_argument("input", help="JD file (.jsonl with id/jd, or .csv with id,jd columns)")
+    parser.add_argument("-o", "--output", default="screening_results.jsonl")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Max concurrent agent runs")
+    parser.add_argument("--agent-id", default=os.getenv("FOUNDRY_AGENT_ID"))
+    parser.add_argument("--endpoint", default=os.getenv("FOUNDRY_PROJECT_ENDPOINT"))
+    parser.add_argument("--polling-interval", type=float, default=1.0, help="Run status polling interval (s)")
+    parser.add_argument("--stub", action="store_true", help="Run against an in-process Foundry stub (offline)")
+    parser.add_argument("--stub-run-seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Deploys the CV agent (agents/agent_factory.py): reuses the existing agent when its definition
+is unchanged, updates it in place when it changed, creates it only if there is none. Prints the id.
+
+    python scripts/deploy_agent.py            # checks the service (the local registry cache is refreshed)
+    python scripts/deploy_agent.py --prune    # also deletes older agents with the same name
+"""
+import sys
+from pathlib import Path
+
+# Fix import when running from scripts/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import logging
+
+from agents.agent_factory import agent_definition
+from agents.agent_registry import get_agent_registry
+
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", help="Foundry project endpoint (default: FOUNDRY_PROJECT_ENDPOINT)")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete the other agents named like the CV agent (duplicates of earlier deploys)")
+    args = parser.parse_args()
+
+    definition = agent_definition()
+    registry = get_agent_registry(args.endpoint)
+    agent = registry.resolve(definition, verify=True)
+    print(f"{definition['name']}: {agent.id} ({agent.action}, definition {agent.fingerprint[:12]})")
+
+    if args.prune:
+        deleted = registry.prune(definition, keep_id=agent.id)
+        print(f"Deleted {len(deleted)} duplicate agent(s){': ' + ', '.join(deleted) if deleted else ''}")
+
+
+if __name__ == "__main__":
+    main()
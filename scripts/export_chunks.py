@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+
+from azure.core.credentials import AzureKeyCredential
+from azure.search.documents import SearchClient
+
+from config.settings import AZURE_SEARCH_ENDPOINT, AZURE_SEARCH_ADMIN_KEY, SEARCH_INDEX_NAME
+
+CHUNK_FIELDS = ["id", "document_id", "candidate_id", "text",
+                "skills", "years_experience", "seniority", "current_role", "domain"]
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the chunk index to JSONL for the local retrieval engine (services/local_search.py)."
+    )
+    parser.add_argument("-o", "--output", default=".cache/chunks.jsonl")
+    parser.add_argument("--with-embeddings", action="store_true",
+                        help="Also export vectors (only if the embedding field is retrievable)")
+    args = parser.parse_args()
+
+    client = SearchClient(AZURE_SEARCH_ENDPOINT, SEARCH_INDEX_NAME, AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY))
+    fields = CHUNK_FIELDS + (["embedding"] if args.with_embeddings else [])
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(args.output, "w", encoding="utf-8") as f:
+        # Parent documents (projection mode includeIndexingParentDocuments) have no chunk text
+        for doc in client.search(search_text="*", select=fields, filter="text ne null"):
+            f.write(json.dumps({k: doc.get(k) for k in fields}, ensure_ascii=False) + "\n")
+            count += 1
+
+    print(f"Exported {count} chunks to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+import logging
+
+from services.ingestion import compact_embedding_store, run_ingestion
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Incremental local ingestion: chunk + embed new/changed CVs and push them to the chunk index."
+    )
+    parser.add_argument("--full", action="store_true", help="Re-process every CV, ignoring the manifest")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("--compact", action="store_true",
+                        help="After ingestion, drop stored embeddings no longer used by any chunk")
+    args = parser.parse_args()
+
+    stats = run_ingestion(full=args.full, dry_run=args.dry_run)
+    if args.compact and not args.dry_run:
+        stats["embeddings_compacted"] = compact_embedding_store()
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
+"""
+Creates or updates the blob data source defined in services/search_schema.py (only if it changed).
+Same engine as scripts/setup_search.py, limited to this resource.
+"""
 import sys
 from pathlib import Path
 
@@ -5,43 +9,10 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from azure.core.credentials import AzureKeyCredential
-from azure.search.documents.indexes import SearchIndexerClient
-from azure.search.documents.indexes.models import (
-    SearchIndexerDataSourceConnection,
-    SearchIndexerDataContainer,
-)
-
-from config.settings import (
-    AZURE_SEARCH_ENDPOINT,
-    AZURE_SEARCH_ADMIN_KEY,
-    AZURE_STORAGE_CONNECTION_STRING,
-    BLOB_CONTAINER_NAME,
-)
-
-# CV DATA SOURCE
-DATA_SOURCE_NAME = "cv-data-source"
+from services.search_provisioning import provision
 
 def main():
-    client = SearchIndexerClient(
-        AZURE_SEARCH_ENDPOINT,
-        AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY)
-    )
-
-    container = SearchIndexerDataContainer(
-        name=BLOB_CONTAINER_NAME
-    )
-
-    data_source = SearchIndexerDataSourceConnection(
-        name=DATA_SOURCE_NAME,
-        type="azureblob",
-        connection_string=AZURE_STORAGE_CONNECTION_STRING,
-        container=container,
-        description="CV PDF/DOCX stored in Azure Blob Storage"
-    )
-
-    client.create_or_update_data_source_connection(data_source)
-    print("✅ Data source CREATED/UPDATED:", DATA_SOURCE_NAME)
+    provision(dry_run="--plan" in sys.argv, kinds=["data_source"])
 
 if __name__ == "__main__":
     main()
@@ -1,3 +1,7 @@
+"""
+Creates or updates the chunk index defined in services/search_schema.py (only if it changed).
+Same engine as scripts/setup_search.py, limited to this resource.
+"""
 import sys
 from pathlib import Path
 
@@ -5,83 +9,10 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from azure.core.credentials import AzureKeyCredential
-from azure.search.documents.indexes import SearchIndexClient
-from azure.search.documents.indexes.models import (
-    SearchIndex,
-    SimpleField,
-    SearchableField,
-    VectorSearch,
-    VectorSearchProfile,
-    HnswAlgorithmConfiguration,
-)
-
-from config.settings import (
-    AZURE_SEARCH_ENDPOINT,
-    AZURE_SEARCH_ADMIN_KEY,
-)
-
-# CV SEARCH INDEX
-INDEX_NAME = "cv-index-chunks"
-
-# Default embedding dimension for text-embedding-3-small
-EMBEDDING_DIMENSIONS = 1536  # text-embedding-3-small
+from services.search_provisioning import provision
 
 def main():
-    client = SearchIndexClient(
-        AZURE_SEARCH_ENDPOINT,
-        AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY)
-    )
-
-    index = SearchIndex(
-        name=INDEX_NAME,
-        fields=[
-            # ID của từng chunk
-            SimpleField(
-                name="id",
-                type="Edm.String",
-                key=True
-            ),
-
-            # Text chunk từ CV
-            SearchableField(
-                name="text",
-                type="Edm.String",
-                analyzer_name="standard.lucene"
-            ),
-
-            # Vector embedding
-            SearchableField(
-                name="embedding",
-                type="Collection(Edm.Single)",
-                vector_search_dimensions=EMBEDDING_DIMENSIONS,
-                vector_search_profile_name="vector-profile"
-            ),
-
-            # ID document cha (CV gốc)
-            SimpleField(
-                name="document_id",
-                type="Edm.String",
-                filterable=True
-            ),
-        ],
-        vector_search=VectorSearch(
-            algorithms=[
-                HnswAlgorithmConfiguration(
-                    name="hnsw"
-                )
-            ],
-            profiles=[
-                VectorSearchProfile(
-                    name="vector-profile",
-                    algorithm_configuration_name="hnsw"
-                )
-            ]
-        )
-    )
-
-    client.create_index(index)
-    print("✅ Index CREATED:", INDEX_NAME)
+    provision(dry_run="--plan" in sys.argv, allow_recreate="--allow-recreate" in sys.argv, kinds=["index"])
 
 if __name__ == "__main__":
     main()
@@ -1,3 +1,7 @@
+"""
+Creates or updates the indexer defined in services/search_schema.py (only if it changed).
+Same engine as scripts/setup_search.py, limited to this resource.
+"""
 import sys
 from pathlib import Path
 
@@ -5,36 +9,10 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from azure.core.credentials import AzureKeyCredential
-from azure.search.documents.indexes import SearchIndexerClient
-from azure.search.documents.indexes.models import SearchIndexer
-
-from config.settings import (
-    AZURE_SEARCH_ENDPOINT,
-    AZURE_SEARCH_ADMIN_KEY,
-    DATA_SOURCE_NAME,
-)
-
-# SETUP INDEXER
-INDEXER_NAME = "cv-indexer"
-SKILLSET_NAME = "cv-skillset"
-TARGET_INDEX_NAME = "cv-index-chunks"
+from services.search_provisioning import provision
 
 def main():
-    client = SearchIndexerClient(
-        AZURE_SEARCH_ENDPOINT,
-        AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY)
-    )
-
-    indexer = SearchIndexer(
-        name=INDEXER_NAME,
-        data_source_name=DATA_SOURCE_NAME,
-        target_index_name=TARGET_INDEX_NAME,
-        skillset_name=SKILLSET_NAME,
-    )
-
-    client.create_or_update_indexer(indexer)
-    print("Indexer CREATED/UPDATED:", INDEXER_NAME) #print indexer created or updated
+    provision(dry_run="--plan" in sys.argv, kinds=["indexer"])
 
 if __name__ == "__main__":
     main()
@@ -1,25 +1,180 @@
+"""
+Runs the indexer.
+
+    python scripts/search_run_indexer.py                      # start and exit
+    python scripts/search_run_indexer.py --wait               # block until the run completes
+    python scripts/search_run_indexer.py --wait --metrics .cache/indexer_runs.jsonl
+
+--wait polls get_indexer_status with backoff, prints progress and a summary
+(docs/sec, items processed/failed, errors, warnings) and exits non-zero if the run fails.
+--metrics appends one JSON line per run, with the chunking/embedding settings of the run,
+to compare throughput across runs.
+"""
 import sys
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError
 from azure.search.documents.indexes import SearchIndexerClient
 from config.settings import (
     AZURE_SEARCH_ENDPOINT,
     AZURE_SEARCH_ADMIN_KEY,
     SEARCH_INDEXER_NAME,
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+    AZURE_OPENAI_EMBEDDING_DIM,
+    SPLIT_MAXIMUM_PAGE_LENGTH,
+    SPLIT_PAGE_OVERLAP_LENGTH,
+    INGESTION_MODE,
 )
 
+# Exit codes
+EXIT_OK, EXIT_FAILED, EXIT_TIMEOUT = 0, 1, 2
+
+
+def _start_time(status):
+    result = status.last_result
+    return result.start_time if result else None
+
+
+def wait_for_run(client, indexer_name: str, previous_start=None, poll_interval: float = 2.0,
+                 max_interval: float = 30.0, timeout: float = 3600.0):
+    """
+    Polls the indexer status until the run started after `previous_start` completes.
+    The interval grows by 1.5x while nothing changes and resets when progress is reported.
+    Returns the completed IndexerExecutionResult, or None on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    interval = poll_interval
+    last_progress = None
+
+    while time.monotonic() < deadline:
+        status = client.get_indexer_status(indexer_name)
+        result = status.last_result
+
+        if result is not None and result.start_time != previous_start:
+            progress = (result.status, result.item_count, result.failed_item_count)
+            if progress != last_progress:
+                elapsed = ((result.end_time or datetime.now(timezone.utc)) - result.start_time).total_seconds()
+                print(f"[{elapsed:7.1f}s] {result.status}: {result.item_count} processed, "
+                      f"{result.failed_item_count} failed", flush=True)
+                last_progress = progress
+                interval = poll_interval
+            if result.status != "inProgress":
+                return result
+
+        time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        interval = min(interval * 1.5, max_interval)
+
+    return None
+
+
+def run_metrics(indexer_name: str, result) -> dict:
+    duration = (result.end_time - result.start_time).total_seconds() if result.end_time else None
+    return {
+        "indexer": indexer_name,
+        "status": result.status,
+        "start_time": result.start_time.isoformat(),
+        "end_time": result.end_time.isoformat() if result.end_time else None,
+        "duration_seconds": duration,
+        "items_processed": result.item_count,
+        "items_failed": result.failed_item_count,
+        "docs_per_second": result.item_count / duration if duration else None,
+        "error_message": result.error_message,
+        "errors": [
+            {"key": e.key, "name": e.name, "status_code": e.status_code, "message": e.error_message}
+            for e in result.errors or []
+        ],
+        "warnings": [{"key": w.key, "name": w.name, "message": w.message} for w in result.warnings or []],
+        # The indexer API only reports run totals: it has no per-document timing,
+        # so the slowest documents cannot be listed from the service side.
+        "per_document_timing": None,
+        "settings": {
+            "split_maximum_page_length": SPLIT_MAXIMUM_PAGE_LENGTH,
+            "split_page_overlap_length": SPLIT_PAGE_OVERLAP_LENGTH,
+            "embedding_deployment": AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            "embedding_dim": AZURE_OPENAI_EMBEDDING_DIM,
+        },
+    }
+
+
+def print_summary(metrics: dict, max_listed: int = 10) -> None:
+    rate = metrics["docs_per_second"]
+    print(f"\nIndexer '{metrics['indexer']}': {metrics['status']}")
+    print(f"  duration   {metrics['duration_seconds'] or 0:.1f}s")
+    print(f"  processed  {metrics['items_processed']}  failed {metrics['items_failed']}")
+    print(f"  throughput {rate:.2f} docs/s" if rate is not None else "  throughput n/a")
+    if metrics["error_message"]:
+        print(f"  error      {metrics['error_message']}")
+    for label, items, field in (("errors", metrics["errors"], "message"), ("warnings", metrics["warnings"], "message")):
+        if items:
+            print(f"  {label} ({len(items)}):")
+            for item in items[:max_listed]:
+                print(f"    {item['key']}: {item[field]}")
+            if len(items) > max_listed:
+                print(f"    ... {len(items) - max_listed} more")
+
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wait", action="store_true", help="Block until the run completes")
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--max-interval", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=3600.0, help="Seconds to wait before giving up")
+    parser.add_argument("--metrics", help="Append the run metrics as one JSON line to this file")
+    parser.add_argument("--allow-item-failures", action="store_true",
+                        help="Exit 0 when the run succeeds with some failed items")
+    args = parser.parse_args()
+
+    if INGESTION_MODE == "local":
+        print("INGESTION_MODE=local: scripts/ingest_local.py owns the index, the indexer is not run",
+              file=sys.stderr)
+        return EXIT_FAILED
+
     client = SearchIndexerClient(
         AZURE_SEARCH_ENDPOINT,
         AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY)
     )
 
-    client.run_indexer(SEARCH_INDEXER_NAME)
-    print(f"Indexer '{SEARCH_INDEXER_NAME}' started")
+    previous_start = _start_time(client.get_indexer_status(SEARCH_INDEXER_NAME)) if args.wait else None
+    try:
+        client.run_indexer(SEARCH_INDEXER_NAME)
+        print(f"Indexer '{SEARCH_INDEXER_NAME}' started")
+    except HttpResponseError as e:
+        if not (args.wait and e.status_code == 409):
+            raise
+        # Already running: follow the current run
+        print(f"Indexer '{SEARCH_INDEXER_NAME}' is already running, waiting for it")
+        previous_start = None
+
+    if not args.wait:
+        return EXIT_OK
+
+    result = wait_for_run(client, SEARCH_INDEXER_NAME, previous_start,
+                          args.poll_interval, args.max_interval, args.timeout)
+    if result is None:
+        print(f"Timed out after {args.timeout:.0f}s", file=sys.stderr)
+        return EXIT_TIMEOUT
+
+    metrics = run_metrics(SEARCH_INDEXER_NAME, result)
+    print_summary(metrics)
+    if args.metrics:
+        Path(args.metrics).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.metrics, "a", encoding="utf-8") as f:
+            f.write(json.dumps(metrics, ensure_ascii=False) + "\n")
+
+    if result.status != "success":
+        return EXIT_FAILED
+    if result.failed_item_count and not args.allow_item_failures:
+        return EXIT_FAILED
+    return EXIT_OK
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Admission control for Foundry agent runs: one process-wide scheduler in front of every run, so
+concurrent chat sessions stay inside the model deployment's quota instead of failing with 429.
+
+    scheduler = get_run_scheduler()
+    with scheduler.admit(session_id, prompt_tokens) as ticket:
+        run = project.agents.runs.create_and_process(...)
+        ticket.settle(run)                       # actual token usage corrects the token bucket
+
+A run is admitted when
+  - it is next in line: one FIFO queue per session, served round-robin, so one busy session
+    (or a batch) cannot starve the others,
+  - a request and its estimated tokens (prompt + ADMISSION_RUN_TOKEN_OVERHEAD) are available in the
+    RPM / TPM token buckets (refilled continuously, burst of ADMISSION_BURST_SECONDS of quota),
+  - fewer than ADMISSION_MAX_CONCURRENT_RUNS runs are in flight,
+  - the scheduler is not paused after a throttled run (pause(): retry-after plus jitter).
+
+Throttled runs are retried by the caller (agents/agent_runner.py) with backoff_delay().
+Queue depth, runs in flight, admission wait and throttles are exported by services/telemetry.py;
+stats() returns a snapshot.
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from services.telemetry import record_admission, record_queue_depth, record_run_done, record_throttle
+
+# =========================
+# Admission config (env)
+# =========================
+# Quota of the model deployment; 0 disables the bucket
+ADMISSION_TPM = int(os.getenv("ADMISSION_TPM", "0"))
+ADMISSION_RPM = int(os.getenv("ADMISSION_RPM", "0"))
+# Bucket size in seconds of quota: the service enforces the limits over short windows, not per minute
+ADMISSION_BURST_SECONDS = float(os.getenv("ADMISSION_BURST_SECONDS", "10"))
+ADMISSION_MAX_CONCURRENT_RUNS = int(os.getenv("ADMISSION_MAX_CONCURRENT_RUNS", "16"))
+# Tokens reserved per run on top of the prompt: instructions, retrieved chunks and the answer
+ADMISSION_RUN_TOKEN_OVERHEAD = int(os.getenv("ADMISSION_RUN_TOKEN_OVERHEAD", "4000"))
+# Max seconds a run waits in the queue (0 = no limit)
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "120"))
+
+# Retries of a throttled run (attempts including the first) and their backoff
+RUN_RETRY_ATTEMPTS = int(os.getenv("RUN_RETRY_ATTEMPTS", "4"))
+RUN_RETRY_BASE_SECONDS = float(os.getenv("RUN_RETRY_BASE_SECONDS", "2"))
+RUN_RETRY_MAX_SECONDS = float(os.getenv("RUN_RETRY_MAX_SECONDS", "60"))
+
+# last_error.code of a run rejected by the model rate limit
+THROTTLE_ERROR_CODES = {"rate_limit_exceeded", "too_many_requests"}
+_TRY_AGAIN = re.compile(r"try again in (\d+(?:\.\d+)?) ?s", re.IGNORECASE)
+
+
+class AdmissionTimeout(RuntimeError):
+    pass
+
+
+class RunThrottledError(RuntimeError):
+    """A run was still throttled after RUN_RETRY_ATTEMPTS attempts."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# =========================
+# Throttling
+# =========================
+def is_throttled(error) -> bool:
+    """`error`: a run's last_error, an HttpResponseError or a RunThrottledError."""
+    if isinstance(error, RunThrottledError) or getattr(error, "status_code", None) == 429:
+        return True
+    return getattr(error, "code", None) in THROTTLE_ERROR_CODES
+
+
+def retry_after_header(headers):
+    """
+    Seconds to wait from the retry-after headers of a response, or None. Retry-After is either
+    seconds or an HTTP-date (RFC 9110); a date in the past means no wait.
+    """
+    headers = headers or {}
+    for name, scale in (("retry-after-ms", 1000), ("x-ms-retry-after-ms", 1000), ("retry-after", 1)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value) / scale
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            continue
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    return None
+
+
+def retry_after(error):
+    """Seconds the service asked to wait (Retry-After headers or "Try again in N seconds"), or None."""
+    if isinstance(error, RunThrottledError):
+        return error.retry_after
+    wait = retry_after_header(getattr(getattr(error, "response", None), "headers", None))
+    if wait is not None:
+        return wait
+    match = _TRY_AGAIN.search(str(getattr(error, "message", None) or error))
+    return float(match.group(1)) if match else None
+
+
+def backoff_delay(attempt: int, retry_after_seconds: float = None) -> float:
+    """
+    Delay before retry `attempt` (0-based): exponential with jitter in [base/2, base], so throttled
+    sessions do not retry in lockstep, and never shorter than the service's retry-after.
+    """
+    base = min(RUN_RETRY_MAX_SECONDS, RUN_RETRY_BASE_SECONDS * 2 ** attempt)
+    delay = random.uniform(base / 2, base)
+    if retry_after_seconds:
+        delay = max(delay, retry_after_seconds + random.uniform(0, RUN_RETRY_BASE_SECONDS))
+    return delay
+
+
+# =========================
+# Scheduler
+# =========================
+class TokenBucket:
+    """
+    Refills at `rate` per second up to `capacity`. The level may go negative when a run used more
+    than it reserved; later runs then wait until the debt is paid back. Not thread-safe.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self._stamp = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (a request larger than the bucket waits for a full bucket)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= amount
+
+    def give(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def drain(self, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.level
+
+
+class Ticket:
+    def __init__(self, session: str, tokens: int):
+        self.session = session
+        self.tokens = tokens                # reserved: estimated prompt + run overhead
+        self.used_tokens = None             # actual usage, set by settle()
+        self.enqueued_at = time.monotonic()
+        self.wait_seconds = 0.0
+
+    def settle(self, run) -> None:
+        """Records the run's actual token usage (ThreadRun.usage), returned to / charged on the bucket."""
+        usage = getattr(run, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None) is not None:
+            self.used_tokens = usage.total_tokens
+
+
+class RunScheduler:
+    def __init__(self, tokens_per_minute: int = ADMISSION_TPM, requests_per_minute: int = ADMISSION_RPM,
+                 max_concurrent: int = ADMISSION_MAX_CONCURRENT_RUNS, burst_seconds: float = ADMISSION_BURST_SECONDS,
+                 run_token_overhead: int = ADMISSION_RUN_TOKEN_OVERHEAD,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS):
+        self._tokens = (TokenBucket(tokens_per_minute / 60, tokens_per_minute / 60 * burst_seconds)
+                        if tokens_per_minute > 0 else None)
+        self._requests = (TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60 * burst_seconds))
+                          if requests_per_minute > 0 else None)
+        self.max_concurrent = max_concurrent
+        self.run_token_overhead = run_token_overhead
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()        # session -> deque of tickets; order = round-robin rotation
+        self._running = 0
+        self._paused_until = 0.0
+        self._admitted = 0
+        self._throttled = 0
+        self._wait_total = 0.0
+
+    # ---------- admission ----------
+    def _wait_for(self, ticket: Ticket, now: float):
+        """0 when `ticket` can be admitted now, seconds until it might be, None to wait for a release."""
+        head = next(iter(self._queues.values()))[0]
+        if head is not ticket or self._running >= self.max_concurrent:
+            return None
+        waits = [self._paused_until - now]
+        if self._requests is not None:
+            waits.append(self._requests.wait_time(1, now))
+        if self._tokens is not None:
+            waits.append(self._tokens.wait_time(ticket.tokens, now))
+        return max(0.0, *waits)
+
+    def _dequeue(self, ticket: Ticket) -> None:
+        queue = self._queues[ticket.session]
+        queue.remove(ticket)
+        if queue:
+            # The session goes to the back of the rotation: the other sessions are served first
+            self._queues.move_to_end(ticket.session)
+        else:
+            del self._queues[ticket.session]
+        record_queue_depth(-1)
+
+    def acquire(self, session: str = None, prompt_tokens: int = 0, timeout: float = None,
+                retry: bool = False) -> Ticket:
+        """
+        Blocks until a run of `session` may start; pair with release(). `retry`: a throttled run
+        retried, it goes first (its session to the front of the rotation).
+        Raises AdmissionTimeout after `timeout` seconds (default ADMISSION_QUEUE_TIMEOUT_SECONDS).
+        """
+        ticket = Ticket(session or "default", prompt_tokens + self.run_token_overhead)
+        timeout = self.queue_timeout if timeout is None else timeout
+        deadline = ticket.enqueued_at + timeout if timeout > 0 else None
+
+        with self._cond:
+            queue = self._queues.setdefault(ticket.session, deque())
+            if retry:
+                queue.appendleft(ticket)
+                self._queues.move_to_end(ticket.session, last=False)
+            else:
+                queue.append(ticket)
+            record_queue_depth(1)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._wait_for(ticket, now)
+                    if wait == 0:
+                        break
+                    if deadline is not None:
+                        if now >= deadline:
+                            raise AdmissionTimeout(
+                                f"Run of session {ticket.session} waited {timeout:g}s for admission"
+                            )
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    self._cond.wait(wait)
+            except BaseException:
+                self._dequeue(ticket)
+                self._cond.notify_all()
+                raise
+
+            self._dequeue(ticket)
+            if self._requests is not None:
+                self._requests.take(1, now)
+            if self._tokens is not None:
+                self._tokens.take(ticket.tokens, now)
+            self._running += 1
+            self._admitted += 1
+            ticket.wait_seconds = now - ticket.enqueued_at
+            self._wait_total += ticket.wait_seconds
+            # The next head may be admissible too
+            self._cond.notify_all()
+
+        record_admission(ticket.wait_seconds * 1000, **{"admission.retry": retry})
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """Ends an admitted run; with settle()d usage the token bucket is corrected by the estimate error."""
+        with self._cond:
+            self._running -= 1
+            if self._tokens is not None and ticket.used_tokens is not None:
+                self._tokens.give(ticket.tokens - ticket.used_tokens, time.monotonic())
+            self._cond.notify_all()
+        record_run_done()
+
+    @contextmanager
+    def admit(self, session: str = None, prompt_tokens: int = 0, timeout: float = None, retry: bool = False):
+        ticket = self.acquire(session, prompt_tokens, timeout=timeout, retry=retry)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    # ---------- throttling ----------
+    def pause(self, seconds: float, **attributes) -> None:
+        """
+        A run was throttled: the quota is shared by the whole deployment, so nothing is admitted
+        for `seconds`, and the token bucket is emptied (it over-estimated what is left).
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            if self._tokens is not None:
+                self._tokens.drain(now)
+            self._throttled += 1
+            self._cond.notify_all()
+        record_throttle(**attributes)
+
+    # ---------- metrics ----------
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "sessions_waiting": len(self._queues),
+                "running": self._running,
+                "admitted": self._admitted,
+                "throttled": self._throttled,
+                "avg_wait_ms": self._wait_total / self._admitted * 1000 if self._admitted else 0.0,
+                "paused_for_s": max(0.0, self._paused_until - now),
+                "tokens_available": self._tokens.available(now) if self._tokens is not None else None,
+            }
+
+
+_scheduler = None
+_lock = threading.Lock()
+
+
+def get_run_scheduler() -> RunScheduler:
+    """Process-wide scheduler: every session of the app shares the deployment quota."""
+    global _scheduler
+    if _scheduler is None:
+        with _lock:
+            if _scheduler is None:
+                _scheduler = RunScheduler()
+    return _scheduler
@@ -0,0 +1,250 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from services.manifest import manifest_version
+
+# =========================
+# Cache config (env)
+# =========================
+ANSWER_CACHE_BACKEND = os.getenv("ANSWER_CACHE_BACKEND", "memory")  # memory | sqlite | off
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", ".cache/answers.sqlite3")
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(24 * 3600)))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+# How often the indexer status is checked for a new completed run
+INDEX_VERSION_CHECK_SECONDS = int(os.getenv("INDEX_VERSION_CHECK_SECONDS", "60"))
+
+# Keep characters that carry meaning in skills: c++, c#, .net, node.js, ci/cd
+_NOISE = re.compile(r"[^\w\s+#./-]")
+# Comparisons are spelled out before the noise is dropped: "< 3 years" != "> 3 years"
+_COMPARISONS = [("<=", " at most "), (">=", " at least "), ("≤", " at most "), ("≥", " at least "),
+                ("<", " less than "), (">", " more than ")]
+_BULLETS = re.compile(r"(^|\s)[-*•·]+(?=\s)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_jd(text: str) -> str:
+    """Canonical form of a job description: case, unicode, bullets, punctuation and spacing are ignored."""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    for sign, words in _COMPARISONS:
+        text = text.replace(sign, words)
+    text = _NOISE.sub(" ", text)
+    text = _BULLETS.sub(" ", text)
+    text = _SPACES.sub(" ", text).strip()
+    return text.strip(" .")
+
+
+def make_cache_key(jd: str, agent_id: str, template: str) -> str:
+    template_hash = hashlib.sha256(template.encode("utf-8")).hexdigest()
+    raw = "\0".join([agent_id, template_hash, normalize_jd(jd)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# =========================
+# Backends
+# =========================
+class MemoryCacheBackend:
+    """In-process LRU with TTL. Shared by all sessions of the same process."""
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES, ttl_seconds: int = ANSWER_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._items = OrderedDict()
+        self._meta = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, created_at = item
+            if time.time() - created_at > self.ttl_seconds:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._items[key] = (value, time.time())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def get_meta(self, name: str):
+        return self._meta.get(name)
+
+    def set_meta(self, name: str, value: str) -> None:
+        self._meta[name] = value
+
+
+class SQLiteCacheBackend:
+    """On-disk LRU with TTL. Survives restarts and is shared by processes on the same host."""
+
+    def __init__(self, path: str = ANSWER_CACHE_PATH, max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+                 ttl_seconds: int = ANSWER_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers(accessed_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE answers SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            # LRU eviction: keep the most recently accessed max_entries rows
+            self._conn.execute(
+                "DELETE FROM answers WHERE key IN ("
+                "SELECT key FROM answers ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+
+    def get_meta(self, name: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, name: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+
+# =========================
+# Index version
+# =========================
+def _indexer_version():
+    """End time of the last successful indexer run; None without search admin settings or indexer."""
+    from config.settings import AZURE_SEARCH_ENDPOINT, AZURE_SEARCH_ADMIN_KEY, SEARCH_INDEXER_NAME
+
+    if not AZURE_SEARCH_ENDPOINT or not AZURE_SEARCH_ADMIN_KEY:
+        return None
+
+    from azure.core.credentials import AzureKeyCredential
+    from azure.core.exceptions import ResourceNotFoundError
+    from azure.search.documents.indexes import SearchIndexerClient
+
+    client = SearchIndexerClient(AZURE_SEARCH_ENDPOINT, AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY))
+    with client:
+        try:
+            status = client.get_indexer_status(SEARCH_INDEXER_NAME)
+        except ResourceNotFoundError:
+            return None
+
+    for result in [status.last_result] + list(status.execution_history or []):
+        if result is not None and result.status == "success" and result.end_time:
+            return result.end_time.isoformat()
+    return None
+
+
+def current_index_version():
+    """
+    Version of the search index content: the last successful indexer run and the ingestion
+    manifest, which every local ingestion run (services/ingestion.py) rewrites.
+    Returns None when neither is available.
+    """
+    indexer_version, local_version = _indexer_version(), manifest_version()
+    if indexer_version is None and local_version is None:
+        return None
+    return f"{indexer_version or ''}|{local_version or ''}"
+
+
+# =========================
+# Cache
+# =========================
+class AnswerCache:
+    def __init__(self, backend, version_fn=current_index_version,
+                 version_check_seconds: int = INDEX_VERSION_CHECK_SECONDS):
+        self.backend = backend
+        self._version_fn = version_fn
+        self._version_check_seconds = version_check_seconds
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh_index_version(self) -> None:
+        now = time.time()
+        if self._version_fn is None or now - self._version_checked_at < self._version_check_seconds:
+            return
+        with self._lock:
+            if now - self._version_checked_at < self._version_check_seconds:
+                return
+            self._version_checked_at = now
+            try:
+                version = self._version_fn()
+            except Exception:
+                # Search status unavailable: keep serving, TTL still bounds staleness
+                return
+            if version is not None and version != self.backend.get_meta("index_version"):
+                # A new indexer or ingestion run completed: answers may reference stale CVs
+                self.backend.clear()
+                self.backend.set_meta("index_version", version)
+
+    def get(self, jd: str, agent_id: str, template: str):
+        self._refresh_index_version()
+        return self.backend.get(make_cache_key(jd, agent_id, template))
+
+    def put(self, jd: str, agent_id: str, template: str, answer: str) -> None:
+        self.backend.set(make_cache_key(jd, agent_id, template), answer)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """Process-wide answer cache configured by ANSWER_CACHE_BACKEND; None when disabled."""
+    global _cache
+    if ANSWER_CACHE_BACKEND == "off":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if ANSWER_CACHE_BACKEND == "sqlite":
+                    backend = SQLiteCacheBackend()
+                elif ANSWER_CACHE_BACKEND == "memory":
+                    backend = MemoryCacheBackend()
+                else:
+                    raise RuntimeError(f"Unknown ANSWER_CACHE_BACKEND: {ANSWER_CACHE_BACKEND}")
+                _cache = AnswerCache(backend)
+    return _cache
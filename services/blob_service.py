@@ -1,15 +1,137 @@
-from azure.storage.blob import BlobServiceClient
-from config.settings import AZURE_STORAGE_CONNECTION_STRING, BLOB_CONTAINER_NAME
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-blob_service = BlobServiceClient.from_connection_string(
-    AZURE_STORAGE_CONNECTION_STRING
-)
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotModifiedError
+from config.settings import get_settings
+from services.telemetry import span
 
-def list_cv_files():
-    container = blob_service.get_container_client(BLOB_CONTAINER_NAME)
-    return [b.name for b in container.list_blobs()]
+# =========================
+# Download config (env)
+# =========================
+# Parallel range requests per blob download
+BLOB_MAX_CONCURRENCY = int(os.getenv("BLOB_MAX_CONCURRENCY", "4"))
+# Blobs downloaded at once by download_many
+BLOB_DOWNLOAD_WORKERS = int(os.getenv("BLOB_DOWNLOAD_WORKERS", "8"))
+# On-disk cache keyed by etag ("" disables it)
+CV_CACHE_DIR = os.getenv("CV_CACHE_DIR", ".cache/cv_blobs")
 
-def download_cv(file_name: str) -> bytes:
-    container = blob_service.get_container_client(BLOB_CONTAINER_NAME)
-    blob = container.get_blob_client(file_name)
-    return blob.download_blob().readall()
+_blob_service = None
+_container = None
+
+def get_blob_service():
+    """
+    Shared BlobServiceClient, created on first use (azure.storage.blob is imported then too).
+    Works with Azurite too: AZURE_STORAGE_CONNECTION_STRING=UseDevelopmentStorage=true
+    """
+    global _blob_service
+    if _blob_service is None:
+        from azure.storage.blob import BlobServiceClient
+        _blob_service = BlobServiceClient.from_connection_string(get_settings().storage.connection_string)
+    return _blob_service
+
+def get_container():
+    global _container
+    if _container is None:
+        _container = get_blob_service().get_container_client(get_settings().storage.container_name)
+    return _container
+
+# =========================
+# Listing
+# =========================
+def iter_cv_blobs(prefix: str = None):
+    """Yields BlobProperties page by page, optionally only names starting with `prefix`."""
+    yield from get_container().list_blobs(name_starts_with=prefix)
+
+def list_cv_files(prefix: str = None):
+    return [b.name for b in iter_cv_blobs(prefix)]
+
+def list_cv_blobs(prefix: str = None):
+    """Yields (name, etag, content_md5 hex or None) for every CV blob."""
+    for b in iter_cv_blobs(prefix):
+        md5 = b.content_settings.content_md5 if b.content_settings else None
+        yield b.name, b.etag, bytes(md5).hex() if md5 else None
+
+# =========================
+# Local cache: <dir>/<sha1(name)>.etag + .bin
+# =========================
+def _cache_paths(file_name: str):
+    key = hashlib.sha1(file_name.encode("utf-8")).hexdigest()
+    return os.path.join(CV_CACHE_DIR, key + ".etag"), os.path.join(CV_CACHE_DIR, key + ".bin")
+
+def _read_cache(file_name: str):
+    if not CV_CACHE_DIR:
+        return None, None
+    etag_path, data_path = _cache_paths(file_name)
+    try:
+        with open(etag_path, encoding="utf-8") as f:
+            etag = f.read()
+        with open(data_path, "rb") as f:
+            return etag, f.read()
+    except FileNotFoundError:
+        return None, None
+
+def _write_cache(file_name: str, etag: str, data: bytes) -> None:
+    if not CV_CACHE_DIR:
+        return
+    os.makedirs(CV_CACHE_DIR, exist_ok=True)
+    etag_path, data_path = _cache_paths(file_name)
+    # data first, etag last: a torn write is a cache miss, never stale data
+    for path, content, mode in ((data_path, data, "wb"), (etag_path, etag, "w")):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, mode) as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+# =========================
+# Download
+# =========================
+def stream_cv(file_name: str, max_concurrency: int = BLOB_MAX_CONCURRENCY):
+    """Yields the blob content in chunks without holding the whole file in memory."""
+    blob = get_container().get_blob_client(file_name)
+    yield from blob.download_blob(max_concurrency=max_concurrency).chunks()
+
+def download_cv(file_name: str, etag: str = None, max_concurrency: int = BLOB_MAX_CONCURRENCY) -> bytes:
+    """
+    Returns the blob content, served from the local cache when it is unchanged.
+    With `etag` (e.g. from list_cv_blobs) a cache hit costs no request at all; otherwise a
+    conditional If-None-Match download is sent and answered with 304 when unchanged.
+    """
+    cached_etag, cached_data = _read_cache(file_name)
+    if cached_data is not None and etag is not None and etag == cached_etag:
+        return cached_data
+
+    with span("blob.download", **{"blob.name": file_name}) as current:
+        blob = get_container().get_blob_client(file_name)
+        try:
+            if cached_data is not None:
+                downloader = blob.download_blob(
+                    max_concurrency=max_concurrency,
+                    etag=cached_etag,
+                    match_condition=MatchConditions.IfModified,
+                )
+            else:
+                downloader = blob.download_blob(max_concurrency=max_concurrency)
+        except ResourceNotModifiedError:
+            current.set_attribute("blob.cache", "not_modified")
+            return cached_data
+
+        data = downloader.readall()
+        current.set_attributes({"blob.cache": "stale" if cached_data is not None else "miss", "blob.bytes": len(data)})
+    _write_cache(file_name, downloader.properties.etag, data)
+    return data
+
+def download_many(blobs, max_workers: int = BLOB_DOWNLOAD_WORKERS, max_concurrency: int = 1):
+    """
+    Downloads many CVs on a worker pool. `blobs` holds names or (name, etag, ...) tuples.
+    Yields (name, bytes) in completion order.
+    """
+    items = [(b, None) if isinstance(b, str) else (b[0], b[1]) for b in blobs]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cv-download") as pool:
+        futures = {
+            pool.submit(download_cv, name, etag, max_concurrency): name
+            for name, etag in items
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,90 @@
+from collections import defaultdict
+
+POOLING_MODES = ("max", "sum", "mean_top_n")
+
+# Shortest shared prefix/suffix treated as chunk overlap (SplitSkill overlap is 350 chars)
+MIN_OVERLAP_CHARS = 30
+
+
+def _pool(scores, pooling: str, top_n: int) -> float:
+    if pooling == "max":
+        return scores[0]
+    if pooling == "sum":
+        return sum(scores)
+    if pooling == "mean_top_n":
+        best = scores[:top_n]
+        return sum(best) / len(best)
+    raise ValueError(f"Unknown pooling: {pooling} (expected one of {POOLING_MODES})")
+
+
+def _overlap_length(first: str, second: str) -> int:
+    """Length of the longest suffix of `first` that is a prefix of `second`."""
+    for k in range(min(len(first), len(second)), MIN_OVERLAP_CHARS - 1, -1):
+        if first.endswith(second[:k]):
+            return k
+    return 0
+
+
+def dedupe_evidence(texts):
+    """
+    Removes text repeated across overlapping chunks of one CV: chunks contained in another are dropped
+    and the shared prefix/suffix between two chunks is kept only once.
+    """
+    kept = []
+    for text in texts:
+        text = text.strip()
+        if not text or any(text in other for other in kept):
+            continue
+        kept = [other for other in kept if other not in text]
+        for i, other in enumerate(kept):
+            head = _overlap_length(other, text)
+            if head:
+                text = text[head:].lstrip()
+                continue
+            tail = _overlap_length(text, other)
+            if tail:
+                kept[i] = other[tail:].lstrip()
+        if text:
+            kept.append(text)
+    return kept
+
+
+def aggregate_candidates(hits, top_candidates: int = 5, pooling: str = "max", top_n: int = 3,
+                         evidence_per_candidate: int = 2, score_field: str = "@search.score"):
+    """
+    Groups chunk hits (best first, Azure AI Search or local engine results) by candidate_id
+    (document_id when missing) and returns the `top_candidates` best distinct candidates:
+
+        {"candidate_id", "document_id", "score", "chunk_ids", "evidence": [deduplicated texts]}
+
+    pooling: "max" (best chunk), "sum" (all chunks), "mean_top_n" (mean of the best `top_n`).
+    """
+    groups = defaultdict(list)
+    for hit in hits:
+        key = hit.get("candidate_id") or hit.get("document_id") or hit.get("id")
+        groups[key].append(hit)
+
+    candidates = []
+    for key, chunk_hits in groups.items():
+        chunk_hits.sort(key=lambda h: h.get(score_field) or 0.0, reverse=True)
+        scores = [h.get(score_field) or 0.0 for h in chunk_hits]
+        best = chunk_hits[:evidence_per_candidate]
+        candidates.append({
+            "candidate_id": chunk_hits[0].get("candidate_id") or key,
+            "document_id": chunk_hits[0].get("document_id"),
+            "score": _pool(scores, pooling, top_n),
+            "chunk_ids": [h.get("id") for h in best],
+            "evidence": dedupe_evidence(h.get("text") or "" for h in best),
+        })
+
+    candidates.sort(key=lambda c: c["score"], reverse=True)
+    return candidates[:top_candidates]
+
+
+def format_candidates(candidates) -> str:
+    """Compact text block of the aggregated candidates, one section per CV, for a prompt or UI."""
+    blocks = []
+    for rank, candidate in enumerate(candidates, start=1):
+        evidence = "\n...\n".join(candidate["evidence"])
+        blocks.append(f"[{rank}] {candidate['candidate_id']} (score {candidate['score']:.3f})\n{evidence}")
+    return "\n\n".join(blocks)
@@ -0,0 +1,316 @@
+import re
+from collections import Counter
+from datetime import date
+
+from services.extraction import iter_sections
+
+# =========================
+# Vocabularies
+# =========================
+# canonical skill -> aliases (lowercase, matched on token boundaries)
+SKILLS = {
+    "python": ["python"],
+    "java": ["java"],
+    "javascript": ["javascript", "js", "es6"],
+    "typescript": ["typescript"],
+    "c#": ["c#", "csharp"],
+    ".net": [".net", "dotnet", "asp.net", ".net core"],
+    "c++": ["c++", "cpp"],
+    "go": ["golang", "go"],
+    "rust": ["rust"],
+    "php": ["php"],
+    "ruby": ["ruby", "rails", "ruby on rails"],
+    "kotlin": ["kotlin"],
+    "swift": ["swift"],
+    "sql": ["sql", "t-sql", "pl/sql", "mysql", "postgresql", "postgres", "sql server"],
+    "nosql": ["nosql", "mongodb", "cosmos db", "cosmosdb", "cassandra", "dynamodb"],
+    "react": ["react", "reactjs", "react.js"],
+    "angular": ["angular", "angularjs"],
+    "vue": ["vue", "vue.js", "vuejs"],
+    "node.js": ["node.js", "nodejs", "node"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "spring": ["spring", "spring boot"],
+    "azure": ["azure"],
+    "aws": ["aws", "amazon web services"],
+    "gcp": ["gcp", "google cloud"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s", "aks", "eks", "gke"],
+    "terraform": ["terraform"],
+    "ci/cd": ["ci/cd", "cicd", "jenkins", "github actions", "azure devops", "gitlab ci"],
+    "linux": ["linux", "unix"],
+    "git": ["git"],
+    "spark": ["spark", "pyspark", "databricks"],
+    "kafka": ["kafka"],
+    "airflow": ["airflow"],
+    "pandas": ["pandas"],
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch"],
+    "nlp": ["nlp", "natural language processing"],
+    "llm": ["llm", "llms", "large language models", "gpt", "openai"],
+    "power bi": ["power bi", "powerbi"],
+    "excel": ["excel"],
+    "figma": ["figma"],
+    "scrum": ["scrum", "agile"],
+}
+
+# domain -> keywords
+DOMAINS = {
+    "finance": ["bank", "banking", "fintech", "finance", "financial", "payment", "payments", "insurance", "trading"],
+    "healthcare": ["healthcare", "hospital", "medical", "clinical", "pharma", "health"],
+    "e-commerce": ["e-commerce", "ecommerce", "retail", "marketplace", "online shop"],
+    "education": ["education", "edtech", "e-learning", "university", "school"],
+    "telecom": ["telecom", "telecommunication", "telecommunications", "5g"],
+    "gaming": ["game", "games", "gaming"],
+    "logistics": ["logistics", "supply chain", "shipping", "transportation"],
+    "manufacturing": ["manufacturing", "factory", "industrial", "automotive"],
+    "government": ["government", "public sector"],
+    "media": ["media", "advertising", "marketing"],
+}
+
+# ordered from most to least senior
+SENIORITY_KEYWORDS = [
+    ("principal", ["principal", "director", "head of", "vp ", "cto", "architect"]),
+    ("lead", ["lead", "team lead", "tech lead", "manager", "staff"]),
+    ("senior", ["senior", "sr.", "sr "]),
+    ("mid", ["mid-level", "mid level", "intermediate"]),
+    ("junior", ["junior", "jr.", "jr ", "fresher", "entry level", "graduate"]),
+    ("intern", ["intern", "internship", "trainee"]),
+]
+SENIORITY_LEVELS = ["intern", "junior", "mid", "senior", "lead", "principal"]
+
+_ROLE_WORDS = re.compile(
+    r"\b(engineer|developer|programmer|analyst|scientist|architect|manager|designer|consultant|"
+    r"administrator|specialist|tester|devops|lead|intern)\b",
+    re.IGNORECASE,
+)
+
+_ALIASES = sorted(((alias, skill) for skill, aliases in SKILLS.items() for alias in aliases),
+                  key=lambda item: -len(item[0]))
+_SKILL_PATTERN = re.compile(
+    r"(?<![\w.#+])(" + "|".join(re.escape(alias) for alias, _ in _ALIASES) + r")(?![\w#+])",
+    re.IGNORECASE,
+)
+_ALIAS_TO_SKILL = {alias: skill for alias, skill in _ALIASES}
+
+_MONTHS = "jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec"
+_DATE = rf"(?:(?:{_MONTHS})[a-z]*\.?\s+|\d{{1,2}}[/.-])?((?:19|20)\d{{2}})"
+_RANGE = re.compile(
+    rf"{_DATE}\s*(?:-|–|—|to|until)\s*(?:{_DATE}|(present|now|current|today|hiện tại))",
+    re.IGNORECASE,
+)
+_YEARS_STATED = re.compile(r"(\d{1,2})\s*\+?\s*(?:years?|yrs?)(?:\s+of)?\s+(?:\w+\s+){0,3}?experience", re.IGNORECASE)
+
+
+# =========================
+# Extraction
+# =========================
+def extract_skills(text: str):
+    return sorted({_ALIAS_TO_SKILL[m.group(1).lower()] for m in _SKILL_PATTERN.finditer(text)})
+
+
+def extract_years_experience(text: str):
+    """Years covered by the (merged) date ranges in the text, or the largest stated 'N years of experience'."""
+    this_year = date.today().year
+    intervals = []
+    for match in _RANGE.finditer(text):
+        start = int(match.group(1))
+        end = this_year if match.group(3) else int(match.group(2))
+        if start <= end <= this_year:
+            intervals.append((start, end))
+
+    covered = 0
+    for start, end in _merge(intervals):
+        covered += max(end - start, 0.5)
+
+    stated = [int(m.group(1)) for m in _YEARS_STATED.finditer(text)]
+    best = max([covered] + stated) if (intervals or stated) else None
+    return float(best) if best is not None else None
+
+
+def _merge(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def extract_seniority(text: str, years=None):
+    lowered = f" {text.lower()} "
+    for level, keywords in SENIORITY_KEYWORDS:
+        if any(k in lowered for k in keywords):
+            return level
+    if years is None:
+        return None
+    if years < 2:
+        return "junior"
+    if years < 5:
+        return "mid"
+    return "senior"
+
+
+def extract_domain(text: str):
+    lowered = text.lower()
+    counts = Counter()
+    for domain, keywords in DOMAINS.items():
+        for keyword in keywords:
+            counts[domain] += len(re.findall(rf"\b{re.escape(keyword)}\b", lowered))
+    domain, count = counts.most_common(1)[0]
+    return domain if count else None
+
+
+def extract_current_role(sections):
+    """First role-like line of the experience section, else of the CV header."""
+    for wanted in ("experience", "header", "summary"):
+        for section, text in sections:
+            if section != wanted:
+                continue
+            for line in text.split("\n")[1 if section == "experience" else 0:]:
+                line = line.strip(" -•*|")
+                if 3 <= len(line) <= 80 and _ROLE_WORDS.search(line):
+                    return line
+    return None
+
+
+def extract_profile(text: str) -> dict:
+    """Structured candidate profile, stored as filterable/facetable index fields."""
+    sections = list(iter_sections(text))
+    experience_text = "\n".join(t for s, t in sections if s in ("experience", "header", "summary")) or text
+    years = extract_years_experience(experience_text)
+    current_role = extract_current_role(sections)
+    return {
+        "skills": extract_skills(text),
+        "years_experience": years,
+        "seniority": extract_seniority(current_role or experience_text[:300], years),
+        "current_role": current_role,
+        "domain": extract_domain(experience_text),
+    }
+
+
+# =========================
+# JD -> requirements -> filter
+# =========================
+_HARD_LINE = re.compile(r"\b(must|required|requirements?|mandatory|need to have|yêu cầu|bắt buộc)\b", re.IGNORECASE)
+_NICE_LINE = re.compile(r"\b(nice to have|preferred|plus|bonus|optional|ưu tiên)\b", re.IGNORECASE)
+_YEARS = r"(\d{1,2})(?:\s*(?:-|–|to|đến)\s*\d{1,2})?\s*\+?\s*(?:years?|yrs?|năm)"
+_EXPERIENCE = r"(?:experience|exp\.|kinh nghiệm)"
+# Years next to "experience": "3-5 years of (Python) experience", "Experience: 3+ years", "kinh nghiệm tối thiểu 2 năm"
+_MIN_YEARS = [
+    re.compile(rf"{_YEARS}(?:['’]s?)?(?:\s+of)?\s+(?:[\w/#+.-]+\s+){{0,2}}?{_EXPERIENCE}", re.IGNORECASE),
+    re.compile(rf"{_EXPERIENCE}[\s:]+(?:(?:of|in|at least|minimum|min\.|from|tối thiểu|ít nhất|từ|trên)[\s:]+)*{_YEARS}",
+               re.IGNORECASE),
+]
+# On requirement lines only: "at least 5 years Python", "5+ years Python"
+_MIN_YEARS_REQUIRED = re.compile(
+    rf"(?:at least|minimum|min\.|ít nhất|tối thiểu)\s+{_YEARS}|(\d{{1,2}})\s*\+\s*(?:years?|yrs?|năm)", re.IGNORECASE
+)
+
+# Aliases that are also common words ("go to market", "excel at", "spring 2024"): a hard requirement
+# only inside a skill list ("Java, Spring, SQL") or with a qualifier ("Go developer", "Spring framework")
+AMBIGUOUS_ALIASES = frozenset({"go", "excel", "node", "ml", "git", "spring", "agile"})
+_LIST_SEPARATOR = re.compile(r"\s*(?:[,;/&|]|and|or)\s*", re.IGNORECASE)
+_QUALIFIER = re.compile(
+    r"\s+(?:developers?|engineers?|programming|language|framework|mvc|vba|models?|ops|workflows?|"
+    r"methodolog(?:y|ies))\b",
+    re.IGNORECASE,
+)
+
+
+def _confident_skills(text: str) -> set:
+    """Skills of `text`, ambiguous aliases only when they appear in a skill list or with a qualifier."""
+    matches = list(_SKILL_PATTERN.finditer(text))
+    skills = set()
+    for i, match in enumerate(matches):
+        alias = match.group(1).lower()
+        if alias in AMBIGUOUS_ALIASES:
+            gaps = [text[matches[j].end():matches[j + 1].start()] for j in (i - 1, i) if 0 <= j < len(matches) - 1]
+            if not (any(_LIST_SEPARATOR.fullmatch(gap) for gap in gaps) or _QUALIFIER.match(text, match.end())):
+                continue
+        skills.add(_ALIAS_TO_SKILL[alias])
+    return skills
+
+
+def _min_years(line: str, required: bool) -> list:
+    """Lower bounds of the experience years stated on a JD line ("3-5 years" -> 3)."""
+    years = [int(m.group(1)) for pattern in _MIN_YEARS for m in pattern.finditer(line)]
+    if required:
+        years += [int(m.group(1) or m.group(2)) for m in _MIN_YEARS_REQUIRED.finditer(line)]
+    return years
+
+
+def extract_requirements(jd_text: str) -> dict:
+    """
+    Requirements stated in a job description:
+    hard skills (on must/required lines), soft skills, minimum years (only numbers stated as
+    experience, the lower bound of a range), seniority and domain.
+    """
+    hard, soft = set(), set()
+    years = []
+    section = None  # "hard" / "nice" under a "Requirements:" / "Nice to have:" heading
+    for line in jd_text.split("\n"):
+        skills = set(extract_skills(line))
+        heading = line.strip().endswith(":")
+        if _NICE_LINE.search(line):
+            kind = "nice"
+        elif _HARD_LINE.search(line):
+            kind = "hard"
+        elif heading:
+            kind = None
+        else:
+            kind = section
+        if heading or (not skills and kind):
+            section = kind
+        if kind == "hard":
+            confident = _confident_skills(line)
+            hard.update(confident)
+            soft.update(skills - confident)
+        else:
+            soft.update(skills)
+        years += _min_years(line, required=kind == "hard")
+
+    return {
+        "required_skills": sorted(hard),
+        "preferred_skills": sorted(soft - hard),
+        "min_years": float(min(years)) if years else None,
+        "seniority": extract_seniority(jd_text) if any(
+            k in jd_text.lower() for _, keywords in SENIORITY_KEYWORDS for k in keywords) else None,
+        "domain": extract_domain(jd_text),
+    }
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def build_odata_filter(requirements: dict) -> str:
+    """
+    OData filter for the hard requirements. A CV with an unknown field (null or empty, e.g. indexed by
+    the skillset without a profile) is not excluded by that field.
+    """
+    clauses = []
+    for skill in requirements.get("required_skills") or []:
+        clauses.append(f"(not skills/any() or skills/any(s: s eq {_quote(skill)}))")
+    if requirements.get("min_years") is not None:
+        clauses.append(f"(years_experience eq null or years_experience ge {requirements['min_years']:g})")
+    return " and ".join(clauses)
+
+
+def matches_requirements(profile: dict, requirements: dict) -> bool:
+    """Same semantics as build_odata_filter, for local candidates and the local search engine."""
+    skills = profile.get("skills") or []
+    if skills and not set(requirements.get("required_skills") or []) <= set(skills):
+        return False
+    years = profile.get("years_experience")
+    min_years = requirements.get("min_years")
+    return years is None or min_years is None or years >= min_years
+
+
+def jd_filter(jd_text: str) -> str:
+    """OData filter for the search tool derived from a job description ("" if it has no hard requirement)."""
+    return build_odata_filter(extract_requirements(jd_text))
@@ -0,0 +1,80 @@
+import re
+
+from config.settings import CHUNK_MODE, SPLIT_MAXIMUM_PAGE_LENGTH, SPLIT_PAGE_OVERLAP_LENGTH
+from services.extraction import iter_sections
+
+# Sentence ends (., !, ?, ;) or line breaks, like the SplitSkill "pages" mode
+_SENTENCE = re.compile(r"[^.!?;\n]*(?:[.!?;]+|\n+|$)")
+
+
+def _sentences(text: str):
+    for match in _SENTENCE.finditer(text):
+        sentence = match.group(0)
+        if sentence.strip():
+            yield sentence
+
+
+def _hard_split(sentence: str, max_length: int):
+    """Splits a sentence longer than a page on whitespace (or hard, if it has none)."""
+    while len(sentence) > max_length:
+        cut = sentence.rfind(" ", 0, max_length)
+        cut = cut if cut > 0 else max_length
+        yield sentence[:cut]
+        sentence = sentence[cut:]
+    if sentence.strip():
+        yield sentence
+
+
+def _overlap_tail(page: str, overlap: int) -> str:
+    """Last `overlap` characters of a page, starting on a word boundary."""
+    if overlap <= 0 or len(page) <= overlap:
+        return page if overlap > 0 else ""
+    tail = page[-overlap:]
+    space = tail.find(" ")
+    return tail[space + 1:] if 0 <= space < len(tail) - 1 else tail
+
+
+def split_pages(text: str, max_length: int = SPLIT_MAXIMUM_PAGE_LENGTH,
+                overlap: int = SPLIT_PAGE_OVERLAP_LENGTH):
+    """
+    Local equivalent of SplitSkill(text_split_mode="pages", unit="characters"):
+    sentences are packed into pages of at most `max_length` characters, and each page
+    after the first starts with the last `overlap` characters of the previous one.
+    """
+    if overlap >= max_length:
+        raise ValueError("overlap must be smaller than max_length")
+
+    pages = []
+    current = ""
+    for sentence in _sentences(text):
+        # A piece always fits next to the overlap carried from the previous page
+        for piece in _hard_split(sentence, max_length - overlap):
+            if current and len(current) + len(piece) > max_length:
+                pages.append(current.strip())
+                current = _overlap_tail(current, overlap)
+            current += piece
+    if current.strip():
+        pages.append(current.strip())
+    return pages
+
+
+def split_sections(text: str, max_length: int = SPLIT_MAXIMUM_PAGE_LENGTH, overlap: int = 0):
+    """
+    CV-section-aware chunks: pages never cross a section boundary (experience, skills, education, ...),
+    and overlap only applies inside a section. Returns [(section, chunk)].
+    """
+    chunks = []
+    for section, section_text in iter_sections(text):
+        for page in split_pages(section_text, max_length, overlap):
+            chunks.append((section, page))
+    return chunks
+
+
+def chunk_text(text: str, mode: str = CHUNK_MODE, max_length: int = SPLIT_MAXIMUM_PAGE_LENGTH,
+               overlap: int = SPLIT_PAGE_OVERLAP_LENGTH):
+    """Chunks for the index: mode "pages" (same as the skillset) or "sections"."""
+    if mode == "pages":
+        return split_pages(text, max_length, overlap)
+    if mode == "sections":
+        return [chunk for _, chunk in split_sections(text, max_length, overlap)]
+    raise ValueError(f"Unknown chunk mode: {mode}")
@@ -0,0 +1,320 @@
+"""
+Direct retrieval: list / lookup questions answered from the chunk index (scripts/setup_search.py)
+with one or two search requests instead of an agent run.
+
+    "which CVs mention Kubernetes?"     list    candidates ranked by search, highlighted snippets
+    "show me the CV of cv_00012.pdf"    lookup  the candidate's profile fields and CV text
+    a JD, "who fits best for ..."       None    evaluation: goes to the agent
+
+    intent = classify_intent(prompt)
+    answer = get_direct_retriever().answer(intent) if intent else None   # None -> agent
+
+The client is any object with the `search()` of azure.search.documents.SearchClient; tests and
+benchmarks use services.local_search.LocalSearchClient (or the search stub) instead of the service.
+"""
+import os
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+
+from services.candidate_aggregation import aggregate_candidates, dedupe_evidence
+from services.telemetry import span
+
+# =========================
+# Direct retrieval config (env)
+# =========================
+# 0 = every question goes to the agent
+DIRECT_RETRIEVAL = os.getenv("DIRECT_RETRIEVAL", "1") == "1"
+# Candidates listed in a list answer, highlighted snippets per candidate
+DIRECT_RETRIEVAL_TOP = int(os.getenv("DIRECT_RETRIEVAL_TOP", "10"))
+DIRECT_RETRIEVAL_SNIPPETS = int(os.getenv("DIRECT_RETRIEVAL_SNIPPETS", "2"))
+# Chunk hits fetched per request (grouped into distinct candidates)
+DIRECT_RETRIEVAL_POOL = int(os.getenv("DIRECT_RETRIEVAL_POOL", "100"))
+# CV text shown by a lookup answer
+DIRECT_RETRIEVAL_LOOKUP_CHARS = int(os.getenv("DIRECT_RETRIEVAL_LOOKUP_CHARS", "3000"))
+
+# Markdown bold: the highlights render as-is in the chat
+HIGHLIGHT_PRE_TAG = "**"
+HIGHLIGHT_POST_TAG = "**"
+
+PROFILE_FIELDS = ["skills", "years_experience", "seniority", "current_role", "domain"]
+_LIST_FIELDS = ["id", "document_id", "candidate_id", "text"]
+_LOOKUP_FIELDS = _LIST_FIELDS + PROFILE_FIELDS
+
+_CV = r"(?:cvs?|resumes?|candidates?|applicants?|people|ứng viên|hồ sơ)"
+_VERB = r"(?:show|open|display|view|get|give)(?:\s+me)?"
+
+# Ranking, comparing or judging fit needs the agent
+_EVALUATION = re.compile(
+    r"\b(?:evaluate|assess|rank|ranking|compare|best|strongest|most|suitable|fit|fits|match|matches|"
+    r"matching|recommend|shortlist|score|why|should|hire|đánh giá|so sánh|phù hợp|xếp hạng|tốt nhất|nên|tuyển)\b",
+    re.IGNORECASE,
+)
+# Logic a keyword AND search cannot express: negation, disjunction, a role to fill (a JD)
+_NEGATION = re.compile(
+    r"\b(?:not|no|never|none|without|except|excluding|lack|lacks|lacking|missing|absent|"
+    r"dont|doesnt|didnt|havent|hasnt)\b"
+    r"|\w+n['’]t\b|\b(?:không|chưa|thiếu|ngoại trừ|trừ)\b",
+    re.IGNORECASE,
+)
+_DISJUNCTION = re.compile(r"\b(?:or|either|nor|hoặc)\b", re.IGNORECASE)
+_ROLE = re.compile(
+    r"\b(?:role|position|job|jd|vacancy|opening|developer|engineer|architect|analyst|intern|junior|senior|"
+    r"lead|manager|vị trí|công việc)s?\b",
+    re.IGNORECASE,
+)
+# Numbers, years or comparisons in a list question ("more than 5 years of Python")
+_QUANTITY = re.compile(
+    r"\d|\b(?:years?|yrs?|months?|more|less|fewer|than|least|over|under|above|below|năm|tháng|hơn|trên|dưới)\b",
+    re.IGNORECASE,
+)
+_FILENAME = re.compile(r"[\w.\-]+\.(?:pdf|docx?)\b", re.IGNORECASE)
+_LOOKUP = [
+    re.compile(rf"^(?:{_VERB}\s+)?(?:the\s+)?(?:cv|resume|profile)\s+(?:of|for)\s+(?P<name>.+)$", re.IGNORECASE),
+    re.compile(rf"^{_VERB}\s+(?P<name>.+?)['’]s?\s+(?:cv|resume|profile)$", re.IGNORECASE),
+    re.compile(r"^(?:(?:cho (?:tôi|mình) xem|xem|mở|hiển thị)\s+)?(?:cv|hồ sơ)\s+của\s+(?P<name>.+)$", re.IGNORECASE),
+]
+_LIST = re.compile(
+    rf"^(?:(?:which|what)\s+{_CV}"
+    rf"|(?:list|find|show|get|search)(?:\s+me)?(?:\s+(?:all|the|every))*\s+{_CV}"
+    r"|who\s+(?:has|have|knows?|mentions?|uses?|used|worked|works|lists?)"
+    rf"|how\s+many\s+{_CV}"
+    r"|(?:liệt kê|tìm|hiển thị|cho (?:tôi|mình) xem)(?:\s+(?:các|những|tất cả))*\s+(?:cv|ứng viên|hồ sơ)"
+    r"|(?:(?:những|các)\s+)?(?:cv|ứng viên|hồ sơ)\s+nào"
+    r"|ai\s+(?:biết|có|từng))\b",
+    re.IGNORECASE,
+)
+# Words of the question itself, not of what the CVs should contain
+_FILLER = frozenset(
+    "mention mentions mentioning mentioned contain contains containing include includes including list lists "
+    "with have has having know knows knowing knowledge who which what do does did me all any every "
+    "cv cvs resume resumes candidate candidates applicant applicants people experience experienced "
+    "skill skills worked work works working use uses used using their them they in on please "
+    "you your we our us than but also only there some get find show list search "
+    "có biết về với kinh nghiệm nhắc đến đề cập từng làm dùng sử dụng nào ứng viên những các cho tôi mình xem "
+    "hồ sơ".split()
+)
+_NAME_PREFIX = re.compile(r"^(?:candidate|applicant|ứng viên)\s+", re.IGNORECASE)
+_TRAILING_DIGITS = re.compile(r"(\d+)$")
+
+
+@dataclass
+class Intent:
+    kind: str                       # "list" | "lookup"
+    query: str                      # list: search terms; lookup: candidate name or file name
+    terms: list = field(default_factory=list)
+
+
+@dataclass
+class DirectAnswer:
+    intent: Intent
+    candidates: list                # list: {candidate_id, score, snippets}; lookup: one candidate with text/profile
+    total: int = 0                  # distinct candidates found (list)
+    truncated: bool = False         # the chunk pool was full: more candidates may match
+    elapsed_ms: float = 0.0
+
+
+def classify_intent(text: str):
+    """
+    Intent of a chat message: Intent("list", ...) / Intent("lookup", ...), or None for anything
+    that needs the agent: a JD or a role to fill, an evaluation or comparison, negation ("don't have
+    Java"), disjunction ("Google or Microsoft"), a numeric constraint in a list question ("more than
+    5 years of Python") or a question without search terms.
+    """
+    from services.local_search import tokenize
+
+    text = (text or "").strip()
+    # Multi-line or long messages are JDs
+    if not text or "\n" in text or len(text) > 200:
+        return None
+    if any(pattern.search(text) for pattern in (_EVALUATION, _NEGATION, _DISJUNCTION, _ROLE)):
+        return None
+    question = text.rstrip(" ?.!")
+
+    filename = _FILENAME.search(question)
+    if filename:
+        return Intent("lookup", filename.group())
+    for pattern in _LOOKUP:
+        match = pattern.match(question)
+        if match:
+            name = _NAME_PREFIX.sub("", match.group("name").strip(" \"'")).strip()
+            return Intent("lookup", name) if name else None
+
+    match = _LIST.match(question)
+    if match and not _QUANTITY.search(question[match.end():]):
+        terms = [t for t in tokenize(question[match.end():]) if t not in _FILLER]
+        if terms:
+            return Intent("list", " ".join(terms), terms)
+    return None
+
+
+def normalize_name(text: str) -> list:
+    """Lower-case ASCII tokens of a name or file name ("Nguyễn_Văn_A.pdf" -> ["nguyen", "van", "a"])."""
+    text = unicodedata.normalize("NFKD", text.replace("đ", "d").replace("Đ", "D"))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = _FILENAME.sub(lambda m: m.group().rsplit(".", 1)[0], text)
+    return re.findall(r"[a-z0-9]+", text)
+
+
+def _quote(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def _chunk_order(hit: dict):
+    number = _TRAILING_DIGITS.search(hit.get("id") or "")
+    return int(number.group(1)) if number else 0, hit.get("id") or ""
+
+
+class DirectRetriever:
+    def __init__(self, client, top: int = DIRECT_RETRIEVAL_TOP, snippets: int = DIRECT_RETRIEVAL_SNIPPETS,
+                 pool: int = DIRECT_RETRIEVAL_POOL):
+        self.client = client
+        self.top = top
+        self.snippets = snippets
+        self.pool = pool
+
+    def answer(self, intent: Intent):
+        """DirectAnswer for `intent`; None when a lookup finds no such candidate (the agent answers)."""
+        start = time.perf_counter()
+        with span("search.direct", **{"direct.intent": intent.kind}) as current:
+            if intent.kind == "list":
+                answer = self.list_candidates(intent)
+            else:
+                answer = self.lookup_candidate(intent)
+            current.set_attribute("direct.candidates", len(answer.candidates) if answer else 0)
+        if answer is not None:
+            answer.elapsed_ms = (time.perf_counter() - start) * 1000
+        return answer
+
+    # ---------- list ----------
+    def list_candidates(self, intent: Intent) -> DirectAnswer:
+        """CVs containing every term, best first, with their highlighted sentences."""
+        hits = list(self.client.search(
+            intent.query,
+            search_mode="all",
+            top=self.pool,
+            select=_LIST_FIELDS,
+            highlight_fields="text",
+            highlight_pre_tag=HIGHLIGHT_PRE_TAG,
+            highlight_post_tag=HIGHLIGHT_POST_TAG,
+        ))
+        highlights = {h.get("id"): (h.get("@search.highlights") or {}).get("text") or [] for h in hits}
+        candidates = aggregate_candidates(hits, top_candidates=len(hits), evidence_per_candidate=self.snippets)
+        for candidate in candidates:
+            snippets = dedupe_evidence(s for chunk_id in candidate["chunk_ids"] for s in highlights.get(chunk_id, []))
+            candidate["snippets"] = (snippets or candidate["evidence"])[:self.snippets]
+        return DirectAnswer(intent, candidates[:self.top], total=len(candidates), truncated=len(hits) >= self.pool)
+
+    # ---------- lookup ----------
+    def resolve_candidate(self, name: str):
+        """candidate_id for a file name or a person's name, None if no CV matches."""
+        wanted = normalize_name(name)
+        if not wanted:
+            return None
+        if _FILENAME.fullmatch(name):
+            ids = [name]
+        elif not re.search(r"\s", name) and not name.isalpha():
+            # Bare file stem ("cv_00012"): the usual extensions
+            ids = [f"{name}.{extension}" for extension in ("pdf", "docx", "doc")]
+        else:
+            ids = []
+        if ids:
+            hits = self._chunks(ids, top=1)
+            if hits:
+                return hits[0]["candidate_id"]
+
+        # The name is in the CV text (header) and usually in the file name
+        hits = list(self.client.search(name, search_mode="all", top=self.pool, select=["id", "candidate_id"]))
+        ranked = [c["candidate_id"] for c in aggregate_candidates(hits, top_candidates=len(hits))]
+        by_file_name = [c for c in ranked if set(wanted) <= set(normalize_name(c))]
+        if by_file_name:
+            return by_file_name[0]
+        return ranked[0] if ranked and len(wanted) > 1 else None
+
+    def _chunks(self, candidate_ids, top: int = None):
+        joined = "|".join(_quote(c) for c in candidate_ids)
+        return list(self.client.search(
+            "*",
+            filter=f"search.in(candidate_id, '{joined}', '|')",
+            top=top or self.pool,
+            select=_LOOKUP_FIELDS,
+        ))
+
+    def lookup_candidate(self, intent: Intent):
+        candidate_id = self.resolve_candidate(intent.query)
+        if candidate_id is None:
+            return None
+        chunks = sorted(self._chunks([candidate_id]), key=_chunk_order)
+        if not chunks:
+            return None
+        text = "\n".join(dedupe_evidence(c.get("text") or "" for c in chunks))
+        candidate = {
+            "candidate_id": candidate_id,
+            "document_id": chunks[0].get("document_id"),
+            "profile": {f: chunks[0].get(f) for f in PROFILE_FIELDS if chunks[0].get(f) not in (None, [], "")},
+            "text": text[:DIRECT_RETRIEVAL_LOOKUP_CHARS],
+            "text_truncated": len(text) > DIRECT_RETRIEVAL_LOOKUP_CHARS,
+            "chunks": len(chunks),
+        }
+        return DirectAnswer(intent, [candidate], total=1)
+
+
+def format_direct_answer(answer: DirectAnswer) -> str:
+    """Markdown answer for the chat."""
+    if answer.intent.kind == "lookup":
+        candidate = answer.candidates[0]
+        profile = candidate["profile"]
+        lines = [f"📄 **{candidate['candidate_id']}**"]
+        if profile.get("skills"):
+            lines.append(f"- Skills: {', '.join(profile['skills'])}")
+        facts = []
+        if profile.get("years_experience") is not None:
+            facts.append(f"{profile['years_experience']:g} years")
+        facts += [profile[f] for f in ("seniority", "current_role", "domain") if profile.get(f)]
+        if facts:
+            lines.append(f"- Experience: {' · '.join(facts)}")
+        lines += ["", candidate["text"] + (" …" if candidate["text_truncated"] else "")]
+        return "\n".join(lines)
+
+    query = f"`{answer.intent.query}`"
+    if not answer.candidates:
+        return f"🔎 No CV mentions {query}."
+    count = f"{answer.total}+" if answer.truncated else str(answer.total)
+    lines = [f"🔎 **{count} CV(s)** mention {query}:", ""]
+    for rank, candidate in enumerate(answer.candidates, start=1):
+        lines.append(f"{rank}. **{candidate['candidate_id']}** (score {candidate['score']:.2f})")
+        lines += [f"    > {snippet}" for snippet in candidate["snippets"]]
+    if answer.total > len(answer.candidates):
+        lines += ["", f"_Top {len(answer.candidates)} of {count} shown._"]
+    return "\n".join(lines)
+
+
+_retriever = None
+_lock = threading.Lock()
+
+
+def get_direct_retriever():
+    """
+    Process-wide retriever on the chunk index (AZURE_SEARCH_ENDPOINT / SEARCH_INDEX_NAME),
+    None if direct retrieval is off or the search settings are missing.
+    """
+    global _retriever
+    if not DIRECT_RETRIEVAL:
+        return None
+    if _retriever is None:
+        from config.settings import get_settings
+
+        search = get_settings().search
+        if not (search.endpoint and search.query_key):
+            return None
+        with _lock:
+            if _retriever is None:
+                from azure.core.credentials import AzureKeyCredential
+                from azure.search.documents import SearchClient
+
+                # Query traffic only: a query key, not the admin key
+                client = SearchClient(search.endpoint, search.index_name, AzureKeyCredential(search.query_key))
+                _retriever = DirectRetriever(client)
+    return _retriever
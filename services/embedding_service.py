@@ -0,0 +1,58 @@
+import os
+import random
+import time
+
+import requests
+
+from config.settings import (
+    AZURE_OPENAI_ENDPOINT,
+    AZURE_OPENAI_API_KEY,
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+    AZURE_OPENAI_EMBEDDING_DIM,
+)
+from services.admission import retry_after_header
+
+AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21")
+# Inputs per embeddings request (Azure OpenAI accepts up to 2048)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_MAX_RETRIES = 5
+
+_session = requests.Session()
+
+
+def _post_embeddings(inputs):
+    url = (
+        f"{AZURE_OPENAI_ENDPOINT.rstrip('/')}/openai/deployments/"
+        f"{AZURE_OPENAI_EMBEDDING_DEPLOYMENT}/embeddings?api-version={AZURE_OPENAI_API_VERSION}"
+    )
+    body = {"input": inputs, "dimensions": AZURE_OPENAI_EMBEDDING_DIM}
+
+    for attempt in range(EMBEDDING_MAX_RETRIES + 1):
+        response = _session.post(url, json=body, headers={"api-key": AZURE_OPENAI_API_KEY}, timeout=120)
+        if response.status_code == 429 or response.status_code >= 500:
+            if attempt == EMBEDDING_MAX_RETRIES:
+                break
+            # Retry-After may be seconds or an HTTP-date
+            wait = retry_after_header(response.headers)
+            delay = 2 ** attempt if wait is None else wait
+            time.sleep(delay + random.uniform(0, 1))
+            continue
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+    response.raise_for_status()
+    raise RuntimeError(f"Embedding request failed: {response.status_code} {response.text}")
+
+
+def embed_texts(texts, batch_size: int = EMBEDDING_BATCH_SIZE):
+    """Embeds `texts` with the Azure OpenAI embedding deployment, `batch_size` inputs per request."""
+    if not all([AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY, AZURE_OPENAI_EMBEDDING_DEPLOYMENT]):
+        raise RuntimeError(
+            "Missing env vars: AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY, AZURE_OPENAI_EMBEDDING_DEPLOYMENT"
+        )
+
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(_post_embeddings(texts[start:start + batch_size]))
+    return vectors
@@ -0,0 +1,152 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+from config.settings import AZURE_OPENAI_EMBEDDING_DEPLOYMENT, AZURE_OPENAI_EMBEDDING_DIM
+
+# On-disk store (env); one store per embedding model + dimension
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", ".cache/embeddings")
+
+
+def text_key(text: str) -> str:
+    """Content address of a chunk: identical text always maps to the same vector."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Content-addressed embeddings in a memory-mapped float32 matrix.
+
+    vectors.f32  rows of `dim` float32, append-only
+    keys.txt     one text key per line; line i is row i
+
+    Vectors are read through np.memmap, so the matrix is never loaded into RAM as a whole.
+    """
+
+    def __init__(self, path: str = None, dim: int = AZURE_OPENAI_EMBEDDING_DIM):
+        model = AZURE_OPENAI_EMBEDDING_DEPLOYMENT or "default"
+        self.path = path or os.path.join(EMBEDDING_STORE_DIR, f"{model}-{dim}")
+        self.dim = dim
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._keys_path = os.path.join(self.path, "keys.txt")
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._matrix = None
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+
+    # ---------- storage ----------
+    def _load(self) -> None:
+        data = b""
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "rb") as f:
+                data = f.read()
+        # Only newline-terminated keys are complete
+        keys = data.split(b"\n")[:-1]
+        row_bytes = self.dim * 4
+        stored_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        # A torn append leaves a vector without its key (or a key without its full vector):
+        # both files are cut back to the complete rows, so the next add() appends in line
+        count = min(len(keys), stored_rows)
+        keys_size = sum(len(key) + 1 for key in keys[:count])
+        if len(data) > keys_size:
+            os.truncate(self._keys_path, keys_size)
+        if os.path.exists(self._vectors_path) and os.path.getsize(self._vectors_path) > count * row_bytes:
+            os.truncate(self._vectors_path, count * row_bytes)
+        self._rows = {key.decode("utf-8"): row for row, key in enumerate(keys[:count])}
+        self._count = count
+        self._matrix = None
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """(rows, dim) float32 memmap of every stored vector."""
+        if self._matrix is None or self._matrix.shape[0] != self._count:
+            if self._count == 0:
+                return np.zeros((0, self.dim), dtype=np.float32)
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(self._count, self.dim))
+        return self._matrix
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def row(self, key: str):
+        return self._rows.get(key)
+
+    def get(self, key: str):
+        row = self._rows.get(key)
+        return None if row is None else np.asarray(self.matrix[row])
+
+    def add(self, keys, vectors) -> None:
+        """Appends new vectors; keys that are already stored are ignored."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            new = [(k, v) for k, v in zip(keys, vectors) if k not in self._rows]
+            seen = set()
+            new = [(k, v) for k, v in new if not (k in seen or seen.add(k))]
+            if not new:
+                return
+            # The vectors are durable before their keys: a crash in between only leaves
+            # trailing vectors without keys, which _load() trims
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.stack([v for _, v in new]).astype(np.float32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{k}\n" for k, _ in new))
+            for k, _ in new:
+                self._rows[k] = self._count
+                self._count += 1
+
+    def compact(self, live_keys) -> int:
+        """Rewrites the store with only `live_keys`. Returns the number of rows dropped."""
+        live_keys = set(live_keys)
+        with self._lock:
+            keep = [k for k in self._rows if k in live_keys]
+            dropped = self._count - len(keep)
+            if dropped == 0:
+                return 0
+            matrix = self.matrix
+            tmp_vectors, tmp_keys = self._vectors_path + ".tmp", self._keys_path + ".tmp"
+            with open(tmp_vectors, "wb") as f:
+                for start in range(0, len(keep), 4096):
+                    rows = [self._rows[k] for k in keep[start:start + 4096]]
+                    f.write(np.asarray(matrix[rows], dtype=np.float32).tobytes())
+            with open(tmp_keys, "w", encoding="utf-8") as f:
+                f.write("".join(f"{k}\n" for k in keep))
+            self._matrix = None
+            del matrix
+            os.replace(tmp_vectors, self._vectors_path)
+            os.replace(tmp_keys, self._keys_path)
+            self._load()
+            return dropped
+
+    # ---------- embedding ----------
+    def get_or_embed(self, texts, embed_fn):
+        """
+        Vectors for `texts`, calling `embed_fn(list_of_texts)` only for text that is not stored yet.
+        Returns (list of vectors, number of texts sent to embed_fn).
+        """
+        keys = [text_key(t) for t in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self._rows and key not in missing:
+                missing[key] = text
+        if missing:
+            self.add(list(missing), embed_fn(list(missing.values())))
+        matrix = self.matrix
+        return [np.asarray(matrix[self._rows[k]]).tolist() for k in keys], len(missing)
+
+
+_store = None
+
+
+def get_embedding_store() -> EmbeddingStore:
+    global _store
+    if _store is None:
+        _store = EmbeddingStore()
+    return _store
@@ -0,0 +1,215 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# Extraction config (env)
+# =========================
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", ".cache/extracted")
+# Worker processes (default: one per core)
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "0")) or None
+# Bump when extraction/normalization changes so cached text is rebuilt
+EXTRACTION_VERSION = "1"
+
+# Common CV section headings, matched on their own line
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "about me", "objective", "career objective", "professional summary"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "career history"],
+    "skills": ["skills", "technical skills", "core competencies", "competencies", "technologies", "tech stack"],
+    "education": ["education", "academic background", "qualifications"],
+    "projects": ["projects", "personal projects", "key projects"],
+    "certifications": ["certifications", "certificates", "licenses", "awards"],
+    "languages": ["languages"],
+}
+_HEADING_TO_SECTION = {h: s for s, headings in SECTION_HEADINGS.items() for h in headings}
+_HEADING_LINE = re.compile(r"^\s*(?:[#*•\-]\s*)?([A-Za-z][A-Za-z &/]{2,40}?)\s*:?\s*$")
+
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_HYPHEN_BREAK = re.compile(r"(\w)-\n(\w)")
+_SPACES = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC, no control chars, de-hyphenated line breaks, single spaces, at most one blank line."""
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = _CONTROL.sub(" ", text)
+    text = _HYPHEN_BREAK.sub(r"\1\2", text)
+    text = _SPACES.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+# =========================
+# Extraction (runs in worker processes)
+# =========================
+def _raw_pages(file_name: str, data: bytes):
+    name = file_name.lower()
+    if name.endswith(".pdf"):
+        from pypdf import PdfReader
+        reader = PdfReader(io.BytesIO(data))
+        return [page.extract_text() or "" for page in reader.pages]
+    if name.endswith(".docx"):
+        import docx
+        document = docx.Document(io.BytesIO(data))
+        lines = [p.text for p in document.paragraphs]
+        # Skills/experience are often laid out in tables
+        for table in document.tables:
+            for row in table.rows:
+                lines.append(" | ".join(cell.text for cell in row.cells))
+        return ["\n".join(lines)]
+    return [data.decode("utf-8", errors="ignore")]
+
+
+def extract_pages(file_name: str, data: bytes):
+    """Normalized text of each page (PDF) or of the whole document (DOCX/text)."""
+    return [normalize_text(page) for page in _raw_pages(file_name, data)]
+
+
+# =========================
+# Cache by content hash
+# =========================
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cache_path(digest: str) -> str:
+    return os.path.join(EXTRACTION_CACHE_DIR, f"{digest}.v{EXTRACTION_VERSION}.json")
+
+
+def _read_cache(digest: str):
+    if not EXTRACTION_CACHE_DIR:
+        return None
+    try:
+        with open(_cache_path(digest), encoding="utf-8") as f:
+            return json.load(f)["pages"]
+    except FileNotFoundError:
+        return None
+
+
+def _write_cache(digest: str, pages) -> None:
+    if not EXTRACTION_CACHE_DIR:
+        return
+    os.makedirs(EXTRACTION_CACHE_DIR, exist_ok=True)
+    path = _cache_path(digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"pages": pages}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def iter_pages(file_name: str, data: bytes):
+    """Yields the normalized pages of one CV, cached by content hash."""
+    digest = content_hash(data)
+    pages = _read_cache(digest)
+    if pages is None:
+        pages = extract_pages(file_name, data)
+        _write_cache(digest, pages)
+    yield from pages
+
+
+def extract_text(file_name: str, data: bytes) -> str:
+    return "\n\n".join(iter_pages(file_name, data))
+
+
+def new_extraction_pool(max_workers: int = EXTRACTION_WORKERS) -> ProcessPoolExecutor:
+    """Process pool for extract_many, shared by the batches of one ingestion run."""
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
+def _extraction_failed(name: str, error: Exception, errors) -> None:
+    logger.warning("Skipping %s: extraction failed: %s", name, error)
+    if errors is not None:
+        errors.append((name, f"{type(error).__name__}: {error}"))
+
+
+def extract_many(items, pool: ProcessPoolExecutor = None, errors: list = None):
+    """
+    Extracts many CVs across cores. `items` is an iterable of (name, bytes).
+    Cached files never reach the process pool. Yields (name, text) in completion order.
+    `pool`: from new_extraction_pool(), reused across calls (a temporary one otherwise).
+    A file that cannot be extracted (corrupt PDF, ...) is logged and skipped, and
+    (name, error) is appended to `errors`.
+    """
+    misses = []
+    for name, data in items:
+        digest = content_hash(data)
+        pages = _read_cache(digest)
+        if pages is not None:
+            yield name, "\n\n".join(pages)
+        else:
+            misses.append((name, digest, data))
+
+    if not misses:
+        return
+
+    if len(misses) == 1:
+        name, digest, data = misses[0]
+        try:
+            pages = extract_pages(name, data)
+        except Exception as e:
+            _extraction_failed(name, e, errors)
+            return
+        _write_cache(digest, pages)
+        yield name, "\n\n".join(pages)
+        return
+
+    if pool is None:
+        with new_extraction_pool() as pool:
+            yield from _extract_on_pool(pool, misses, errors)
+    else:
+        yield from _extract_on_pool(pool, misses, errors)
+
+
+def _extract_on_pool(pool: ProcessPoolExecutor, misses, errors):
+    futures = {pool.submit(extract_pages, name, data): (name, digest) for name, digest, data in misses}
+    for future in as_completed(futures):
+        name, digest = futures[future]
+        try:
+            pages = future.result()
+        except BrokenProcessPool:
+            # A worker died (not an exception in the file): the pool cannot be used any more
+            raise
+        except Exception as e:
+            _extraction_failed(name, e, errors)
+            continue
+        _write_cache(digest, pages)
+        yield name, "\n\n".join(pages)
+
+
+# =========================
+# Sections
+# =========================
+def section_for_heading(line: str):
+    """Section name if `line` is a CV heading such as 'Work Experience:', else None."""
+    match = _HEADING_LINE.match(line)
+    if not match:
+        return None
+    return _HEADING_TO_SECTION.get(match.group(1).strip().lower())
+
+
+def iter_sections(text: str):
+    """
+    Yields (section, text) in document order. Text before the first known heading is
+    reported as "header" (name, contact details, headline).
+    """
+    section, lines = "header", []
+    for line in text.split("\n"):
+        found = section_for_heading(line)
+        if found:
+            if any(l.strip() for l in lines):
+                yield section, "\n".join(lines).strip()
+            section, lines = found, [line]
+        else:
+            lines.append(line)
+    if any(l.strip() for l in lines):
+        yield section, "\n".join(lines).strip()
@@ -0,0 +1,113 @@
+import atexit
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from services.telemetry import traced_credential
+
+# The SDK packages are imported on first use: they take most of the import time of the app
+if TYPE_CHECKING:
+    import requests
+    from azure.ai.projects import AIProjectClient
+    from azure.identity import DefaultAzureCredential
+
+# =========================
+# Connection pool config (env)
+# =========================
+# Size the keep-alive pool for the number of concurrent Streamlit sessions / workers
+FOUNDRY_HTTP_POOL_SIZE = int(os.getenv("FOUNDRY_HTTP_POOL_SIZE", "32"))
+
+_lock = threading.RLock()
+_credential = None
+_session = None
+_clients = {}
+
+
+def get_credential() -> "DefaultAzureCredential":
+    """
+    Process-wide credential. DefaultAzureCredential caches the selected
+    credential in the chain and its access tokens, so the chain is only probed once.
+    Token acquisitions are traced (services/telemetry.py).
+    """
+    global _credential
+    if _credential is None:
+        with _lock:
+            if _credential is None:
+                from azure.identity import DefaultAzureCredential
+                _credential = traced_credential(DefaultAzureCredential())
+    return _credential
+
+
+def _get_session() -> "requests.Session":
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=FOUNDRY_HTTP_POOL_SIZE,
+                    pool_maxsize=FOUNDRY_HTTP_POOL_SIZE,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_project_client(endpoint: str = None, credential=None, **client_kwargs) -> "AIProjectClient":
+    """
+    Returns the shared AIProjectClient for `endpoint` (default: FOUNDRY_PROJECT_ENDPOINT).
+    All clients reuse one credential and one keep-alive HTTP connection pool.
+    `credential` (default: get_credential()) and `client_kwargs` (e.g. per_call_policies) only apply
+    when the client is first created; the benchmarks pass the local stub's credential this way.
+    """
+    if endpoint is None:
+        from config.settings import FOUNDRY_PROJECT_ENDPOINT
+        endpoint = FOUNDRY_PROJECT_ENDPOINT
+
+    client = _clients.get(endpoint)
+    if client is None:
+        with _lock:
+            client = _clients.get(endpoint)
+            if client is None:
+                from azure.ai.projects import AIProjectClient
+                from azure.core.pipeline.transport import RequestsTransport
+
+                client = AIProjectClient(
+                    endpoint=endpoint,
+                    credential=credential or get_credential(),
+                    # session_owner=False: the pool outlives individual pipelines
+                    transport=RequestsTransport(session=_get_session(), session_owner=False),
+                    **client_kwargs,
+                )
+                _clients[endpoint] = client
+    return client
+
+
+def close_clients() -> None:
+    """Closes every shared client, the credential and the connection pool."""
+    global _credential, _session
+    with _lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _clients.clear()
+
+        if _credential is not None:
+            try:
+                _credential.close()
+            except Exception:
+                pass
+            _credential = None
+
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+atexit.register(close_clients)
@@ -1,12 +1,19 @@
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from config.settings import FOUNDRY_PROJECT_ENDPOINT, AZURE_AI_SEARCH_CONNECTION_NAME
+from functools import lru_cache
 
+from config.settings import get_settings
+from services.foundry_client import get_project_client
+from services.telemetry import span
+
+@lru_cache(maxsize=None)
 def get_ai_search_connection_id() -> str:
     """
     Returns the project connection resource id for Azure AI Search.
     Foundry docs: lookup connection by name via AIProjectClient.connections.get(name). :contentReference[oaicite:3]{index=3}
+    Cached: the connection id does not change for the life of the process.
     """
-    with DefaultAzureCredential() as cred, AIProjectClient(endpoint=FOUNDRY_PROJECT_ENDPOINT, credential=cred) as project:
-        conn = project.connections.get(AZURE_AI_SEARCH_CONNECTION_NAME)
-        return conn.id
+    # Shared client: do not close it here, it is closed at process exit
+    project = get_project_client()
+    connection_name = get_settings().search_tool.connection_name
+    with span("foundry.connection.get", **{"connection.name": connection_name}):
+        conn = project.connections.get(connection_name)
+    return conn.id
@@ -0,0 +1,246 @@
+import hashlib
+import logging
+import os
+import re
+
+from config.settings import get_settings
+from services.blob_service import download_many, list_cv_blobs
+from services.candidate_profile import extract_profile
+from services.chunker import chunk_text
+from services.embedding_service import embed_texts
+from services.embedding_store import get_embedding_store, text_key
+from services.extraction import extract_many, new_extraction_pool
+from services.manifest import INGESTION_MANIFEST_PATH, load_manifest, save_manifest
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# Ingestion config (env)
+# =========================
+# Documents per merge_or_upload_documents call (service limit: 1000 docs / 16 MB)
+UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "500"))
+# Downloaded CVs handed to the extraction process pool at once
+EXTRACTION_BATCH_SIZE = int(os.getenv("EXTRACTION_BATCH_SIZE", "64"))
+
+
+def document_key(blob_name: str) -> str:
+    # Search keys only allow letters, digits, "_", "-" and "="
+    return hashlib.sha1(blob_name.encode("utf-8")).hexdigest()
+
+
+# Chunk ids written by this pipeline: f"{document_key(name)}_{i}"
+_LOCAL_CHUNK_ID = re.compile(r"^[0-9a-f]{40}_\d+$")
+
+
+# =========================
+# Pipeline
+# =========================
+def _search_client():
+    search = get_settings().search
+    if not search.endpoint or not search.admin_key:
+        raise RuntimeError("Missing AZURE_SEARCH_ENDPOINT or AZURE_SEARCH_ADMIN_KEY in env")
+    # Imported here: the pipeline helpers are importable without the search SDK
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents import SearchClient
+
+    return SearchClient(search.endpoint, search.index_name, AzureKeyCredential(search.admin_key))
+
+
+def _upload(search_client, documents) -> None:
+    for start in range(0, len(documents), UPLOAD_BATCH_SIZE):
+        batch = documents[start:start + UPLOAD_BATCH_SIZE]
+        results = search_client.merge_or_upload_documents(documents=batch)
+        failed = [r.key for r in results if not r.succeeded]
+        if failed:
+            raise RuntimeError(f"Upload failed for {len(failed)} chunks, e.g. {failed[:5]}")
+
+
+def _delete(search_client, chunk_ids) -> None:
+    chunk_ids = list(chunk_ids)
+    for start in range(0, len(chunk_ids), UPLOAD_BATCH_SIZE):
+        batch = [{"id": chunk_id} for chunk_id in chunk_ids[start:start + UPLOAD_BATCH_SIZE]]
+        search_client.delete_documents(documents=batch)
+
+
+def _indexer_client():
+    search = get_settings().search
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents.indexes import SearchIndexerClient
+
+    return SearchIndexerClient(search.endpoint, AzureKeyCredential(search.admin_key))
+
+
+def _unschedule_indexer() -> None:
+    """Clears the schedule of the blob indexer, which would re-project chunks of the same CVs."""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    client = _indexer_client()
+    try:
+        indexer = client.get_indexer(get_settings().search.indexer_name)
+    except ResourceNotFoundError:
+        return
+    if indexer.schedule is not None:
+        logger.warning("Local ingestion owns the index: clearing the schedule of indexer '%s'", indexer.name)
+        indexer.schedule = None
+        client.create_or_update_indexer(indexer)
+
+
+def _projected_chunk_ids(search_client, names) -> dict:
+    """Ids of the chunks of `names` projected by the skillset indexer (not written by this pipeline)."""
+    if not names:
+        return {}
+    search_filter = " or ".join("candidate_id eq '{}'".format(name.replace("'", "''")) for name in names)
+    projected = {}
+    for doc in search_client.search(search_text="*", filter=search_filter, select=["id", "candidate_id"]):
+        if not _LOCAL_CHUNK_ID.match(doc["id"]):
+            projected.setdefault(doc["candidate_id"], set()).add(doc["id"])
+    return projected
+
+
+def run_ingestion(full: bool = False, dry_run: bool = False) -> dict:
+    """
+    Incremental ingestion of the CV container into the chunk index.
+    Unchanged CVs (same etag/MD5, or same content hash) are skipped, so embedding and upload
+    cost scales with the change set. `full` re-processes everything; `dry_run` only plans.
+
+    Requires INGESTION_MODE=local: this pipeline is then the only writer of the index. The
+    indexer schedule is cleared, and chunks the skillset projected for a re-ingested CV are
+    deleted, so no CV is indexed twice.
+    """
+    if not dry_run and get_settings().search.ingestion_mode != "local":
+        raise RuntimeError(
+            "Local ingestion writes the index the skillset indexer owns: set INGESTION_MODE=local "
+            "(and re-run scripts/setup_search.py) to make it the only writer"
+        )
+    manifest = load_manifest()
+    stats = {"listed": 0, "unchanged": 0, "changed": 0, "removed": 0,
+             "chunks_uploaded": 0, "chunks_deleted": 0, "embedding_inputs": 0, "extraction_failed": []}
+
+    # 1) List + cheap change detection from blob properties
+    candidates = []
+    seen = set()
+    for name, etag, md5 in list_cv_blobs():
+        stats["listed"] += 1
+        seen.add(name)
+        entry = manifest.get(name)
+        if not full and entry and (entry["etag"] == etag or (md5 and entry.get("md5") == md5)):
+            entry["etag"] = etag
+            stats["unchanged"] += 1
+            continue
+        candidates.append((name, etag, md5))
+
+    removed = [name for name in manifest if name not in seen]
+    stats["removed"] = len(removed)
+
+    if dry_run:
+        stats["changed"] = len(candidates)
+        return stats
+
+    search_client = _search_client()
+    _unschedule_indexer()
+    store = get_embedding_store()
+    pending = []  # (name, entry, chunk documents without embedding)
+    stale_ids = set()
+
+    def flush():
+        chunks = [doc for _, _, docs in pending for doc in docs]
+        if chunks:
+            # Only text never embedded before reaches the embedding endpoint
+            vectors, embedded = store.get_or_embed([doc["text"] for doc in chunks], embed_texts)
+            for doc, vector in zip(chunks, vectors):
+                doc["embedding"] = vector
+            stats["embedding_inputs"] += embedded
+        # Stale and projected chunks go first, so a CV is never in the index twice
+        if stale_ids:
+            _delete(search_client, stale_ids)
+            stats["chunks_deleted"] += len(stale_ids)
+            stale_ids.clear()
+        if chunks:
+            _upload(search_client, chunks)
+            stats["chunks_uploaded"] += len(chunks)
+        for name, entry, _ in pending:
+            manifest[name] = entry
+        pending.clear()
+        # Checkpoint: an interrupted run resumes from here
+        save_manifest(manifest)
+
+    def chunk_extracted(downloaded):
+        projected = _projected_chunk_ids(search_client, [name for name, _ in downloaded])
+        for name, text in extract_many(downloaded, pool=extraction_pool, errors=stats["extraction_failed"]):
+            stale_ids.update(projected.get(name, ()))
+            entry = manifest.get(name)
+            new_entry = changed[name]
+            document_id = new_entry["document_id"]
+            # Extracted once per CV version; repeated on every chunk so the search tool can filter on it
+            profile = extract_profile(text)
+            docs = [
+                {
+                    "id": f"{document_id}_{i}",
+                    "document_id": document_id,
+                    "candidate_id": name,
+                    "text": page,
+                    **profile,
+                }
+                for i, page in enumerate(chunk_text(text))
+            ]
+            new_entry["profile"] = profile
+            new_entry["chunk_ids"] = [doc["id"] for doc in docs]
+            new_entry["text_keys"] = [text_key(doc["text"]) for doc in docs]
+            if entry:
+                stale_ids.update(set(entry["chunk_ids"]) - set(new_entry["chunk_ids"]))
+
+            pending.append((name, new_entry, docs))
+            if sum(len(d) for _, _, d in pending) >= UPLOAD_BATCH_SIZE:
+                flush()
+        downloaded.clear()
+
+    # 2) Download (parallel, etag-cached) and hash the candidates,
+    #    extract text on the process pool, chunk, then embed + upload in large batches.
+    #    A CV that fails extraction stays out of the manifest, so the next run retries it
+    properties = {name: (etag, md5) for name, etag, md5 in candidates}
+    changed = {}
+    downloaded = []
+    # One pool for the whole run (workers start on the first cache miss)
+    with new_extraction_pool() as extraction_pool:
+        for name, data in download_many(candidates):
+            etag, md5 = properties[name]
+            content_hash = hashlib.sha256(data).hexdigest()
+            entry = manifest.get(name)
+
+            if not full and entry and entry["hash"] == content_hash:
+                # Touched but identical content (e.g. metadata update)
+                entry.update(etag=etag, md5=md5)
+                stats["unchanged"] += 1
+                continue
+
+            changed[name] = {
+                "etag": etag,
+                "md5": md5,
+                "hash": content_hash,
+                "document_id": document_key(name),
+                "chunk_ids": [],
+            }
+            downloaded.append((name, data))
+            stats["changed"] += 1
+
+            if len(downloaded) >= EXTRACTION_BATCH_SIZE:
+                chunk_extracted(downloaded)
+        chunk_extracted(downloaded)
+    flush()
+
+    # 3) Delete chunks of removed CVs and chunks that no longer exist after re-chunking
+    for name in removed:
+        stale_ids.update(manifest.pop(name)["chunk_ids"])
+    if stale_ids:
+        _delete(search_client, stale_ids)
+        stats["chunks_deleted"] += len(stale_ids)
+
+    save_manifest(manifest)
+    logger.info("Ingestion completed: %s", stats)
+    return stats
+
+
+def compact_embedding_store() -> int:
+    """Drops stored vectors that no chunk in the manifest uses any more."""
+    live_keys = {key for entry in load_manifest().values() for key in entry.get("text_keys", [])}
+    return get_embedding_store().compact(live_keys)
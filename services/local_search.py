@@ -0,0 +1,290 @@
+import json
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from services.candidate_aggregation import aggregate_candidates
+
+# Same names as AzureAISearchQueryType. There is no semantic ranker locally:
+# "semantic" runs as keyword search and "vector_semantic_hybrid" as hybrid.
+QUERY_TYPES = ("simple", "semantic", "vector", "vector_simple_hybrid", "vector_semantic_hybrid")
+
+RRF_K = 60          # reciprocal rank fusion constant used by Azure AI Search
+CANDIDATE_POOL = 50  # hits per retriever before fusion
+
+_TOKEN = re.compile(r"[\w+#]+(?:\.[\w+#]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the to was were will with".split()
+)
+_SEARCH_IN = re.compile(r"search\.in\(\s*(\w+)\s*,\s*'([^']*)'\s*(?:,\s*'([^']*)')?\s*\)")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def tokenize(text: str):
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def odata_predicate(odata: str):
+    """Predicate for the `search.in(...)` clauses of an OData filter; None if there is nothing to apply."""
+    clauses = _SEARCH_IN.findall(odata or "")
+    if not clauses:
+        return None
+    # Default delimiters of search.in: space and comma
+    allowed = [
+        (field, set(values.split(delimiter) if delimiter else re.split(r"[ ,]+", values)))
+        for field, values, delimiter in clauses
+    ]
+    return lambda doc: all(doc.get(field) in values for field, values in allowed)
+
+
+def highlight_fragments(text: str, terms, pre_tag: str = "<em>", post_tag: str = "</em>",
+                        max_fragments: int = 5, fragment_chars: int = 200):
+    """
+    Sentences of `text` that contain one of `terms` (tokenized query terms), with the matches
+    wrapped in `pre_tag` / `post_tag` and long sentences cut around the first match,
+    like the "@search.highlights" of Azure AI Search.
+    """
+    terms = set(terms)
+    fragments = []
+    for sentence in _SENTENCE_BREAK.split(text or ""):
+        matches = [m for m in _TOKEN.finditer(sentence) if m.group().lower() in terms]
+        if not matches:
+            continue
+        start = max(0, min(matches[0].start() - fragment_chars // 4, len(sentence) - fragment_chars))
+        end = start + fragment_chars
+        parts, cursor = [], start
+        for match in matches:
+            if match.start() < cursor or match.end() > end:
+                continue
+            parts += [sentence[cursor:match.start()], pre_tag, match.group(), post_tag]
+            cursor = match.end()
+        parts.append(sentence[cursor:end])
+        fragments.append("".join(parts).strip())
+        if len(fragments) == max_fragments:
+            break
+    return fragments
+
+
+class LocalSearchIndex:
+    """
+    In-process hybrid retrieval over the chunk index schema (id, document_id, candidate_id, text, embedding):
+    BM25 over `text` from an inverted index, cosine top-k as one NumPy matrix-vector product,
+    and reciprocal rank fusion, like VECTOR_SIMPLE_HYBRID in Azure AI Search.
+    """
+
+    def __init__(self, documents, vectors=None, query_embedder=None, k1: float = 1.2, b: float = 0.75):
+        self.documents = [{k: v for k, v in d.items() if k != "embedding"} for d in documents]
+        self.query_embedder = query_embedder
+        self.k1, self.b = k1, b
+        self._build_bm25()
+
+        if vectors is None and documents and "embedding" in documents[0]:
+            vectors = [d["embedding"] for d in documents]
+        self.vectors = None
+        if vectors is not None and len(self.documents):
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            # Pre-normalized rows: cosine similarity is a single mat-vec product
+            self.vectors = matrix / np.maximum(norms, 1e-12)
+
+    # ---------- building ----------
+    def _build_bm25(self) -> None:
+        postings = defaultdict(list)
+        lengths = np.zeros(len(self.documents), dtype=np.float32)
+        for i, doc in enumerate(self.documents):
+            terms = Counter(tokenize(doc.get("text") or ""))
+            lengths[i] = sum(terms.values())
+            for term, tf in terms.items():
+                postings[term].append((i, tf))
+
+        n = max(1, len(self.documents))
+        avg_length = float(lengths.mean()) if len(lengths) else 1.0
+        self._length_norm = self.k1 * (1 - self.b + self.b * lengths / max(avg_length, 1e-6))
+        self._postings = {}
+        for term, items in postings.items():
+            doc_ids = np.fromiter((i for i, _ in items), dtype=np.int32, count=len(items))
+            tfs = np.fromiter((tf for _, tf in items), dtype=np.float32, count=len(items))
+            idf = math.log(1 + (n - len(items) + 0.5) / (len(items) + 0.5))
+            self._postings[term] = (doc_ids, tfs, idf)
+
+    @classmethod
+    def from_jsonl(cls, path: str, store=None, **kwargs):
+        """
+        Loads chunk documents from JSONL. Vectors come from the "embedding" field or,
+        with `store` (services.embedding_store.EmbeddingStore), are looked up by chunk-text hash.
+        """
+        with open(path, encoding="utf-8") as f:
+            documents = [json.loads(line) for line in f if line.strip()]
+        vectors = None
+        if store is not None:
+            from services.embedding_store import text_key
+            rows = [store.row(text_key(d["text"])) for d in documents]
+            if None in rows:
+                raise RuntimeError("Some chunks have no stored embedding; run the ingestion first")
+            vectors = store.matrix[rows]
+        return cls(documents, vectors=vectors, **kwargs)
+
+    # ---------- retrievers ----------
+    def _mask(self, filter):
+        if filter is None:
+            return None
+        return np.fromiter((bool(filter(d)) for d in self.documents), dtype=bool, count=len(self.documents))
+
+    def _top(self, scores, mask, k):
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def keyword_scores(self, text: str) -> np.ndarray:
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        for term in tokenize(text):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            doc_ids, tfs, idf = posting
+            scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + self._length_norm[doc_ids])
+        return scores
+
+    def vector_scores(self, vector) -> np.ndarray:
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        return self.vectors @ q
+
+    # ---------- search ----------
+    def search(self, search_text: str = None, vector=None, top: int = 5,
+               query_type: str = "vector_simple_hybrid", filter=None):
+        """
+        Returns up to `top` chunk documents with "@search.score", best first.
+        `filter` is a predicate on the document dict.
+        """
+        query_type = str(getattr(query_type, "value", query_type))
+        if query_type not in QUERY_TYPES:
+            raise ValueError(f"Unknown query_type: {query_type}")
+
+        use_keyword = query_type != "vector" and bool(search_text)
+        use_vector = query_type.startswith("vector") and self.vectors is not None
+        if use_vector and vector is None:
+            if self.query_embedder is None or not search_text:
+                use_vector = False
+            else:
+                vector = self.query_embedder([search_text])[0]
+
+        mask = self._mask(filter)
+        pool = max(top, CANDIDATE_POOL)
+        ranked = []
+        if use_keyword:
+            ranked.append([h for h in self._top(self.keyword_scores(search_text), mask, pool) if h[1] > 0])
+        if use_vector:
+            ranked.append(self._top(self.vector_scores(vector), mask, pool))
+
+        if not ranked:
+            return []
+        if len(ranked) == 1:
+            hits = ranked[0][:top]
+        else:
+            hits = reciprocal_rank_fusion(ranked)[:top]
+
+        results = []
+        for i, score in hits:
+            doc = dict(self.documents[i])
+            doc["@search.score"] = score
+            results.append(doc)
+        return results
+
+    def search_candidates(self, search_text: str = None, vector=None, top_candidates: int = 5,
+                          pooling: str = "max", top_n: int = 3, evidence_per_candidate: int = 2,
+                          query_type: str = "vector_simple_hybrid", filter=None):
+        """
+        Distinct candidates instead of chunks: the chunk hits of the candidate pool are grouped
+        per CV, pooled and deduplicated (see services.candidate_aggregation).
+        """
+        hits = self.search(search_text, vector=vector, top=CANDIDATE_POOL, query_type=query_type, filter=filter)
+        return aggregate_candidates(hits, top_candidates, pooling, top_n, evidence_per_candidate)
+
+
+def reciprocal_rank_fusion(rankings, k: int = RRF_K):
+    """Fuses ranked [(doc_index, score)] lists: score = sum of 1 / (k + rank)."""
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, (i, _) in enumerate(ranking, start=1):
+            fused[i] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+class LocalSearchTool:
+    """
+    Local stand-in for the agent's AzureAISearchTool: same knobs (query_type, top_k, filter)
+    and results shaped like Azure AI Search documents.
+    """
+
+    def __init__(self, index: LocalSearchIndex, query_type: str = "vector_semantic_hybrid",
+                 top_k: int = 5, filter=None, distinct_candidates: bool = False, pooling: str = "max"):
+        self.index = index
+        self.query_type = query_type
+        self.top_k = top_k
+        self.filter = filter
+        self.distinct_candidates = distinct_candidates
+        self.pooling = pooling
+
+    def __call__(self, query: str, vector=None):
+        if self.distinct_candidates:
+            return self.index.search_candidates(query, vector=vector, top_candidates=self.top_k,
+                                                pooling=self.pooling, query_type=self.query_type,
+                                                filter=self.filter)
+        return self.index.search(query, vector=vector, top=self.top_k,
+                                 query_type=self.query_type, filter=self.filter)
+
+
+class LocalSearchClient:
+    """
+    Local stand-in for azure.search.documents.SearchClient over a LocalSearchIndex (keyword search):
+    `search()` takes the same keyword arguments for the subset it implements (filter with
+    `search.in`, top, select, search_mode, highlight_fields / highlight_pre_tag / highlight_post_tag)
+    and returns hits shaped like the SDK's, "@search.highlights" included. "*" (or no text) lists
+    the documents that pass the filter, as the service does.
+    """
+
+    def __init__(self, index: LocalSearchIndex):
+        self.index = index
+
+    def search(self, search_text: str = None, *, filter: str = None, top: int = None, select=None,
+               search_mode: str = "any", highlight_fields=None, highlight_pre_tag: str = "<em>",
+               highlight_post_tag: str = "</em>", **kwargs):
+        top = 50 if top is None else top
+        predicate = odata_predicate(filter)
+        terms = tokenize(search_text or "")
+
+        if not terms:
+            hits = [{**doc, "@search.score": 1.0} for doc in self.index.documents
+                    if predicate is None or predicate(doc)][:top]
+        elif str(search_mode) in ("all", "SearchMode.ALL"):
+            # Every term must match: rank all keyword hits, keep those containing each term
+            required = set(terms)
+            hits = self.index.search(search_text, top=len(self.index.documents), query_type="simple",
+                                     filter=predicate)
+            hits = [h for h in hits if required <= set(tokenize(h.get("text") or ""))][:top]
+        else:
+            hits = self.index.search(search_text, top=top, query_type="simple", filter=predicate)
+
+        if isinstance(highlight_fields, str):
+            highlight_fields = [f.strip() for f in highlight_fields.split(",") if f.strip()]
+        if highlight_fields and terms:
+            for hit in hits:
+                highlights = {
+                    field: highlight_fragments(hit.get(field) or "", terms, highlight_pre_tag, highlight_post_tag)
+                    for field in highlight_fields
+                }
+                hit["@search.highlights"] = {field: h for field, h in highlights.items() if h}
+
+        if isinstance(select, str):
+            select = [f.strip() for f in select.split(",") if f.strip()]
+        if select:
+            hits = [{k: v for k, v in hit.items() if k in select or k.startswith("@search.")} for hit in hits]
+        return hits
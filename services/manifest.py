@@ -0,0 +1,44 @@
+"""
+Ingestion manifest: blob name -> {etag, md5, hash, document_id, chunk_ids, text_keys, profile}.
+
+Written by the local ingestion (services/ingestion.py) and read by the pre-screener
+(services/prescreen.py); kept free of storage / search imports so the chat app can read it
+without any Azure Storage setting.
+"""
+import hashlib
+import json
+import os
+
+INGESTION_MANIFEST_PATH = os.getenv("INGESTION_MANIFEST_PATH", ".cache/ingestion_manifest.json")
+
+
+def load_manifest(path: str = INGESTION_MANIFEST_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict, path: str = INGESTION_MANIFEST_PATH) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+_version = (None, None)  # ((path, mtime_ns, size), digest)
+
+
+def manifest_version(path: str = INGESTION_MANIFEST_PATH):
+    """Content hash of the manifest (None if there is none); only re-hashed when the file changes."""
+    global _version
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    signature = (path, stat.st_mtime_ns, stat.st_size)
+    if _version[0] != signature:
+        with open(path, "rb") as f:
+            _version = (signature, hashlib.sha256(f.read()).hexdigest())
+    return _version[1]
@@ -0,0 +1,213 @@
+import os
+
+import numpy as np
+
+from services.candidate_profile import SENIORITY_LEVELS, SKILLS, extract_requirements
+from services.manifest import INGESTION_MANIFEST_PATH, load_manifest
+
+# Score = weighted sum of the components, each in [0, 1]
+WEIGHTS = {
+    "required_skills": 0.5,
+    "preferred_skills": 0.15,
+    "years": 0.2,
+    "domain": 0.1,
+    "seniority": 0.05,
+}
+# Component value when the CV does not state the field (neither a match nor a miss)
+UNKNOWN_SCORE = 0.5
+
+
+def has_requirements(requirements: dict) -> bool:
+    """True if the requirements can rank candidates: a required/preferred skill or minimum years."""
+    return bool(requirements.get("required_skills") or requirements.get("preferred_skills")
+                or requirements.get("min_years"))
+
+
+class PreScreener:
+    """
+    Deterministic candidate scoring over the structured profiles (services/candidate_profile.py).
+
+    Skills are a (candidates x vocabulary) 0/1 matrix and a JD is a 0/1 vector over the same
+    vocabulary, so skill overlap for every candidate is one matrix-vector product; years,
+    domain and seniority are array comparisons. The LLM only needs to explain the shortlist.
+    """
+
+    def __init__(self, profiles: dict):
+        self.candidate_ids = list(profiles)
+        vocabulary = set(SKILLS)
+        for profile in profiles.values():
+            vocabulary.update(profile.get("skills") or [])
+        self.vocabulary = sorted(vocabulary)
+        self._skill_index = {skill: i for i, skill in enumerate(self.vocabulary)}
+
+        n = len(self.candidate_ids)
+        self.skills = np.zeros((n, len(self.vocabulary)), dtype=np.float32)
+        self.years = np.full(n, np.nan, dtype=np.float32)
+        self.seniority = np.full(n, -1, dtype=np.int8)
+        self.domain_names = sorted({p.get("domain") for p in profiles.values() if p.get("domain")})
+        self.domains = np.full(n, -1, dtype=np.int16)
+        for row, profile in enumerate(profiles.values()):
+            for skill in profile.get("skills") or []:
+                self.skills[row, self._skill_index[skill]] = 1.0
+            if profile.get("years_experience") is not None:
+                self.years[row] = profile["years_experience"]
+            if profile.get("seniority") in SENIORITY_LEVELS:
+                self.seniority[row] = SENIORITY_LEVELS.index(profile["seniority"])
+            if profile.get("domain"):
+                self.domains[row] = self.domain_names.index(profile["domain"])
+        self._has_skills = self.skills.any(axis=1)
+        self._profiles = profiles
+
+    def __len__(self) -> int:
+        return len(self.candidate_ids)
+
+    @classmethod
+    def from_manifest(cls, path: str = None):
+        """Profiles stored by the local ingestion (services/ingestion.py)."""
+        manifest = load_manifest(path or INGESTION_MANIFEST_PATH)
+        return cls({name: entry["profile"] for name, entry in manifest.items() if entry.get("profile")})
+
+    def _vector(self, skills) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for skill in skills:
+            if skill in self._skill_index:
+                vector[self._skill_index[skill]] = 1.0
+        return vector
+
+    # ---------- scoring ----------
+    def scores(self, requirements: dict) -> dict:
+        """Per-component scores for every candidate: {component: array of shape (candidates,)}."""
+        n = len(self)
+        components = {}
+
+        for field in ("required_skills", "preferred_skills"):
+            wanted = requirements.get(field) or []
+            if wanted:
+                coverage = (self.skills @ self._vector(wanted)) / len(wanted)
+                components[field] = np.where(self._has_skills, coverage, UNKNOWN_SCORE)
+            else:
+                components[field] = np.ones(n, dtype=np.float32)
+
+        min_years = requirements.get("min_years")
+        if min_years:
+            gap = np.clip(min_years - self.years, 0, None) / min_years
+            components["years"] = np.where(np.isnan(self.years), UNKNOWN_SCORE, 1.0 - np.clip(gap, 0, 1))
+        else:
+            components["years"] = np.ones(n, dtype=np.float32)
+
+        domain = requirements.get("domain")
+        if domain:
+            code = self.domain_names.index(domain) if domain in self.domain_names else -2
+            components["domain"] = np.where(self.domains < 0, UNKNOWN_SCORE, (self.domains == code).astype(np.float32))
+        else:
+            components["domain"] = np.ones(n, dtype=np.float32)
+
+        seniority = requirements.get("seniority")
+        if seniority in SENIORITY_LEVELS:
+            level = SENIORITY_LEVELS.index(seniority)
+            components["seniority"] = np.where(self.seniority < 0, UNKNOWN_SCORE,
+                                               (self.seniority >= level).astype(np.float32))
+        else:
+            components["seniority"] = np.ones(n, dtype=np.float32)
+
+        return components
+
+    def shortlist(self, requirements: dict, top: int = 5, hard: bool = True):
+        """
+        Ranked shortlist, best first:
+
+            {"candidate_id", "score", "matched_skills", "missing_skills",
+             "years_experience", "flags": {requirement: True / False / None (not stated in the CV)}}
+
+        `hard` drops candidates missing a required skill or below the minimum years
+        (same rule as services.candidate_profile.matches_requirements).
+        Empty when the JD states no skill and no minimum years (e.g. a follow-up question):
+        every candidate would score the same, so any top-N would be arbitrary.
+        """
+        if not len(self) or not has_requirements(requirements):
+            return []
+        components = self.scores(requirements)
+        total = sum(WEIGHTS[name] * values for name, values in components.items())
+
+        if hard:
+            excluded = self._has_skills & (components["required_skills"] < 1.0)
+            if requirements.get("min_years"):
+                excluded |= self.years < requirements["min_years"]  # NaN (unknown) compares False
+            total = np.where(excluded, -np.inf, total)
+
+        top = min(top, len(self))
+        best = np.argpartition(-total, top - 1)[:top]
+        best = best[np.argsort(-total[best])]
+        return [self._explain(int(row), float(total[row]), requirements) for row in best if np.isfinite(total[row])]
+
+    def _explain(self, row: int, score: float, requirements: dict) -> dict:
+        profile = self._profiles[self.candidate_ids[row]]
+        skills = set(profile.get("skills") or [])
+        required = requirements.get("required_skills") or []
+        preferred = requirements.get("preferred_skills") or []
+
+        flags = {}
+        for skill in required + preferred:
+            flags[f"skill:{skill}"] = (skill in skills) if skills else None
+        if requirements.get("min_years"):
+            years = profile.get("years_experience")
+            flags["years"] = None if years is None else years >= requirements["min_years"]
+        if requirements.get("domain"):
+            flags["domain"] = None if profile.get("domain") is None else profile["domain"] == requirements["domain"]
+        if requirements.get("seniority") in SENIORITY_LEVELS:
+            level = self.seniority[row]
+            flags["seniority"] = None if level < 0 else bool(level >= SENIORITY_LEVELS.index(requirements["seniority"]))
+
+        return {
+            "candidate_id": self.candidate_ids[row],
+            "score": score,
+            "matched_skills": sorted(skills & set(required + preferred)),
+            "missing_skills": [s for s in required + preferred if skills and s not in skills],
+            "years_experience": profile.get("years_experience"),
+            "seniority": profile.get("seniority"),
+            "current_role": profile.get("current_role"),
+            "domain": profile.get("domain"),
+            "flags": flags,
+        }
+
+    def screen(self, jd_text: str, top: int = 5, hard: bool = True):
+        """Shortlist for a job description."""
+        return self.shortlist(extract_requirements(jd_text), top=top, hard=hard)
+
+
+def format_shortlist(shortlist) -> str:
+    """Compact text block of the shortlist for the agent prompt or UI."""
+    lines = []
+    for rank, c in enumerate(shortlist, start=1):
+        flags = ", ".join(
+            f"{name} {'✓' if ok else '✗' if ok is not None else '?'}" for name, ok in c["flags"].items()
+        )
+        years = "?" if c["years_experience"] is None else f"{c['years_experience']:g}"
+        lines.append(
+            f"[{rank}] {c['candidate_id']} (score {c['score']:.2f}; {c['current_role'] or 'role ?'}; "
+            f"{years} years; {c['domain'] or 'domain ?'})\n    {flags}"
+        )
+    return "\n".join(lines)
+
+
+def candidate_filter(shortlist) -> str:
+    """OData filter restricting the search tool to the shortlisted CVs."""
+    names = [c["candidate_id"] for c in shortlist if "|" not in c["candidate_id"]]
+    if not names:
+        return ""
+    joined = "|".join(names).replace("'", "''")
+    return f"search.in(candidate_id, '{joined}', '|')"
+
+
+_prescreener = None
+_prescreener_mtime = None
+
+
+def get_prescreener():
+    """Process-wide PreScreener over the manifest profiles; rebuilt when the manifest changes."""
+    global _prescreener, _prescreener_mtime
+    mtime = os.path.getmtime(INGESTION_MANIFEST_PATH) if os.path.exists(INGESTION_MANIFEST_PATH) else None
+    if _prescreener is None or mtime != _prescreener_mtime:
+        _prescreener = PreScreener.from_manifest() if mtime else PreScreener({})
+        _prescreener_mtime = mtime
+    return _prescreener
@@ -0,0 +1,211 @@
+"""
+Diff-based provisioning of the Azure AI Search resources in services/search_schema.py.
+
+    plan = plan_changes()      # fetches the current definitions concurrently and diffs them
+    print(format_plan(plan))
+    apply_plan(plan)           # creates/updates only what changed, in dependency order
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from config.settings import get_settings
+
+# The search SDK (clients and schema models) is imported when the resources are provisioned
+if TYPE_CHECKING:
+    from azure.search.documents.indexes import SearchIndexClient, SearchIndexerClient
+
+logger = logging.getLogger(__name__)
+
+# Apply order: each stage only depends on the stages before it
+# (the skillset projects into the index, the indexer references all three)
+STAGES = [("index", "data_source"), ("skillset",), ("indexer",)]
+KINDS = [kind for stage in STAGES for kind in stage]
+
+# Never returned by the service, so they cannot be diffed
+SECRET_KEYS = {"credentials", "connectionString", "apiKey", "@odata.etag"}
+
+
+@dataclass
+class Change:
+    kind: str
+    name: str
+    action: str                     # "create" | "update" | "recreate" | "noop"
+    differences: list = field(default_factory=list)
+    desired: object = None
+
+    @property
+    def pending(self) -> bool:
+        return self.action != "noop"
+
+
+class _Operations:
+    """get / create_or_update / delete per resource kind."""
+
+    def __init__(self, index_client: "SearchIndexClient", indexer_client: "SearchIndexerClient"):
+        self.get = {
+            "index": index_client.get_index,
+            "data_source": indexer_client.get_data_source_connection,
+            "skillset": indexer_client.get_skillset,
+            "indexer": indexer_client.get_indexer,
+        }
+        self.put = {
+            "index": index_client.create_or_update_index,
+            "data_source": indexer_client.create_or_update_data_source_connection,
+            "skillset": indexer_client.create_or_update_skillset,
+            "indexer": indexer_client.create_or_update_indexer,
+        }
+        self.delete = {"index": index_client.delete_index}
+
+
+def _clients():
+    search = get_settings().search
+    if not search.endpoint or not search.admin_key:
+        raise RuntimeError("Missing AZURE_SEARCH_ENDPOINT or AZURE_SEARCH_ADMIN_KEY in env")
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents.indexes import SearchIndexClient, SearchIndexerClient
+
+    credential = AzureKeyCredential(search.admin_key)
+    return SearchIndexClient(search.endpoint, credential), SearchIndexerClient(search.endpoint, credential)
+
+
+def desired_resources() -> dict:
+    from services.search_schema import CHUNK_INDEX_SCHEMA, DATA_SOURCE, INDEXER, SKILLSET
+    return {"index": CHUNK_INDEX_SCHEMA, "data_source": DATA_SOURCE, "skillset": SKILLSET, "indexer": INDEXER}
+
+
+# =========================
+# Diff
+# =========================
+def diff(desired, current, path: str = ""):
+    """
+    Paths where `current` does not match `desired`. Only what `desired` sets is compared:
+    defaults filled in by the service, read-only properties and secrets are ignored.
+    Lists of named objects (fields, profiles, ...) are matched by name.
+    """
+    if isinstance(desired, dict):
+        if not isinstance(current, dict):
+            return [path or "/"]
+        differences = []
+        for key, value in desired.items():
+            if key in SECRET_KEYS or value is None:
+                continue
+            differences += diff(value, current.get(key), f"{path}/{key}")
+        return differences
+
+    if isinstance(desired, list):
+        if not isinstance(current, list):
+            return [path]
+        if desired and all(isinstance(d, dict) and "name" in d for d in desired):
+            by_name = {c.get("name"): c for c in current if isinstance(c, dict)}
+            differences = []
+            for item in desired:
+                item_path = f"{path}[{item['name']}]"
+                if item["name"] not in by_name:
+                    differences.append(f"{item_path} (missing)")
+                else:
+                    differences += diff(item, by_name[item["name"]], item_path)
+            return differences
+        if len(desired) != len(current):
+            return [path]
+        return [p for i, (d, c) in enumerate(zip(desired, current)) for p in diff(d, c, f"{path}[{i}]")]
+
+    if isinstance(desired, str) and isinstance(current, str):
+        return [] if desired.lower() == current.lower() else [path]
+    return [] if desired == current else [path]
+
+
+def _index_action(differences) -> str:
+    """Adding fields and changing non-field settings are in-place updates; changing a field is not."""
+    breaking = [d for d in differences if d.startswith("/fields[") and not d.endswith("(missing)")]
+    return "recreate" if breaking else "update"
+
+
+def plan_changes(operations: _Operations = None, kinds=None) -> list:
+    """Fetches the current definitions concurrently and returns one Change per resource, in apply order."""
+    operations = operations or _Operations(*_clients())
+    desired = desired_resources()
+    kinds = [kind for kind in KINDS if kinds is None or kind in kinds]
+
+    def fetch(kind):
+        try:
+            return operations.get[kind](desired[kind].name)
+        except ResourceNotFoundError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=len(kinds) or 1) as executor:
+        current = dict(zip(kinds, executor.map(fetch, kinds)))
+
+    plan = []
+    for kind in kinds:
+        resource = desired[kind]
+        if current[kind] is None:
+            plan.append(Change(kind, resource.name, "create", desired=resource))
+            continue
+        differences = diff(resource.as_dict(), current[kind].as_dict())
+        if not differences:
+            action = "noop"
+        elif kind == "index":
+            action = _index_action(differences)
+        else:
+            action = "update"
+        plan.append(Change(kind, resource.name, action, differences, desired=resource))
+    return plan
+
+
+def format_plan(plan) -> str:
+    symbols = {"create": "+", "update": "~", "recreate": "-/+", "noop": "="}
+    lines = []
+    for change in plan:
+        lines.append(f"{symbols[change.action]:>3} {change.kind:<12} {change.name}  ({change.action})")
+        lines += [f"      {difference}" for difference in change.differences]
+    pending = sum(change.pending for change in plan)
+    lines.append(f"\n{pending} change(s) to apply" if pending else "\nNothing to change")
+    return "\n".join(lines)
+
+
+# =========================
+# Apply
+# =========================
+def apply_plan(plan, operations: _Operations = None, allow_recreate: bool = False) -> list:
+    """
+    Applies the pending changes stage by stage; resources of one stage are applied concurrently.
+    A "recreate" (changed index field) deletes the index and its documents, so it needs `allow_recreate`.
+    Returns the applied changes.
+    """
+    blocked = [c for c in plan if c.action == "recreate" and not allow_recreate]
+    if blocked:
+        raise RuntimeError(
+            f"Index '{blocked[0].name}' has changed fields and must be recreated (all documents are dropped): "
+            f"{', '.join(blocked[0].differences)}. Re-run with allow_recreate to proceed."
+        )
+
+    operations = operations or _Operations(*_clients())
+    by_kind = {change.kind: change for change in plan if change.pending}
+
+    def apply(change):
+        if change.action == "recreate":
+            operations.delete[change.kind](change.name)
+        operations.put[change.kind](change.desired)
+        logger.info("%s %s: %s", change.action, change.kind, change.name)
+        return change
+
+    applied = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for stage in STAGES:
+            changes = [by_kind[kind] for kind in stage if kind in by_kind]
+            applied += list(executor.map(apply, changes))
+    return applied
+
+
+def provision(dry_run: bool = False, allow_recreate: bool = False, kinds=None):
+    """Plans, prints the plan and (unless `dry_run`) applies it. Returns the plan."""
+    operations = _Operations(*_clients())
+    plan = plan_changes(operations, kinds)
+    print(format_plan(plan))
+    if not dry_run:
+        apply_plan(plan, operations, allow_recreate)
+    return plan
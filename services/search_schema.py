@@ -0,0 +1,286 @@
+"""
+Desired Azure AI Search resources for the CV pipeline: chunk index, blob data source,
+skillset and indexer. Provisioned by services/search_provisioning.py (scripts/setup_search.py).
+"""
+from datetime import timedelta
+
+from azure.search.documents.indexes.models import (
+    AzureOpenAIEmbeddingSkill,
+    BinaryQuantizationCompression,
+    HnswAlgorithmConfiguration,
+    HnswParameters,
+    IndexingSchedule,
+    IndexProjectionMode,
+    InputFieldMappingEntry,
+    OutputFieldMappingEntry,
+    RescoringOptions,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
+    SearchableField,
+    SearchField,
+    SearchFieldDataType,
+    SearchIndex,
+    SearchIndexer,
+    SearchIndexerDataContainer,
+    SearchIndexerDataSourceConnection,
+    SearchIndexerIndexProjection,
+    SearchIndexerIndexProjectionSelector,
+    SearchIndexerIndexProjectionsParameters,
+    SearchIndexerSkillset,
+    SimpleField,
+    SplitSkill,
+    VectorSearch,
+    VectorSearchProfile,
+)
+
+from config.settings import (
+    AZURE_STORAGE_CONNECTION_STRING,
+    BLOB_CONTAINER_NAME,
+    SEARCH_INDEXER_NAME,
+    DATA_SOURCE_NAME,
+    SEARCH_INDEX_NAME,
+    AZURE_OPENAI_ENDPOINT,
+    AZURE_OPENAI_API_KEY,
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+    AZURE_OPENAI_EMBEDDING_DIM,
+    SPLIT_MAXIMUM_PAGE_LENGTH,
+    SPLIT_PAGE_OVERLAP_LENGTH,
+    SEARCH_INDEX_PROFILE,
+    INGESTION_MODE,
+)
+
+SKILLSET_NAME = "cv-skillset"
+
+# =========================
+# INDEX PROFILES
+# =========================
+# Vector storage / HNSW settings of the chunk index (SEARCH_INDEX_PROFILE).
+#   compression           None | "scalar" (int8) | "binary" (1 bit per dimension)
+#   oversampling          candidates rescored with the original vectors = k * oversampling
+#   truncation_dimension  keep only the first N dimensions in the compressed index
+#                         (text-embedding-3 vectors are trained to stay useful when truncated)
+#   stored                False: vectors are searchable but not retrievable (no extra copy kept)
+# Compare recall/latency with benchmarks/bench_index_profiles.py before switching;
+# changing the profile of an existing index requires a recreate (setup_search.py --allow-recreate).
+INDEX_PROFILES = {
+    "full": dict(compression=None, stored=True, m=16, ef_construction=400, ef_search=100),
+    "scalar": dict(compression="scalar", oversampling=4.0, stored=False, m=16, ef_construction=400, ef_search=100),
+    "scalar-lean": dict(compression="scalar", oversampling=4.0, stored=False, m=8, ef_construction=200, ef_search=60),
+    "binary": dict(compression="binary", oversampling=10.0, stored=False, m=16, ef_construction=400, ef_search=100),
+    "binary-512": dict(compression="binary", oversampling=10.0, truncation_dimension=512, stored=False,
+                       m=16, ef_construction=400, ef_search=100),
+}
+
+
+def _compression(name: str, profile: dict):
+    if not profile.get("compression"):
+        return None
+    rescoring = RescoringOptions(
+        enable_rescoring=True,
+        default_oversampling=profile["oversampling"],
+        rescore_storage_method="preserveOriginals",
+    )
+    if profile["compression"] == "scalar":
+        return ScalarQuantizationCompression(
+            compression_name=name,
+            rescoring_options=rescoring,
+            truncation_dimension=profile.get("truncation_dimension"),
+            parameters=ScalarQuantizationParameters(quantized_data_type="int8"),
+        )
+    if profile["compression"] == "binary":
+        return BinaryQuantizationCompression(
+            compression_name=name,
+            rescoring_options=rescoring,
+            truncation_dimension=profile.get("truncation_dimension"),
+        )
+    raise ValueError(f"Unknown compression: {profile['compression']}")
+
+
+# =========================
+# CHUNK INDEX SCHEMA
+# =========================
+def build_index_schema(profile_name: str = SEARCH_INDEX_PROFILE, name: str = SEARCH_INDEX_NAME) -> SearchIndex:
+    if profile_name not in INDEX_PROFILES:
+        raise ValueError(f"Unknown index profile: {profile_name} (expected one of {list(INDEX_PROFILES)})")
+    profile = INDEX_PROFILES[profile_name]
+    compression = _compression(f"{profile_name}-compression", profile)
+
+    return SearchIndex(
+        name=name,
+        fields=_chunk_fields(profile),
+        vector_search=VectorSearch(
+            algorithms=[
+                HnswAlgorithmConfiguration(
+                    name="hnsw-cosine",
+                    parameters=HnswParameters(
+                        metric="cosine",
+                        m=profile["m"],
+                        ef_construction=profile["ef_construction"],
+                        ef_search=profile["ef_search"],
+                    ),
+                )
+            ],
+            compressions=[compression] if compression else None,
+            profiles=[
+                VectorSearchProfile(
+                    name="vs-default",
+                    algorithm_configuration_name="hnsw-cosine",
+                    compression_name=compression.compression_name if compression else None,
+                )
+            ],
+        ),
+    )
+
+
+def _chunk_fields(profile: dict):
+    return [
+        # chunk id
+        SearchField(
+            name="id",
+            type=SearchFieldDataType.String,
+            key=True,
+            filterable=True,
+            analyzer_name="keyword",
+        ),
+
+        # parent document id (Azure projection sẽ set theo parent_key_field_name)
+        SimpleField(
+            name="document_id",
+            type=SearchFieldDataType.String,
+            filterable=True,
+        ),
+
+        # candidate_id = filename (metadata_storage_name)
+        SimpleField(
+            name="candidate_id",
+            type=SearchFieldDataType.String,
+            filterable=True,
+            sortable=True,
+        ),
+
+        # chunk text
+        SearchableField(
+            name="text",
+            type=SearchFieldDataType.String,
+            analyzer_name="en.lucene",
+        ),
+
+        # candidate profile (services/candidate_profile.py), one value per CV repeated on each chunk
+        SearchField(
+            name="skills",
+            type=SearchFieldDataType.Collection(SearchFieldDataType.String),
+            filterable=True,
+            facetable=True,
+        ),
+        SimpleField(
+            name="years_experience",
+            type=SearchFieldDataType.Double,
+            filterable=True,
+            sortable=True,
+            facetable=True,
+        ),
+        SimpleField(
+            name="seniority",
+            type=SearchFieldDataType.String,
+            filterable=True,
+            facetable=True,
+        ),
+        SimpleField(
+            name="current_role",
+            type=SearchFieldDataType.String,
+            filterable=True,
+            facetable=True,
+        ),
+        SimpleField(
+            name="domain",
+            type=SearchFieldDataType.String,
+            filterable=True,
+            facetable=True,
+        ),
+
+        # vector embedding
+        SearchField(
+            name="embedding",
+            type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+            searchable=True,
+            vector_search_dimensions=AZURE_OPENAI_EMBEDDING_DIM,
+            vector_search_profile_name="vs-default",
+            stored=profile["stored"],
+            hidden=not profile["stored"],
+        ),
+    ]
+
+
+CHUNK_INDEX_SCHEMA = build_index_schema()
+
+# =========================
+# DATA SOURCE (using blob)
+# =========================
+DATA_SOURCE = SearchIndexerDataSourceConnection(
+    name=DATA_SOURCE_NAME,
+    type="azureblob",
+    connection_string=AZURE_STORAGE_CONNECTION_STRING,
+    container=SearchIndexerDataContainer(name=BLOB_CONTAINER_NAME),
+)
+
+# =========================
+# SKILLSET (split skill + embedding skill + index projection)
+# =========================
+SKILLSET = SearchIndexerSkillset(
+    name=SKILLSET_NAME,
+    skills=[
+        # No DocumentExtractionSkill: the indexer already cracks PDF/DOCX into /document/content
+        SplitSkill(
+            context="/document",
+            text_split_mode="pages",
+            maximum_page_length=SPLIT_MAXIMUM_PAGE_LENGTH,  # same settings as services/chunker.py
+            page_overlap_length=SPLIT_PAGE_OVERLAP_LENGTH,
+            inputs=[InputFieldMappingEntry(name="text", source="/document/content")],
+            outputs=[OutputFieldMappingEntry(name="textItems", target_name="pages")],
+        ),
+        AzureOpenAIEmbeddingSkill(
+            context="/document/pages/*",
+            resource_url=AZURE_OPENAI_ENDPOINT,
+            api_key=AZURE_OPENAI_API_KEY,
+            deployment_name=AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            model_name=AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            dimensions=AZURE_OPENAI_EMBEDDING_DIM,
+            inputs=[InputFieldMappingEntry(name="text", source="/document/pages/*")],
+            outputs=[OutputFieldMappingEntry(name="embedding", target_name="embedding")],
+        ),
+    ],
+    index_projection=SearchIndexerIndexProjection(
+        selectors=[
+            SearchIndexerIndexProjectionSelector(
+                target_index_name=SEARCH_INDEX_NAME,
+                parent_key_field_name="document_id",
+                source_context="/document/pages/*",
+                mappings=[
+                    InputFieldMappingEntry(name="text", source="/document/pages/*"),
+                    InputFieldMappingEntry(name="embedding", source="/document/pages/*/embedding"),
+
+                    # map filename -> candidate_id
+                    InputFieldMappingEntry(
+                        name="candidate_id",
+                        source="/document/metadata_storage_name",
+                    ),
+                ],
+            )
+        ],
+        parameters=SearchIndexerIndexProjectionsParameters(
+            projection_mode=IndexProjectionMode.INCLUDE_INDEXING_PARENT_DOCUMENTS
+        ),
+    ),
+)
+
+# =========================
+# INDEXER
+# =========================
+INDEXER = SearchIndexer(
+    name=SEARCH_INDEXER_NAME,
+    data_source_name=DATA_SOURCE_NAME,
+    target_index_name=SEARCH_INDEX_NAME,  # using 1 index for chunks
+    skillset_name=SKILLSET.name,
+    # With local ingestion the indexer is not scheduled: both would write chunks of the same CVs
+    schedule=IndexingSchedule(interval=timedelta(days=1)) if INGESTION_MODE != "local" else None,
+)
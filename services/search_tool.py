@@ -1,16 +1,18 @@
-from azure.ai.agents.models import AzureAISearchTool, AzureAISearchQueryType
-from config.settings import AI_SEARCH_INDEX_NAME
+from config.settings import get_settings
 from services.foundry_connections import get_ai_search_connection_id
 
-def build_ai_search_tool():
+def build_ai_search_tool(filter: str = ""):
     """
     AzureAISearchTool requires index_connection_id (project connection id) + index_name. :contentReference[oaicite:4]{index=4}
+    `filter` is an OData filter applied before retrieval (see services.candidate_profile.jd_filter).
     """
+    from azure.ai.agents.models import AzureAISearchTool, AzureAISearchQueryType
+
     conn_id = get_ai_search_connection_id()
     return AzureAISearchTool(
         index_connection_id=conn_id,
-        index_name=AI_SEARCH_INDEX_NAME,
+        index_name=get_settings().search_tool.index_name,
         query_type=AzureAISearchQueryType.VECTOR_SEMANTIC_HYBRID,
         top_k=5,
-        filter="",
+        filter=filter,
     )
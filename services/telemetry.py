@@ -0,0 +1,351 @@
+"""
+Optional OpenTelemetry tracing and metrics for the chat turn, the agent runner and the services.
+
+    with span("agent.message.create", **{"thread.id": thread_id}) as current:
+        ...
+        current.set_attribute("message.chars", len(text))
+
+Every span also records its duration in the `cv_agent.phase.duration` histogram (attribute `phase`).
+Turns are counted with record_turn(); the run scheduler (services/admission.py) reports its queue
+depth, runs in flight, admission wait and throttled runs. Azure SDK HTTP requests (e.g. each run poll) become child spans
+through the native tracing of azure-core.
+
+Without the opentelemetry packages, or with TELEMETRY_EXPORTER=off (the default), everything is a no-op.
+
+Exporters (TELEMETRY_EXPORTER, or configure_telemetry(exporter=...)):
+  console    spans and metrics printed to stdout
+  otlp-file  OTLP JSON lines appended to TELEMETRY_FILE
+  otlp       OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT (opentelemetry-exporter-otlp-proto-http)
+More can be added with register_exporter(name, factory).
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# Telemetry config (env)
+# =========================
+TELEMETRY_EXPORTER = os.getenv("TELEMETRY_EXPORTER", "off")  # off | console | otlp-file | otlp
+TELEMETRY_FILE = os.getenv("TELEMETRY_FILE", ".cache/telemetry.jsonl")
+TELEMETRY_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "cv-agent")
+# Seconds between metric exports
+TELEMETRY_METRIC_INTERVAL = float(os.getenv("TELEMETRY_METRIC_INTERVAL", "30"))
+
+try:
+    from opentelemetry import metrics as _otel_metrics
+    from opentelemetry import trace as _otel_trace
+except ImportError:
+    _otel_metrics = _otel_trace = None
+
+_lock = threading.Lock()
+_providers = []
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def add_event(self, name, attributes=None):
+        pass
+
+    def record_exception(self, exception, attributes=None):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _NoopInstrument:
+    def add(self, amount, attributes=None):
+        pass
+
+    def record(self, amount, attributes=None):
+        pass
+
+
+# API proxies: they bind to the real providers once configure_telemetry() installs them
+if _otel_trace is not None:
+    _tracer = _otel_trace.get_tracer("cv_agent")
+    _meter = _otel_metrics.get_meter("cv_agent")
+    _turns = _meter.create_counter("cv_agent.turns", unit="{turn}", description="Chat turns and agent runs")
+    _failures = _meter.create_counter("cv_agent.turn.failures", unit="{turn}", description="Failed turns")
+    _turn_duration = _meter.create_histogram("cv_agent.turn.duration", unit="ms", description="Turn latency")
+    _phase_duration = _meter.create_histogram("cv_agent.phase.duration", unit="ms", description="Span latency")
+    _queue_depth = _meter.create_up_down_counter("cv_agent.admission.queue_depth", unit="{run}",
+                                                 description="Runs waiting for admission")
+    _running = _meter.create_up_down_counter("cv_agent.admission.running", unit="{run}",
+                                             description="Admitted runs in flight")
+    _admission_wait = _meter.create_histogram("cv_agent.admission.wait", unit="ms",
+                                              description="Time a run waited for admission")
+    _throttles = _meter.create_counter("cv_agent.run.throttled", unit="{run}",
+                                       description="Runs rejected by the model rate limit (429)")
+else:
+    _tracer = None
+    _turns = _failures = _turn_duration = _phase_duration = _NoopInstrument()
+    _queue_depth = _running = _admission_wait = _throttles = _NoopInstrument()
+
+
+def _clean(attributes: dict) -> dict:
+    """OpenTelemetry only takes str / bool / int / float values: drops None, stringifies the rest."""
+    cleaned = {}
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        value = getattr(value, "value", value)  # enums (RunStatus, ...)
+        cleaned[key] = value if isinstance(value, (str, bool, int, float)) else str(value)
+    return cleaned
+
+
+# =========================
+# Spans
+# =========================
+@contextmanager
+def span(name: str, **attributes):
+    """Span for one phase; exceptions are recorded on the span and re-raised."""
+    if _tracer is None:
+        yield _NOOP_SPAN
+        return
+
+    start = time.perf_counter()
+    ok = False
+    with _tracer.start_as_current_span(name, attributes=_clean(attributes)) as current:
+        try:
+            yield current
+            ok = True
+        finally:
+            _phase_duration.record((time.perf_counter() - start) * 1000, {"phase": name, "ok": ok})
+
+
+def traced(name: str = None, **attributes):
+    """Decorator form of span(); the span name defaults to module.function."""
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_attributes(current, **attributes) -> None:
+    current.set_attributes(_clean(attributes))
+
+
+def run_attributes(run) -> dict:
+    """Status and token usage of a ThreadRun, as span attributes."""
+    usage = getattr(run, "usage", None)
+    last_error = getattr(run, "last_error", None)
+    return _clean({
+        "run.id": getattr(run, "id", None),
+        "run.status": getattr(run, "status", None),
+        "run.error": getattr(last_error, "code", None) if last_error else None,
+        "run.prompt_tokens": getattr(usage, "prompt_tokens", None) if usage else None,
+        "run.completion_tokens": getattr(usage, "completion_tokens", None) if usage else None,
+        "run.total_tokens": getattr(usage, "total_tokens", None) if usage else None,
+    })
+
+
+# =========================
+# Metrics
+# =========================
+def record_turn(duration_ms: float, ok: bool, **attributes) -> None:
+    """Counts one turn (and a failure if not `ok`) and records its latency."""
+    attributes = _clean(attributes)
+    _turns.add(1, attributes)
+    if not ok:
+        _failures.add(1, attributes)
+    _turn_duration.record(duration_ms, {**attributes, "ok": ok})
+
+
+def record_queue_depth(delta: int) -> None:
+    """Runs entering (+1) or leaving (-1) the admission queue."""
+    _queue_depth.add(delta)
+
+
+def record_admission(wait_ms: float, **attributes) -> None:
+    """An admitted run: its queue wait, and one more run in flight (record_run_done() when it ends)."""
+    _admission_wait.record(wait_ms, _clean(attributes))
+    _running.add(1)
+
+
+def record_run_done() -> None:
+    _running.add(-1)
+
+
+def record_throttle(**attributes) -> None:
+    _throttles.add(1, _clean(attributes))
+
+
+# =========================
+# Credential
+# =========================
+class _TracedCredential:
+    """Wraps a token credential so every token acquisition (cache miss / refresh) is a span."""
+
+    def __init__(self, credential):
+        self._credential = credential
+
+    def __getattr__(self, name):
+        attribute = getattr(self._credential, name)
+        if name not in ("get_token", "get_token_info"):
+            return attribute
+
+        @wraps(attribute)
+        def acquire(*scopes, **kwargs):
+            with span("credential.get_token", **{"credential.type": type(self._credential).__name__}):
+                return attribute(*scopes, **kwargs)
+
+        return acquire
+
+
+def traced_credential(credential):
+    return credential if _tracer is None else _TracedCredential(credential)
+
+
+# =========================
+# Exporters
+# =========================
+def _console():
+    from opentelemetry.sdk.metrics.export import ConsoleMetricExporter
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    return ConsoleSpanExporter(), ConsoleMetricExporter()
+
+
+def _otlp():
+    from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    return OTLPSpanExporter(), OTLPMetricExporter()
+
+
+def _otlp_file():
+    """
+    Exporters appending one JSON line per batch to TELEMETRY_FILE: an OTLP JSON export request when
+    opentelemetry-exporter-otlp-proto-common is installed, the SDK JSON form of the spans / metrics otherwise.
+    """
+    from opentelemetry.sdk.metrics.export import MetricExporter, MetricExportResult
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    try:
+        from google.protobuf.json_format import MessageToDict
+        from opentelemetry.exporter.otlp.proto.common.metrics_encoder import encode_metrics
+        from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+    except ImportError:
+        encode_spans = encode_metrics = None
+
+    write_lock = threading.Lock()
+
+    def write(records) -> None:
+        directory = os.path.dirname(TELEMETRY_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with write_lock, open(TELEMETRY_FILE, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    class FileSpanExporter(SpanExporter):
+        def export(self, spans):
+            if encode_spans is not None:
+                write([MessageToDict(encode_spans(spans))])
+            else:
+                write([{"span": json.loads(s.to_json())} for s in spans])
+            return SpanExportResult.SUCCESS
+
+    class FileMetricExporter(MetricExporter):
+        def export(self, metrics_data, timeout_millis: float = 10_000, **kwargs):
+            if encode_metrics is not None:
+                write([MessageToDict(encode_metrics(metrics_data))])
+            else:
+                write([{"metrics": json.loads(metrics_data.to_json())}])
+            return MetricExportResult.SUCCESS
+
+        def force_flush(self, timeout_millis: float = 10_000) -> bool:
+            return True
+
+        def shutdown(self, timeout_millis: float = 30_000, **kwargs) -> None:
+            pass
+
+    return FileSpanExporter(), FileMetricExporter()
+
+
+# name -> factory returning (span exporter, metric exporter)
+EXPORTERS = {"console": _console, "otlp-file": _otlp_file, "otlp": _otlp}
+
+
+def register_exporter(name: str, factory) -> None:
+    """Adds an exporter choice: `factory()` returns (SpanExporter, MetricExporter)."""
+    EXPORTERS[name] = factory
+
+
+def _enable_azure_sdk_tracing() -> None:
+    from azure.core.settings import settings
+    settings.tracing_enabled = True
+
+
+def configure_telemetry(exporter: str = None) -> bool:
+    """
+    Installs the tracer and meter providers with `exporter` (default: TELEMETRY_EXPORTER).
+    Safe to call more than once (e.g. on every Streamlit rerun); returns whether telemetry is on.
+    """
+    exporter = exporter or TELEMETRY_EXPORTER
+    if exporter == "off":
+        return bool(_providers)
+    if _otel_trace is None:
+        logger.warning("TELEMETRY_EXPORTER=%s but opentelemetry-sdk is not installed; telemetry is off", exporter)
+        return False
+    if exporter not in EXPORTERS:
+        raise ValueError(f"Unknown telemetry exporter: {exporter} (expected one of {['off', *EXPORTERS]})")
+
+    with _lock:
+        if _providers:
+            return True
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        span_exporter, metric_exporter = EXPORTERS[exporter]()
+        resource = Resource.create({"service.name": TELEMETRY_SERVICE_NAME})
+
+        tracer_provider = TracerProvider(resource=resource)
+        tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+        _otel_trace.set_tracer_provider(tracer_provider)
+
+        reader = PeriodicExportingMetricReader(
+            metric_exporter, export_interval_millis=TELEMETRY_METRIC_INTERVAL * 1000
+        )
+        meter_provider = MeterProvider(resource=resource, metric_readers=[reader])
+        _otel_metrics.set_meter_provider(meter_provider)
+
+        _enable_azure_sdk_tracing()
+        _providers.extend([tracer_provider, meter_provider])
+    return True
+
+
+def shutdown_telemetry() -> None:
+    """Flushes and stops the providers (pending spans and the last metric export)."""
+    with _lock:
+        for provider in _providers:
+            try:
+                provider.shutdown()
+            except Exception:
+                logger.warning("Telemetry shutdown failed", exc_info=True)
+        _providers.clear()
+
+
+atexit.register(shutdown_telemetry)
@@ -0,0 +1,453 @@
+"""
+Local stub of the Foundry Agents REST API (threads, messages, runs incl. streaming, agents, connections).
+
+Lets the agent runner, the batch CLI and the benchmarks run offline with
+configurable latency. Only the subset of the API used by this project is emulated.
+Runs execute in the background: the optional search tool (`tool_fn`), then the
+remaining `run_seconds`, then the answer.
+
+    python stubs/foundry_server.py --port 8765 --run-seconds 2
+    # endpoint: http://127.0.0.1:8765/api/projects/stub
+"""
+import argparse
+import itertools
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from azure.core.credentials import AccessToken
+from azure.core.pipeline.policies import SansIOHTTPPolicy
+
+PROJECT_PATH = "/api/projects/stub"
+
+
+class StubCredential:
+    """Static token credential; requests to the stub are not authenticated."""
+
+    def get_token(self, *scopes, **kwargs):
+        return AccessToken("stub-token", int(time.time()) + 3600)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def close(self):
+        pass
+
+
+def stub_client_kwargs() -> dict:
+    """Client kwargs for plain-http stub endpoints (bearer auth requires https)."""
+    return {"authentication_policy": SansIOHTTPPolicy()}
+
+
+class FoundryStubState:
+    """
+    `tool_fn(thread, prompt_text)`: called at the start of every run, outside the state lock,
+    like the agent's search tool call (the thread carries its tool_resources / filter).
+    `delta_seconds`: delay between streamed answer deltas.
+    `rpm_limit` / `tpm_limit`: model quota per `rate_window` seconds (0 = none); runs over it fail
+    with last_error rate_limit_exceeded ("Try again in N seconds"), like the service.
+    """
+
+    def __init__(self, latency: float = 0.0, run_seconds: float = 0.0, answer_fn=None,
+                 tool_fn=None, delta_seconds: float = 0.0, rpm_limit: int = 0, tpm_limit: int = 0,
+                 rate_window: float = 60.0):
+        self.latency = latency
+        self.run_seconds = run_seconds
+        self.answer_fn = answer_fn or (lambda text: f"Stub answer for: {text[:80]}")
+        self.tool_fn = tool_fn
+        self.delta_seconds = delta_seconds
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.rate_window = rate_window
+        self.usage_window = []      # (time, tokens) of the runs started in the last rate_window
+        self.threads = {}
+        self.messages = {}
+        self.runs = {}
+        self.agents = {}
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def new_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids):08d}"
+
+
+def _text_message(state, thread_id, role, text, run_id=None, agent_id=None):
+    return {
+        "id": state.new_id("msg"),
+        "object": "thread.message",
+        "created_at": int(time.time()),
+        "thread_id": thread_id,
+        "status": "completed",
+        "role": role,
+        "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+        "assistant_id": agent_id,
+        "run_id": run_id,
+        "attachments": [],
+        "metadata": {},
+    }
+
+
+def _page(items, query):
+    """One page of a list endpoint: items after the `after` cursor, up to `limit`."""
+    if query.get("after"):
+        ids = [item["id"] for item in items]
+        items = items[ids.index(query["after"]) + 1:] if query["after"] in ids else []
+    return items[: int(query.get("limit", 20))]
+
+
+def _list_payload(items):
+    return {
+        "object": "list",
+        "data": items,
+        "first_id": items[0]["id"] if items else None,
+        "last_id": items[-1]["id"] if items else None,
+        "has_more": False,
+    }
+
+
+def _rate_limited(state, tokens: int):
+    """Seconds until a run of `tokens` fits the stub's quota window, 0 if it fits now (caller holds the lock)."""
+    if not state.rpm_limit and not state.tpm_limit:
+        return 0
+    now = time.time()
+    state.usage_window = [(t, n) for t, n in state.usage_window if t > now - state.rate_window]
+    over_requests = state.rpm_limit and len(state.usage_window) + 1 > state.rpm_limit
+    over_tokens = state.tpm_limit and sum(n for _, n in state.usage_window) + tokens > state.tpm_limit
+    if over_requests or over_tokens:
+        return max(1, math.ceil(state.usage_window[0][0] + state.rate_window - now)) if state.usage_window else 1
+    state.usage_window.append((now, tokens))
+    return 0
+
+
+def _execute_run(state, run, emit=None):
+    """
+    Executes `run` without holding the state lock, so concurrent runs overlap like on the service.
+    `emit(event, payload)` receives the stream events (message created / deltas / completed).
+    """
+    with state.lock:
+        thread = state.threads.get(run["thread_id"])
+        thread_messages = state.messages.get(run["thread_id"], [])
+        prompt = next((m for m in reversed(thread_messages) if m["role"] == "user"), None)
+        prompt_text = prompt["content"][0]["text"]["value"] if prompt else ""
+        retry_after = _rate_limited(state, len(prompt_text) // 4)
+        if retry_after:
+            run["status"] = "failed"
+            run["failed_at"] = int(time.time())
+            run["last_error"] = {
+                "code": "rate_limit_exceeded",
+                "message": f"Rate limit is exceeded. Try again in {retry_after} seconds.",
+            }
+            return
+        run["status"] = "in_progress"
+        message = _text_message(state, run["thread_id"], "assistant", "", run["id"], run["assistant_id"])
+
+    if state.tool_fn is not None and thread is not None:
+        state.tool_fn(thread, prompt_text)
+    remaining = state.run_seconds - (time.time() - run["_started"])
+    if remaining > 0:
+        time.sleep(remaining)
+
+    answer = state.answer_fn(prompt_text)
+    if emit is not None:
+        emit("thread.message.created", dict(message, status="in_progress", content=[]))
+        for piece in re.findall(r"\S+\s*", answer):
+            emit("thread.message.delta", {
+                "id": message["id"],
+                "object": "thread.message.delta",
+                "delta": {"content": [{"index": 0, "type": "text", "text": {"value": piece}}]},
+            })
+            time.sleep(state.delta_seconds)
+
+    message["content"][0]["text"]["value"] = answer
+    prompt_tokens = len(prompt_text) // 4
+    completion_tokens = len(answer) // 4
+    with state.lock:
+        if run["thread_id"] in state.messages:
+            state.messages[run["thread_id"]].append(message)
+        run["status"] = "completed"
+        run["completed_at"] = int(time.time())
+        run["usage"] = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+    if emit is not None:
+        emit("thread.message.completed", message)
+
+
+class FoundryStubHandler(BaseHTTPRequestHandler):
+    state: FoundryStubState = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    # ---------- helpers ----------
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self):
+        self._send(404, {"error": {"code": "not_found", "message": self.path}})
+
+    def _route(self, method):
+        time.sleep(self.state.latency)
+        url = urlparse(self.path)
+        path = url.path[len(PROJECT_PATH):] if url.path.startswith(PROJECT_PATH) else url.path
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        for pattern, handler_method, name in ROUTES:
+            match = re.fullmatch(pattern, path)
+            if match and handler_method == method:
+                with self.state.lock:
+                    deferred = getattr(self, name)(query, *match.groups())
+                # Long-running responses (streams) are written after the lock is released
+                if callable(deferred):
+                    deferred()
+                return
+        self._not_found()
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+    # ---------- threads ----------
+    def create_thread(self, query):
+        body = self._body()
+        state = self.state
+        thread = {
+            "id": state.new_id("thread"),
+            "object": "thread",
+            "created_at": int(time.time()),
+            "tool_resources": body.get("tool_resources") or {},
+            "metadata": body.get("metadata") or {},
+        }
+        state.threads[thread["id"]] = thread
+        state.messages[thread["id"]] = []
+        for message in body.get("messages") or []:
+            state.messages[thread["id"]].append(
+                _text_message(state, thread["id"], message.get("role", "user"), message.get("content", ""))
+            )
+        self._send(200, thread)
+
+    def get_thread(self, query, thread_id):
+        thread = self.state.threads.get(thread_id)
+        return self._send(200, thread) if thread else self._not_found()
+
+    def update_thread(self, query, thread_id):
+        thread = self.state.threads.get(thread_id)
+        if not thread:
+            return self._not_found()
+        body = self._body()
+        for key in ("tool_resources", "metadata"):
+            if key in body:
+                thread[key] = body[key]
+        self._send(200, thread)
+
+    def delete_thread(self, query, thread_id):
+        existed = self.state.threads.pop(thread_id, None) is not None
+        self.state.messages.pop(thread_id, None)
+        self._send(200, {"id": thread_id, "object": "thread.deleted", "deleted": existed})
+
+    # ---------- messages ----------
+    def create_message(self, query, thread_id):
+        if thread_id not in self.state.threads:
+            return self._not_found()
+        body = self._body()
+        content = body.get("content", "")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        message = _text_message(self.state, thread_id, body.get("role", "user"), content)
+        self.state.messages[thread_id].append(message)
+        self._send(200, message)
+
+    def list_messages(self, query, thread_id):
+        if thread_id not in self.state.threads:
+            return self._not_found()
+        items = list(self.state.messages[thread_id])
+        if query.get("run_id"):
+            items = [m for m in items if m["run_id"] == query["run_id"]]
+        if query.get("order", "desc") == "desc":
+            items.reverse()
+        self._send(200, _list_payload(_page(items, query)))
+
+    # ---------- runs ----------
+    def create_run(self, query, thread_id):
+        if thread_id not in self.state.threads:
+            return self._not_found()
+        body = self._body()
+        run = {
+            "id": self.state.new_id("run"),
+            "object": "thread.run",
+            "thread_id": thread_id,
+            "assistant_id": body.get("assistant_id"),
+            "status": "queued",
+            "created_at": int(time.time()),
+            "model": body.get("model") or "stub-model",
+            "instructions": body.get("instructions") or "",
+            "tools": [],
+            "metadata": body.get("metadata") or {},
+            "parallel_tool_calls": True,
+            "_started": time.time(),
+        }
+        self.state.runs[run["id"]] = run
+        if body.get("stream"):
+            return lambda: self._stream_run(run)
+        threading.Thread(target=_execute_run, args=(self.state, run), daemon=True).start()
+        self._send(200, _public(run))
+
+    def _stream_run(self, run):
+        """Server-sent events of one run, in the order the service sends them."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def emit(event, payload):
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            self.wfile.write(f"event: {event}\ndata: {data}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        emit("thread.run.created", _public(run))
+        emit("thread.run.in_progress", dict(_public(run), status="in_progress"))
+        _execute_run(self.state, run, emit)
+        emit(f"thread.run.{run['status']}", _public(run))
+        emit("done", "[DONE]")
+
+    def get_run(self, query, thread_id, run_id):
+        run = self.state.runs.get(run_id)
+        if not run or run["thread_id"] != thread_id:
+            return self._not_found()
+        self._send(200, _public(run))
+
+    # ---------- agents ----------
+    def create_agent(self, query):
+        body = self._body()
+        agent = {
+            "id": self.state.new_id("asst"),
+            "object": "assistant",
+            "created_at": int(time.time()),
+            "name": body.get("name"),
+            "description": body.get("description"),
+            "model": body.get("model"),
+            "instructions": body.get("instructions"),
+            "tools": body.get("tools") or [],
+            "tool_resources": body.get("tool_resources") or {},
+            "metadata": body.get("metadata") or {},
+        }
+        self.state.agents[agent["id"]] = agent
+        self._send(200, agent)
+
+    def update_agent(self, query, agent_id):
+        agent = self.state.agents.get(agent_id)
+        if not agent:
+            return self._not_found()
+        agent.update({k: v for k, v in self._body().items() if k in agent})
+        self._send(200, agent)
+
+    def get_agent(self, query, agent_id):
+        agent = self.state.agents.get(agent_id)
+        return self._send(200, agent) if agent else self._not_found()
+
+    def list_agents(self, query):
+        items = sorted(self.state.agents.values(), key=lambda a: a["id"], reverse=True)
+        self._send(200, _list_payload(_page(items, query)))
+
+    def delete_agent(self, query, agent_id):
+        existed = self.state.agents.pop(agent_id, None) is not None
+        self._send(200, {"id": agent_id, "object": "assistant.deleted", "deleted": existed})
+
+    # ---------- connections ----------
+    def get_connection(self, query, name):
+        # Every name resolves, so the search tool can be configured against the stub
+        self._send(200, {
+            "name": name,
+            "id": f"/subscriptions/stub/resourceGroups/stub/providers/Microsoft.CognitiveServices"
+                  f"/accounts/stub/projects/stub/connections/{name}",
+            "type": "CognitiveSearch",
+            "target": "",
+            "isDefault": True,
+            "credentials": {"type": "ApiKey"},
+            "metadata": {},
+        })
+
+
+def _public(run):
+    return {k: v for k, v in run.items() if not k.startswith("_")}
+
+
+ROUTES = [
+    (r"/threads", "POST", "create_thread"),
+    (r"/threads/([^/]+)", "GET", "get_thread"),
+    (r"/threads/([^/]+)", "POST", "update_thread"),
+    (r"/threads/([^/]+)", "DELETE", "delete_thread"),
+    (r"/threads/([^/]+)/messages", "POST", "create_message"),
+    (r"/threads/([^/]+)/messages", "GET", "list_messages"),
+    (r"/threads/([^/]+)/runs", "POST", "create_run"),
+    (r"/threads/([^/]+)/runs/([^/]+)", "GET", "get_run"),
+    (r"/assistants", "POST", "create_agent"),
+    (r"/assistants", "GET", "list_agents"),
+    (r"/assistants/([^/]+)", "GET", "get_agent"),
+    (r"/assistants/([^/]+)", "POST", "update_agent"),
+    (r"/assistants/([^/]+)", "DELETE", "delete_agent"),
+    (r"/connections/([^/]+)", "GET", "get_connection"),
+]
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, **state_kwargs):
+    """
+    Starts the stub in a daemon thread.
+    Returns (server, endpoint); call server.shutdown() to stop it.
+    """
+    state = FoundryStubState(**state_kwargs)
+    handler = type("BoundFoundryStubHandler", (FoundryStubHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://{host}:{server.server_address[1]}{PROJECT_PATH}"
+    return server, endpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every request")
+    parser.add_argument("--run-seconds", type=float, default=1.0, help="Time until a run completes")
+    parser.add_argument("--rpm", type=int, default=0, help="Runs per minute before rate_limit_exceeded (0 = none)")
+    parser.add_argument("--tpm", type=int, default=0, help="Prompt tokens per minute (0 = none)")
+    args = parser.parse_args()
+
+    server, endpoint = start_stub_server(
+        args.host, args.port, latency=args.latency_ms / 1000, run_seconds=args.run_seconds,
+        rpm_limit=args.rpm, tpm_limit=args.tpm,
+    )
+    print(f"Foundry stub listening: {endpoint}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
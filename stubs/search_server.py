@@ -0,0 +1,149 @@
+"""
+Local stub of the Azure AI Search documents API (search only) with configurable latency.
+
+Serves BM25 retrieval (services/local_search.py LocalSearchClient) over the chunk index schema,
+either from a chunk export (scripts/export_chunks.py) or over synthetic CV chunks. Only `search`,
+`top`, `select`, `searchMode`, `highlight` (with its tags) and `search.in(field, '...', '|')`
+filters are honoured; other filters are accepted and ignored.
+
+    python stubs/search_server.py --port 8766 --latency-ms 40
+    # endpoint: http://127.0.0.1:8766 (any api-key)
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.candidate_profile import DOMAINS, SKILLS
+from services.local_search import LocalSearchClient, LocalSearchIndex
+
+_SEARCH_PATHS = [
+    re.compile(r"/indexes\('([^']+)'\)/docs/search\.post\.search"),
+    re.compile(r"/indexes/([^/]+)/docs/search(?:\.post\.search)?"),
+]
+
+
+def synthetic_chunks(cvs: int = 500, chunks_per_cv: int = 4, seed: int = 0) -> list:
+    """Chunk documents of `cvs` made-up CVs (id, document_id, candidate_id, text + profile fields)."""
+    rng = random.Random(seed)
+    skills, domains = list(SKILLS), list(DOMAINS)
+    documents = []
+    for number in range(cvs):
+        candidate_id = f"cv_{number:05d}.pdf"
+        cv_skills = rng.sample(skills, rng.randint(3, 10))
+        years = rng.randint(0, 20)
+        domain = rng.choice(domains)
+        for chunk in range(chunks_per_cv):
+            mentioned = rng.sample(cv_skills, min(len(cv_skills), 4))
+            documents.append({
+                "id": f"{number:05d}_{chunk}",
+                "document_id": f"doc_{number:05d}",
+                "candidate_id": candidate_id,
+                "text": f"Software engineer with {years} years of experience in {domain}. "
+                        f"Worked with {', '.join(mentioned)} on production systems.",
+                "skills": sorted(cv_skills),
+                "years_experience": float(years),
+                "domain": domain,
+            })
+    return documents
+
+
+class SearchStubState:
+    def __init__(self, index: LocalSearchIndex, index_name: str = "cv-index", latency: float = 0.0):
+        self.index = index
+        self.client = LocalSearchClient(index)
+        self.index_name = index_name
+        self.latency = latency
+        self.requests = 0
+
+
+class SearchStubHandler(BaseHTTPRequestHandler):
+    state: SearchStubState = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        time.sleep(self.state.latency)
+
+        path = self.path.split("?", 1)[0]
+        match = next((m for m in (p.fullmatch(path) for p in _SEARCH_PATHS) if m), None)
+        if not match or match.group(1) != self.state.index_name:
+            return self._send(404, {"error": {"code": "NotFound", "message": self.path}})
+
+        self.state.requests += 1
+        hits = self.state.client.search(
+            body.get("search") or "",
+            filter=body.get("filter"),
+            top=int(body.get("top") or 50),
+            select=body.get("select"),
+            search_mode=body.get("searchMode") or "any",
+            highlight_fields=body.get("highlight"),
+            highlight_pre_tag=body.get("highlightPreTag", "<em>"),
+            highlight_post_tag=body.get("highlightPostTag", "</em>"),
+        )
+        self._send(200, {"value": hits})
+
+
+def start_search_stub(host: str = "127.0.0.1", port: int = 0, documents=None, **state_kwargs):
+    """
+    Starts the stub in a daemon thread.
+    Returns (server, endpoint); call server.shutdown() to stop it.
+    """
+    index = LocalSearchIndex(documents if documents is not None else synthetic_chunks())
+    state = SearchStubState(index, **state_kwargs)
+    handler = type("BoundSearchStubHandler", (SearchStubHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every request")
+    parser.add_argument("--index-name", default="cv-index")
+    parser.add_argument("--documents", help="Chunk export (JSONL) instead of synthetic chunks")
+    parser.add_argument("--synthetic-cvs", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.documents:
+        with open(args.documents, encoding="utf-8") as f:
+            documents = [json.loads(line) for line in f if line.strip()]
+    else:
+        documents = synthetic_chunks(args.synthetic_cvs)
+
+    server, endpoint = start_search_stub(
+        args.host, args.port, documents, index_name=args.index_name, latency=args.latency_ms / 1000
+    )
+    print(f"Search stub listening: {endpoint} (index '{args.index_name}', {len(documents)} chunks)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
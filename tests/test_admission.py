@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.agent_runner import _acquire_async
+from services.admission import AdmissionTimeout, RunScheduler, retry_after_header
+
+
+def _scheduler(**kwargs):
+    kwargs.setdefault("max_concurrent", 1)
+    return RunScheduler(tokens_per_minute=0, requests_per_minute=0, run_token_overhead=0, **kwargs)
+
+
+def _wait_queued(scheduler, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while scheduler.stats()["queued"] < count:
+        assert time.monotonic() < deadline, "tickets were not queued"
+        time.sleep(0.005)
+
+
+def _serve(scheduler, requests):
+    """Queues `requests` [(session, retry)] behind a held slot; returns the admission order."""
+    held = scheduler.acquire("held")
+    order, lock = [], threading.Lock()
+
+    def run(label, session, retry):
+        ticket = scheduler.acquire(session, retry=retry)
+        with lock:
+            order.append(label)
+        scheduler.release(ticket)
+
+    threads = []
+    for i, (session, retry) in enumerate(requests):
+        label = f"{session}{i}"
+        thread = threading.Thread(target=run, args=(label, session, retry))
+        thread.start()
+        threads.append(thread)
+        _wait_queued(scheduler, i + 1)
+    scheduler.release(held)
+    for thread in threads:
+        thread.join(5)
+    return order
+
+
+def test_sessions_are_served_round_robin():
+    order = _serve(_scheduler(), [("a", False), ("a", False), ("a", False), ("b", False)])
+    assert order == ["a0", "b3", "a1", "a2"]
+
+
+def test_retry_goes_first():
+    order = _serve(_scheduler(), [("a", False), ("b", False), ("c", True)])
+    assert order[0] == "c2"
+
+
+def test_timeout_leaves_the_queue():
+    scheduler = _scheduler()
+    held = scheduler.acquire("held")
+    with pytest.raises(AdmissionTimeout):
+        scheduler.acquire("late", timeout=0.05)
+    assert scheduler.stats()["queued"] == 0
+    scheduler.release(held)
+    assert scheduler.stats()["running"] == 0
+
+
+def test_cancelled_async_acquire_releases_its_ticket():
+    scheduler = _scheduler()
+
+    async def main():
+        held = scheduler.acquire("held")
+        waiting = asyncio.create_task(_acquire_async(scheduler, "batch", 0, False))
+        while scheduler.stats()["queued"] < 1:
+            await asyncio.sleep(0.005)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        # The worker thread is still queued; it is admitted and released once the slot frees
+        scheduler.release(held)
+        for _ in range(200):
+            if scheduler.stats()["queued"] == 0:
+                break
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+    assert scheduler.stats()["queued"] == 0
+    assert scheduler.stats()["running"] == 0
+
+
+def test_pause_delays_admission():
+    scheduler = _scheduler()
+    scheduler.pause(0.1)
+    start = time.monotonic()
+    scheduler.release(scheduler.acquire("a"))
+    assert time.monotonic() - start >= 0.09
+
+
+def test_retry_after_header_formats():
+    assert retry_after_header({"retry-after-ms": "1500"}) == 1.5
+    assert retry_after_header({"retry-after": "3"}) == 3.0
+    assert retry_after_header({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert retry_after_header({"retry-after": "soon"}) is None
+    assert retry_after_header(None) is None
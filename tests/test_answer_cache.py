@@ -0,0 +1,32 @@
+from services.answer_cache import AnswerCache, MemoryCacheBackend, make_cache_key, normalize_jd
+from services.manifest import manifest_version, save_manifest
+
+
+def test_normalize_jd_ignores_formatting():
+    assert normalize_jd("  - Senior  C++ / Node.js developer!! ") == normalize_jd("senior c++ / node.js DEVELOPER")
+
+
+def test_comparisons_change_the_key():
+    keys = {make_cache_key(jd, "agent", "t") for jd in ("< 3 years", "> 3 years", "3 years", "<= 3 years")}
+    assert len(keys) == 4
+    assert normalize_jd("> 3 years") == normalize_jd("more than 3 years")
+
+
+def test_new_version_clears_cached_answers():
+    versions = ["v1"]
+    cache = AnswerCache(MemoryCacheBackend(), version_fn=lambda: versions[-1], version_check_seconds=0)
+    assert cache.get("jd", "agent", "t") is None
+    cache.put("jd", "agent", "t", "answer")
+    assert cache.get("jd", "agent", "t") == "answer"
+
+    versions.append("v2")
+    assert cache.get("jd", "agent", "t") is None
+
+
+def test_manifest_version_follows_content(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    assert manifest_version(path) is None
+    save_manifest({"a.pdf": {"hash": "1"}}, path)
+    first = manifest_version(path)
+    save_manifest({"a.pdf": {"hash": "2"}}, path)
+    assert manifest_version(path) not in (None, first)
@@ -0,0 +1,49 @@
+from services.candidate_profile import (
+    build_odata_filter,
+    extract_requirements,
+    jd_filter,
+    matches_requirements,
+)
+
+
+def test_filter_keeps_candidates_with_unknown_fields():
+    odata = build_odata_filter({"required_skills": ["python"], "min_years": 5.0})
+    assert odata == (
+        "(not skills/any() or skills/any(s: s eq 'python')) and "
+        "(years_experience eq null or years_experience ge 5)"
+    )
+
+
+def test_filter_is_empty_without_hard_requirements():
+    assert build_odata_filter({}) == ""
+    assert build_odata_filter({"required_skills": [], "min_years": None, "preferred_skills": ["java"]}) == ""
+    assert jd_filter("Tell me more about the second candidate") == ""
+
+
+def test_filter_quotes_values():
+    assert "s eq 'c''s'" in build_odata_filter({"required_skills": ["c's"]})
+
+
+def test_local_match_has_the_same_null_semantics():
+    requirements = {"required_skills": ["python"], "min_years": 5.0}
+    assert matches_requirements({"skills": [], "years_experience": None}, requirements)
+    assert matches_requirements({"skills": ["python", "sql"], "years_experience": 6}, requirements)
+    assert not matches_requirements({"skills": ["java"], "years_experience": None}, requirements)
+    assert not matches_requirements({"skills": ["python"], "years_experience": 3}, requirements)
+
+
+def test_requirements_from_jd():
+    requirements = extract_requirements(
+        "Senior backend engineer\n"
+        "Requirements: must have Python and PostgreSQL, 3-5 years of experience\n"
+        "Nice to have: Docker"
+    )
+    assert "python" in requirements["required_skills"]
+    assert "docker" in requirements["preferred_skills"]
+    # Lower bound of a range
+    assert requirements["min_years"] == 3.0
+
+
+def test_ambiguous_alias_is_not_a_hard_requirement_in_prose():
+    requirements = extract_requirements("Must be able to go the extra mile with customers")
+    assert "go" not in requirements["required_skills"]
@@ -0,0 +1,39 @@
+import pytest
+
+from services.chunker import chunk_text, split_pages, split_sections
+
+TEXT = " ".join(f"Sentence number {i} describes a project." for i in range(60))
+
+
+def test_pages_respect_max_length_and_overlap():
+    pages = split_pages(TEXT, max_length=200, overlap=50)
+    assert len(pages) > 1
+    assert all(len(page) <= 200 for page in pages)
+    for previous, page in zip(pages, pages[1:]):
+        # Each page starts with the tail of the previous one
+        assert previous[-20:].split()[-1] in page[:60]
+
+
+def test_no_text_is_lost_without_overlap():
+    pages = split_pages(TEXT, max_length=200, overlap=0)
+    assert " ".join(pages).split() == TEXT.split()
+
+
+def test_long_sentence_is_split():
+    pages = split_pages("x" * 500, max_length=100, overlap=10)
+    assert all(len(page) <= 100 for page in pages)
+    assert "".join(pages).count("x") >= 500
+
+
+def test_overlap_must_be_smaller_than_pages():
+    with pytest.raises(ValueError):
+        split_pages(TEXT, max_length=100, overlap=100)
+
+
+def test_sections_never_cross_a_heading():
+    cv = "Jane Doe\nExperience\nPython at Acme. Kafka pipelines.\nSkills\nPython, SQL\nEducation\nBSc"
+    sections = split_sections(cv, max_length=1000)
+    assert [name for name, _ in sections] == ["header", "experience", "skills", "education"]
+    assert chunk_text(cv, mode="sections", max_length=1000, overlap=0) == [chunk for _, chunk in sections]
+    with pytest.raises(ValueError):
+        chunk_text(cv, mode="words")
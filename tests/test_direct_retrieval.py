@@ -0,0 +1,33 @@
+import pytest
+
+from config.settings import get_settings
+from services.direct_retrieval import classify_intent
+
+
+@pytest.mark.parametrize("question,kind", [
+    ("which CVs mention Kubernetes?", "list"),
+    ("ứng viên nào biết Java?", "list"),
+    ("show me the CV of cv_00012.pdf", "lookup"),
+    ("which cv is missing email", None),
+    ("list CVs without a phone number", None),
+    ("Which candidates don't have Java?", None),
+    ("Get candidates who worked at Google or Microsoft", None),
+    ("Who has more than 5 years of Python?", None),
+    ("Which candidate is the best fit for a senior Python role?", None),
+])
+def test_classify_intent(question, kind):
+    intent = classify_intent(question)
+    assert (intent.kind if intent else None) == kind
+
+
+def test_query_key_falls_back_to_admin_key(monkeypatch):
+    monkeypatch.setenv("AZURE_SEARCH_ADMIN_KEY", "admin")
+    monkeypatch.delenv("AZURE_SEARCH_QUERY_KEY", raising=False)
+    get_settings.cache_clear()
+    try:
+        assert get_settings().search.query_key == "admin"
+        monkeypatch.setenv("AZURE_SEARCH_QUERY_KEY", "query")
+        get_settings.cache_clear()
+        assert get_settings().search.query_key == "query"
+    finally:
+        get_settings.cache_clear()
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from requests.structures import CaseInsensitiveDict
+
+from services import embedding_service
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, data=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self._data = data
+        self.text = ""
+
+    def json(self):
+        return {"data": self._data}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+def test_retry_after_http_date_is_retried(monkeypatch):
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    responses = [
+        FakeResponse(429, {"Retry-After": retry_at}),
+        FakeResponse(429, {"Retry-After": "not a date"}),
+        FakeResponse(200, data=[{"index": 1, "embedding": [2.0]}, {"index": 0, "embedding": [1.0]}]),
+    ]
+    sleeps = []
+    monkeypatch.setattr(embedding_service._session, "post", lambda *a, **k: responses.pop(0))
+    monkeypatch.setattr(embedding_service.time, "sleep", sleeps.append)
+
+    assert embedding_service._post_embeddings(["a", "b"]) == [[1.0], [2.0]]
+    assert 28 < sleeps[0] <= 31
+    # Unparseable header: the exponential backoff (2 ** 1 + jitter)
+    assert 2 <= sleeps[1] <= 3
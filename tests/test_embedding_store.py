@@ -0,0 +1,74 @@
+import numpy as np
+
+from services.embedding_store import EmbeddingStore, text_key
+
+DIM = 4
+
+
+def _store(tmp_path):
+    return EmbeddingStore(str(tmp_path), dim=DIM)
+
+
+def test_add_get_and_reopen(tmp_path):
+    store = _store(tmp_path)
+    store.add(["a", "b", "a"], [[1] * DIM, [2] * DIM, [3] * DIM])
+    assert len(store) == 2
+    assert store.get("a").tolist() == [1] * DIM
+
+    store = _store(tmp_path)
+    assert len(store) == 2
+    assert store.get("b").tolist() == [2] * DIM
+    assert store.get("missing") is None
+
+
+def test_torn_vector_append_is_trimmed(tmp_path):
+    store = _store(tmp_path)
+    store.add(["a"], [[1] * DIM])
+    # Crash after the vector write, before the key
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(np.full(DIM, 9, dtype=np.float32).tobytes())
+
+    store = _store(tmp_path)
+    assert len(store) == 1
+    store.add(["b"], [[2] * DIM])
+    assert store.get("b").tolist() == [2] * DIM
+    assert _store(tmp_path).get("b").tolist() == [2] * DIM
+
+
+def test_key_with_partial_vector_is_trimmed(tmp_path):
+    store = _store(tmp_path)
+    store.add(["a"], [[1] * DIM])
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(np.full(DIM // 2, 9, dtype=np.float32).tobytes())
+    with open(tmp_path / "keys.txt", "a", encoding="utf-8") as f:
+        f.write("torn\nhalf-written-ke")
+
+    store = _store(tmp_path)
+    assert len(store) == 1 and "torn" not in store
+    store.add(["b"], [[2] * DIM])
+    reopened = _store(tmp_path)
+    assert reopened.get("a").tolist() == [1] * DIM
+    assert reopened.get("b").tolist() == [2] * DIM
+    assert "torn" not in reopened
+
+
+def test_get_or_embed_only_embeds_new_text(tmp_path):
+    store = _store(tmp_path)
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [[len(t)] * DIM for t in texts]
+
+    vectors, embedded = store.get_or_embed(["x", "yy", "x"], embed)
+    assert embedded == 2 and vectors[1] == [2.0] * DIM
+    _, embedded = store.get_or_embed(["yy", "zzz"], embed)
+    assert embedded == 1 and calls[-1] == ["zzz"]
+
+
+def test_compact_keeps_live_keys(tmp_path):
+    store = _store(tmp_path)
+    store.add([text_key("a"), text_key("b")], [[1] * DIM, [2] * DIM])
+    assert store.compact([text_key("b")]) == 1
+    reopened = _store(tmp_path)
+    assert len(reopened) == 1 and reopened.get(text_key("b")).tolist() == [2] * DIM
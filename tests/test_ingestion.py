@@ -0,0 +1,41 @@
+import pytest
+
+from config.settings import get_settings
+from services import ingestion
+from services.ingestion import _projected_chunk_ids, document_key, run_ingestion
+
+
+class FakeSearchClient:
+    def __init__(self, docs):
+        self.docs = docs
+        self.filters = []
+
+    def search(self, search_text, filter, select):
+        self.filters.append(filter)
+        return [{k: doc[k] for k in select} for doc in self.docs
+                if "'{}'".format(doc["candidate_id"].replace("'", "''")) in filter]
+
+
+def test_projected_chunks_exclude_local_ids():
+    key = document_key("a.pdf")
+    client = FakeSearchClient([
+        {"id": f"{key}_0", "candidate_id": "a.pdf"},
+        {"id": "aHR0cHM6Ly9_pages_0", "candidate_id": "a.pdf"},
+        {"id": "aHR0cHM6Ly9_pages_1", "candidate_id": "a.pdf"},
+        {"id": "b_pages_0", "candidate_id": "o'b.pdf"},
+        {"id": "c_pages_0", "candidate_id": "c.pdf"},
+    ])
+    projected = _projected_chunk_ids(client, ["a.pdf", "o'b.pdf"])
+    assert projected == {"a.pdf": {"aHR0cHM6Ly9_pages_0", "aHR0cHM6Ly9_pages_1"}, "o'b.pdf": {"b_pages_0"}}
+    assert _projected_chunk_ids(client, []) == {}
+
+
+def test_run_ingestion_requires_local_mode(monkeypatch):
+    monkeypatch.delenv("INGESTION_MODE", raising=False)
+    get_settings.cache_clear()
+    monkeypatch.setattr(ingestion, "load_manifest", lambda: pytest.fail("ran in indexer mode"))
+    try:
+        with pytest.raises(RuntimeError, match="INGESTION_MODE=local"):
+            run_ingestion()
+    finally:
+        get_settings.cache_clear()
@@ -0,0 +1,55 @@
+import pytest
+
+from services.local_search import LocalSearchClient, LocalSearchIndex, odata_predicate, reciprocal_rank_fusion
+
+DOCS = [
+    {"id": "1", "candidate_id": "a.pdf", "text": "Python developer with Kafka and Airflow"},
+    {"id": "2", "candidate_id": "a.pdf", "text": "Built data pipelines in Python"},
+    {"id": "3", "candidate_id": "b.pdf", "text": "Java developer, Spring Boot microservices"},
+    {"id": "4", "candidate_id": "c.pdf", "text": "Kafka streaming platform on Kubernetes"},
+]
+VECTORS = [[1, 0, 0], [0.9, 0.1, 0], [0, 1, 0], [0, 0, 1]]
+
+
+def test_bm25_ranks_matching_chunks():
+    index = LocalSearchIndex(DOCS)
+    hits = index.search("kafka airflow", query_type="simple", top=5)
+    assert [h["id"] for h in hits] == ["1", "4"]
+    assert hits[0]["@search.score"] > hits[1]["@search.score"]
+    assert index.search("golang", query_type="simple") == []
+
+
+def test_vector_search_is_cosine():
+    index = LocalSearchIndex(DOCS, vectors=VECTORS)
+    hits = index.search(vector=[2, 0, 0], query_type="vector", top=2)
+    assert [h["id"] for h in hits] == ["1", "2"]
+    assert hits[0]["@search.score"] == pytest.approx(1.0)
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([[(0, 9.0), (1, 5.0)], [(1, 0.9), (2, 0.8)]], k=60)
+    assert [i for i, _ in fused] == [1, 0, 2]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_hybrid_fuses_both_rankings():
+    index = LocalSearchIndex(DOCS, vectors=VECTORS)
+    hits = index.search("kafka streaming", vector=[0, 0, 1], query_type="vector_simple_hybrid", top=2)
+    # Chunk 4 is first in both rankings
+    assert hits[0]["id"] == "4"
+
+
+def test_filter_and_candidates():
+    index = LocalSearchIndex(DOCS)
+    only_a = odata_predicate("search.in(candidate_id, 'a.pdf|x.pdf', '|')")
+    assert {h["candidate_id"] for h in index.search("python kafka", query_type="simple", filter=only_a)} == {"a.pdf"}
+
+    candidates = index.search_candidates("python kafka", query_type="simple")
+    ids = [c["candidate_id"] for c in candidates]
+    assert len(ids) == len(set(ids)) and ids[0] == "a.pdf"
+
+
+def test_client_applies_odata_filter():
+    client = LocalSearchClient(LocalSearchIndex(DOCS))
+    results = list(client.search("developer", filter="search.in(candidate_id, 'b.pdf', '|')"))
+    assert [r["id"] for r in results] == ["3"]
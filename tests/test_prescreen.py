@@ -0,0 +1,50 @@
+from agents.chat import ChatSession
+from services.candidate_profile import extract_requirements
+from services.prescreen import PreScreener, candidate_filter
+
+PROFILES = {
+    "cv_a.pdf": {"skills": ["python", "sql"], "years_experience": 6, "seniority": "senior", "domain": "fintech"},
+    "cv_b.pdf": {"skills": ["java"], "years_experience": 2, "seniority": "junior", "domain": None},
+    "cv_c.pdf": {"skills": ["python", "docker"], "years_experience": 3, "seniority": "mid", "domain": None},
+    "cv_d.pdf": {"skills": [], "years_experience": None, "seniority": None, "domain": None},
+}
+
+REQUIREMENT_FREE = [
+    "Tell me more about the second candidate",
+    "Summarize the previous answer",
+    "HR recruiter for our Hanoi office",
+]
+
+
+def test_shortlist_ranks_by_requirements():
+    screener = PreScreener(PROFILES)
+    shortlist = screener.screen("Requirements: must have Python, 5+ years of experience", top=3)
+
+    ids = [c["candidate_id"] for c in shortlist]
+    assert ids[0] == "cv_a.pdf"
+    # cv_b lacks Python, cv_c is below the minimum years
+    assert "cv_b.pdf" not in ids and "cv_c.pdf" not in ids
+    # Unknown skills/years are never excluded
+    assert "cv_d.pdf" in ids
+
+
+def test_shortlist_is_empty_without_requirements():
+    screener = PreScreener(PROFILES)
+    for prompt in REQUIREMENT_FREE:
+        requirements = extract_requirements(prompt)
+        assert not requirements["required_skills"] and not requirements["preferred_skills"]
+        assert screener.shortlist(requirements) == []
+
+
+def test_requirement_free_prompt_has_no_search_filter():
+    chat = ChatSession(agent=None, thread_pool=None, prescreener=PreScreener(PROFILES))
+    for prompt in REQUIREMENT_FREE:
+        plan = chat.plan(prompt)
+        assert plan.shortlist == []
+        assert chat._search_filter(plan) == ""
+
+
+def test_candidate_filter_quotes_and_skips_separator():
+    shortlist = [{"candidate_id": "o'neil.pdf"}, {"candidate_id": "a|b.pdf"}]
+    assert candidate_filter(shortlist) == "search.in(candidate_id, 'o''neil.pdf', '|')"
+    assert candidate_filter([]) == ""